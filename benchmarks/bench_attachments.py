@@ -0,0 +1,139 @@
+"""Measure support case attachment mirroring: confirmation latency and peak memory.
+
+Serves attachments from a local HTTP server standing in for Discord's CDN,
+submits support cases carrying them through the real DM handler, and
+compares the AttachmentMirror (spooled, bounded) against reading every
+attachment fully into memory before uploading it.
+
+    python benchmarks/bench_attachments.py [cases] [--files 4] [--size-mb 8]
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("STATE_BACKEND", "memory")
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import aiohttp  # noqa: E402
+import discord  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+import main  # noqa: E402
+from fakes import FakeAttachment, FakeGateway, FakeGuild, FakeHTTP, FakeTextChannel, FakeThread, FakeUser, install  # noqa: E402
+
+
+async def start_cdn(size):
+    """HTTP server answering every path with `size` bytes, streamed in chunks"""
+    chunk = b"x" * (64 * 1024)
+
+    async def handle(request):
+        response = web.StreamResponse(headers={'Content-Length': str(size)})
+        await response.prepare(request)
+        remaining = size
+        while remaining:
+            await response.write(chunk[:remaining])
+            remaining -= min(remaining, len(chunk))
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get('/{name}', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def naive_copy(attachments, thread):
+    """Read every attachment into memory at once, then upload it"""
+    async with aiohttp.ClientSession() as session:
+        async def one(attachment):
+            async with session.get(attachment.url) as response:
+                data = await response.read()
+            await thread.send(file=discord.File(io.BytesIO(data), filename=attachment.filename))
+        await asyncio.gather(*(one(attachment) for attachment in attachments))
+
+
+async def run(args, base_url):
+    bot = main.bot
+    http = FakeHTTP(latency=0.05)
+    guild = FakeGuild(http)
+    staff_channel = FakeTextChannel(http, guild, "staff")
+    staff_channel.id = main.STAFF_CHANNEL_ID
+    install(bot, http, staff_channel)
+    bot._connection.user = FakeUser(http, name="DungeonKeeper", bot=True)
+    gateway = FakeGateway(bot, http)
+    await bot.load_cog("support")
+    bot.dm_queue.start()
+    await bot.cluster.tick()
+    bot.staff_notifier.burst = args.cases  # announce each case alone; digests would only add their window here
+
+    size = args.size_mb * 1024 * 1024
+    def attachments(case):
+        return [FakeAttachment(f"{base_url}/case{case}-{i}.bin", f"case{case}-{i}.bin", size) for i in range(args.files)]
+
+    # Naive: copy everything concurrently through memory
+    thread = FakeThread(http, guild, "naive")
+    tracemalloc.start()
+    start = time.perf_counter()
+    await naive_copy([a for case in range(args.cases) for a in attachments(case)], thread)
+    naive_time = time.perf_counter() - start
+    naive_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # Mirror: cases go through the real handler; copies finish in the background
+    tracemalloc.start()
+    confirmations = []
+    start = time.perf_counter()
+    for case in range(args.cases):
+        user = FakeUser(http)
+        bot.support_sessions.begin_case(user.id)
+        handler_start = time.perf_counter()
+        await gateway.dm(user, "Screenshots attached", attachments(case))
+        confirmations.append(time.perf_counter() - handler_start)
+    while len(bot.staff_notifier) or len(bot.attachment_mirror):  # copies start once the case thread exists
+        await asyncio.sleep(0.01)
+    mirror_time = time.perf_counter() - start
+    mirror_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    counters = bot.attachment_mirror.counters
+    assert counters['mirrored'] == args.cases * args.files, dict(counters)
+    total_mb = args.cases * args.files * args.size_mb
+    print(f"{args.cases} cases x {args.files} attachments x {args.size_mb} MiB ({total_mb} MiB), "
+          f"{bot.attachment_mirror.concurrency} concurrent copies, {args.spool_mb} MiB spool")
+    print(f"{'mode':<8} {'all copied s':>12} {'peak traced MiB':>16} {'handler p50 ms':>15}")
+    print(f"{'naive':<8} {naive_time:>12.2f} {naive_peak / 2**20:>16.1f} {'-':>15}")
+    print(f"{'mirror':<8} {mirror_time:>12.2f} {mirror_peak / 2**20:>16.1f} "
+          f"{sorted(confirmations)[len(confirmations) // 2] * 1000:>15.1f}")
+
+    await bot.attachment_mirror.close()
+    bot.dm_queue.stop()
+
+
+async def main_async(args):
+    main.bot.attachment_mirror.spool_bytes = args.spool_mb * 1024 * 1024
+    runner, base_url = await start_cdn(args.size_mb * 1024 * 1024)
+    try:
+        await run(args, base_url)
+    finally:
+        await runner.cleanup()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cases", nargs="?", type=int, default=10)
+    parser.add_argument("--files", type=int, default=4, help="attachments per case")
+    parser.add_argument("--size-mb", type=int, default=8, help="size of each attachment")
+    parser.add_argument("--spool-mb", type=int, default=1, help="in-memory spool size per copy")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async(parse_args()))
@@ -0,0 +1,106 @@
+"""Compare one channel edit per voice settings command against the ChannelEditQueue.
+
+Several users toggle /private, /public, /max and /desc on the same voice
+channel at once. The fake channel enforces a per-channel edit rate limit
+the way discord.py does after a 429: the request waits until the bucket
+has room again.
+
+    python benchmarks/bench_channel_edits.py [commands] [--rate 10] [--limit 2] [--per 1.0]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from fakes import FakeGuild, FakeHTTP, RateLimitedVoiceChannel  # noqa: E402
+from main import ChannelEditQueue  # noqa: E402
+
+
+def commands(rng, guild, count):
+    """(field, value) per command; overwrite changes are functions of the current overwrites"""
+    def private(overwrites):
+        overwrites[guild.default_role] = 'deny connect'
+        return overwrites
+
+    def public(overwrites):
+        overwrites.pop(guild.default_role, None)
+        return overwrites
+
+    choices = [
+        lambda: ('overwrites', private),
+        lambda: ('overwrites', public),
+        lambda: ('user_limit', rng.randrange(0, 99)),
+        lambda: ('topic', f"Quiet study {rng.randrange(100)}"),
+    ]
+    return [rng.choice(choices)() for _ in range(count)]
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+async def run(ops, guild, args, coalesce):
+    http = FakeHTTP(latency=0.05)
+    channel = RateLimitedVoiceChannel(http, guild, args.limit, args.per)
+    queue = ChannelEditQueue()
+    loop = asyncio.get_running_loop()
+    latencies = []
+
+    async def one(field, value):
+        start = loop.time()
+        if coalesce:
+            await queue.edit(channel, **{field: value})
+        else:
+            # What the commands used to do: compute the change now, edit right away
+            if callable(value):
+                value = value(dict(channel.overwrites))
+            await channel.edit(**{field: value})
+        latencies.append(loop.time() - start)
+
+    tasks = []
+    begin = loop.time()
+    for i, (field, value) in enumerate(ops):
+        delay = begin + i / args.rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(field, value)))
+    await asyncio.gather(*tasks)
+    return channel, latencies
+
+
+def expected_state(ops):
+    """Channel settings after applying every command one by one, in order"""
+    state = {'overwrites': {}, 'user_limit': 0, 'topic': None}
+    for field, value in ops:
+        state[field] = value(dict(state[field])) if callable(value) else value
+    return state
+
+
+async def main(args):
+    guild = FakeGuild(FakeHTTP(latency=0))
+    ops = commands(random.Random(5), guild, args.commands)
+    print(f"{args.commands} commands at {args.rate}/s on one channel, edit limit {args.limit} per {args.per}s")
+    print(f"{'mode':<12} {'edits':>6} {'p50 s':>8} {'p99 s':>8} {'max s':>8}")
+    for name, coalesce in (("per command", False), ("coalesced", True)):
+        channel, latencies = await run(ops, guild, args, coalesce)
+        if coalesce:
+            assert {field: getattr(channel, field) for field in ('overwrites', 'user_limit', 'topic')} == expected_state(ops)
+        print(f"{name:<12} {channel.edits:>6} {percentile(latencies, 50):>8.2f} "
+              f"{percentile(latencies, 99):>8.2f} {max(latencies):>8.2f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("commands", nargs="?", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=10, help="commands started per second")
+    parser.add_argument("--limit", type=int, default=2, help="edits allowed per window")
+    parser.add_argument("--per", type=float, default=1.0, help="rate limit window in seconds")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
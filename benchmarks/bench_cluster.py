@@ -0,0 +1,127 @@
+"""Run a three-process shard cluster against one SQLite store and kill its leader.
+
+Every process creates reminders due one second later. Halfway through, the
+process holding the scheduler lease is SIGKILLed and another one has to
+take over. Reports how many reminders fired once, twice or never, how late
+they fired and how long dispatch was leaderless.
+
+    python benchmarks/bench_cluster.py [seconds] [reminders_per_second_per_process]
+"""
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+PROCESSES = 3
+LEASE_TTL = 2.0
+SYNC_INTERVAL = 0.25
+
+
+def emit(event, **fields):
+    print(json.dumps(dict(fields, event=event, at=time.time())), flush=True)
+
+
+async def child(node, seconds, rate):
+    import main
+
+    bot = main.bot
+    await bot.restore_state()
+
+    async def send(user_id, priority, embed=None, **kwargs):
+        name, due = embed.description.rsplit('@', 1)
+        emit('fired', node=node, reminder=name, late=time.time() - float(due))
+
+    bot.dm_queue.send = send
+    original = bot.cluster._set_held
+
+    def set_held(name, held):
+        emit('lease', node=node, duty=name, held=held)
+        original(name, held)
+
+    bot.cluster._set_held = set_held
+    bot.cluster.start()
+
+    end = time.monotonic() + seconds
+    n = 0
+    while time.monotonic() < end:
+        due = int(time.time()) + 2  # reminder times are whole seconds
+        name = f"{node}:{n}"
+        await bot.add_reminder(n, main.ReminderRecord(due, f"{name}@{due}", int(time.time())))
+        await bot.state_store.flush()
+        emit('created', node=node, reminder=name)
+        n += 1
+        await asyncio.sleep(1 / rate)
+
+    await asyncio.sleep(LEASE_TTL + 3)  # Let the last reminders fire
+    await bot.cluster.stop()
+    await bot.state_store.close()
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        asyncio.run(child(sys.argv[2], float(sys.argv[3]), float(sys.argv[4])))
+        return
+
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    workdir = tempfile.mkdtemp()
+    events = []
+    lock = threading.Lock()
+    procs = {}
+
+    def read(proc):
+        for line in proc.stdout:
+            if line.startswith('{'):
+                with lock:
+                    events.append(json.loads(line))
+
+    for i in range(PROCESSES):
+        node = f"node-{i}"
+        env = dict(os.environ, SHARD_COUNT=str(PROCESSES), SHARD_IDS=str(i), CLUSTER_NODE=node,
+                   STATE_BACKEND='sqlite', STATE_DB_PATH=os.path.join(workdir, 'state.db'),
+                   STATE_FLUSH_INTERVAL='0.1', LEASE_TTL=str(LEASE_TTL), CLUSTER_SYNC_INTERVAL=str(SYNC_INTERVAL))
+        proc = subprocess.Popen([sys.executable, __file__, '--child', node, str(seconds), str(rate)],
+                                env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        threading.Thread(target=read, args=(proc,), daemon=True).start()
+        procs[node] = proc
+
+    time.sleep(seconds / 2)
+    with lock:
+        leaders = [e['node'] for e in events if e['event'] == 'lease' and e['duty'] == 'scheduler' and e['held']]
+    victim = leaders[-1]
+    killed_at = time.time()
+    procs[victim].send_signal(signal.SIGKILL)
+    for proc in procs.values():
+        proc.wait()
+    time.sleep(0.2)
+
+    created = {e['reminder'] for e in events if e['event'] == 'created'}
+    fired = [e for e in events if e['event'] == 'fired']
+    counts = {}
+    for e in fired:
+        counts[e['reminder']] = counts.get(e['reminder'], 0) + 1
+    takeovers = [e for e in events if e['event'] == 'lease' and e['duty'] == 'scheduler' and e['held'] and e['at'] > killed_at]
+    late = sorted(e['late'] for e in fired)
+
+    print(f"{PROCESSES} processes, {rate:g} reminders/s each for {seconds:g}s, lease TTL {LEASE_TTL:g}s, "
+          f"sync every {SYNC_INTERVAL:g}s")
+    if takeovers:
+        print(f"killed leader {victim}; {takeovers[0]['node']} took over after {takeovers[0]['at'] - killed_at:.2f}s")
+    else:
+        print(f"killed leader {victim}; nobody took over")
+    print(f"created {len(created)}, fired once {sum(1 for c in counts.values() if c == 1)}, "
+          f"fired twice+ {sum(1 for c in counts.values() if c > 1)}, never fired {len(created - set(counts))}")
+    if late:
+        print(f"lateness p50 {late[len(late) // 2] * 1000:.0f} ms, p99 {late[int(len(late) * 0.99)] * 1000:.0f} ms, "
+              f"max {late[-1] * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Measure per-cog startup cost and hot reloads with a pomodoro in flight.
+
+Each deployment (a COGS value) loads in its own interpreter, so imports are
+cold, and reports what DungeonKeeper.load_cog recorded for every cog. The
+full deployment then starts a pomodoro, reloads the study cog repeatedly
+and checks the timer is still running afterwards.
+
+    python benchmarks/bench_cogs.py [--reloads 50] [--deployments all,support,study+reminders]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+async def child(reloads):
+    os.environ['STATE_BACKEND'] = 'memory'
+    started_at = time.perf_counter()
+    import main
+    from fakes import FakeGuild, FakeHTTP, FakeInteraction, FakeTextChannel, FakeUser, install
+    main_import = time.perf_counter() - started_at
+
+    bot = main.bot
+    start = time.perf_counter()
+    await bot.load_cogs(main.COGS)
+    total = time.perf_counter() - start
+    for name, timing in bot.cog_timings.items():
+        print(f"  {name:<10} import {timing['import'] * 1000:7.2f} ms  setup {timing['setup'] * 1000:6.2f} ms")
+    print(f"  main.py import {main_import * 1000:.0f} ms, cogs {total * 1000:.2f} ms, "
+          f"{len(bot.tree.get_commands())} slash commands")
+
+    if 'study' not in bot.cog_timings or not reloads:
+        return
+
+    http = FakeHTTP(latency=0.001)
+    guild = FakeGuild(http)
+    install(bot, http, FakeTextChannel(http, guild, "staff"))
+    await bot.cluster.tick()  # take the scheduler duty so the timer engine runs
+    user = FakeUser(http)
+    command = bot.tree.get_command("pomodoro")
+    await command.callback(command.binding, FakeInteraction(http, user, guild), 25, 5)
+    timer = bot.active_timers[user.id]
+
+    samples = []
+    for _ in range(reloads):
+        start = time.perf_counter()
+        await bot.load_cog('study', reload=True)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    assert bot.tree.get_command("pomodoro") is not command  # the command was re-registered...
+    assert bot.active_timers.get(user.id) is timer and len(bot.timer_engine)  # ...and the timer kept running
+    print(f"  reload study x{reloads}: p50 {samples[len(samples) // 2] * 1000:.2f} ms, "
+          f"max {samples[-1] * 1000:.2f} ms, pomodoro still active")
+    bot.timer_engine.stop()
+    bot.reminder_scheduler.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reloads", type=int, default=50)
+    parser.add_argument("--deployments", default="all,support,study+reminders",
+                        help="comma separated; cogs within a deployment joined with +")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        asyncio.run(child(args.reloads))
+        return
+
+    for deployment in args.deployments.split(","):
+        cogs = "support,voice,study,reminders" if deployment == "all" else deployment.replace("+", ",")
+        print(f"COGS={cogs}")
+        env = dict(os.environ, COGS=cogs)
+        subprocess.run([sys.executable, __file__, "--child", "--reloads", str(args.reloads)], env=env, check=True,
+                       stderr=subprocess.DEVNULL)  # startup logs
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Measure slash commands missing Discord's 3 second acknowledgement deadline, with and without auto-defer.
+
+Interactions reach the bot some time after Discord created them (gateway
+lag), and REST calls are slow. Runs the staff commands that rely on
+InteractionDeadlines rather than acknowledging by hand: /close (archive
+and post in the case thread before answering), /cases and /transcripts.
+Each command runs through the real tree check, callback and completion
+hooks. The fake interaction response raises Unknown Interaction when the
+first acknowledgement lands after the deadline, and InteractionResponded
+on a second one, as Discord does. Failures that remain with auto-defer
+are lag plus a single callback round trip already past 3 s, which no
+defer can avoid. Reports failures, automatic defers, acknowledgement time
+per command and the final margin.
+
+    python benchmarks/bench_interaction_deadlines.py [--runs 32] [--latency 900] [--lag 1.2]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+os.environ.setdefault("STATE_BACKEND", "memory")
+os.environ.setdefault("TRANSCRIPT_DIR", tempfile.mkdtemp())
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import discord  # noqa: E402
+
+import main  # noqa: E402
+from fakes import FakeGuild, FakeHTTP, FakeInteraction, FakeResponse, FakeTextChannel, FakeThread, FakeUser, install  # noqa: E402
+
+
+class DeadlineResponse(FakeResponse):
+    """Interaction response that enforces the acknowledgement deadline and a single acknowledgement"""
+    async def _acknowledge(self):
+        if self._done:
+            raise discord.InteractionResponded(self.interaction)
+        await self.interaction.http.request("POST /interactions/{id}/{token}/callback")
+        if self._done:
+            raise discord.InteractionResponded(self.interaction)
+        waited = (datetime.now(timezone.utc) - self.interaction.created_at).total_seconds()
+        if waited > main.INTERACTION_DEADLINE:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), {'code': 10062, 'message': "Unknown interaction"})
+        self.interaction.acknowledged_after = waited
+        self._done = True
+
+    async def send_message(self, content=None, **kwargs):
+        await self._acknowledge()
+
+    async def defer(self, **kwargs):
+        await self._acknowledge()
+
+
+async def run(bot, guild, http, args, rng, name, arguments):
+    """Run one command `args.runs` times, a few at a time; return (failures, acknowledgement times)"""
+    command = bot.tree.get_command(name)
+    voice_channel = guild.voice_channel(3)
+    failures, acknowledged = 0, []
+
+    async def one():
+        nonlocal failures
+        interaction = FakeInteraction(http, voice_channel.members[0], guild)
+        interaction.response = DeadlineResponse(interaction)
+        interaction.command = command
+        interaction.created_at -= timedelta(seconds=rng.uniform(0, args.lag))
+        await bot.tree.interaction_check(interaction)
+        try:
+            await command.callback(command.binding, interaction, *arguments())
+        except Exception:
+            failures += 1
+            bot.deadlines.finish(interaction, interaction.extras['started_at'])
+            return
+        await bot.on_app_command_completion(interaction, command)
+        if hasattr(interaction, 'acknowledged_after'):
+            acknowledged.append(interaction.acknowledged_after)
+        else:
+            failures += 1
+
+    for start in range(0, args.runs, args.concurrency):
+        await asyncio.gather(*(one() for _ in range(min(args.concurrency, args.runs - start))))
+    return failures, sorted(acknowledged)
+
+
+async def main_async(args):
+    bot = main.bot
+    http = FakeHTTP(latency=args.latency / 1000, jitter=0.5)
+    guild = FakeGuild(http)
+    staff_channel = FakeTextChannel(http, guild, "staff")
+    staff_channel.id = main.STAFF_CHANNEL_ID
+    users, channels = install(bot, http, staff_channel)
+    bot._connection.user = FakeUser(http, name="DungeonKeeper", bot=True)
+    await bot.load_cogs(['voice', 'support'])
+    bot.dm_queue.start()
+
+    customer = FakeUser(http)
+    users[customer.id] = customer
+    case_ids = itertools.count(1)
+
+    def open_case():
+        """A fresh open case with a cached thread, so every /close has work to do"""
+        thread = FakeThread(http, guild, "Case")
+        channels[thread.id] = thread
+        case_id = next(case_ids)
+        bot.cases.add(case_id, main.CaseRecord(customer.id, thread.id, int(datetime.now(timezone.utc).timestamp())))
+        return (case_id,)
+    commands = {
+        'close': open_case,
+        'cases': lambda: ("open", 1),
+        'transcripts': lambda: (1,),
+    }
+
+    print(f"{args.runs} runs per command, REST latency ~{args.latency} ms, gateway lag up to {args.lag:.1f} s, "
+          f"defer margin {bot.deadlines.margin:.1f} s")
+    print(f"{'mode':<11} {'command':<12} {'failed':>6} {'auto defers':>11} {'ack p50 s':>9} {'ack max s':>9}")
+    watch = bot.deadlines.watch
+    for mode in ("no defer", "auto defer"):
+        bot.deadlines.watch = watch if mode == "auto defer" else (lambda interaction: None)
+        bot.deadlines._predicted.clear()  # start without history, so the first runs can only use the deadline
+        for name, arguments in commands.items():
+            before = bot.deadlines.defers[name]
+            failures, acknowledged = await run(bot, guild, http, args, random.Random(7), name, arguments)
+            p50 = f"{acknowledged[len(acknowledged) // 2]:.2f}" if acknowledged else "-"
+            worst = f"{acknowledged[-1]:.2f}" if acknowledged else "-"
+            print(f"{mode:<11} {name:<12} {failures:>6} {bot.deadlines.defers[name] - before:>11} {p50:>9} {worst:>9}")
+    counters = bot.deadlines.counters
+    print(f"auto defer: {counters['deadline']} as the deadline neared, {counters['predicted']} up front from the "
+          f"command's history, {counters['expired']} too late; margin now {bot.deadlines.margin:.2f} s")
+    await bot.transcripts.close()
+    bot.dm_queue.stop()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=32, help="interactions per command")
+    parser.add_argument("--concurrency", type=int, default=16, help="interactions in flight at once")
+    parser.add_argument("--latency", type=float, default=900, help="mean simulated REST latency in ms")
+    parser.add_argument("--lag", type=float, default=1.2, help="most seconds between interaction creation and dispatch")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async(parse_args()))
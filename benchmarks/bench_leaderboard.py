@@ -0,0 +1,66 @@
+"""Compare /rank's old sort-per-call against the Leaderboard index.
+
+    python benchmarks/bench_leaderboard.py [users]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from main import Leaderboard  # noqa: E402
+
+
+def sorted_rank(user_xp, user_id):
+    """What check_rank used to do on every call"""
+    sorted_users = sorted(user_xp.items(), key=lambda x: x[1], reverse=True)
+    for i, (uid, xp) in enumerate(sorted_users):
+        if uid == user_id:
+            return i + 1, sorted_users[:5]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(42)
+    user_xp = {user_id: rng.randrange(0, 50_000, 10) for user_id in range(users)}
+
+    board = Leaderboard()
+    build = timed(lambda: board.rebuild(user_xp), 1)
+
+    probe = rng.randrange(users)
+    old = timed(lambda: sorted_rank(user_xp, probe), 3)
+
+    def update():
+        user_id = rng.randrange(users)
+        old_xp = user_xp[user_id]
+        user_xp[user_id] = old_xp + 10
+        board.update(user_id, old_xp, old_xp + 10)
+
+    def lookup():
+        board.rank(user_xp[rng.randrange(users)])
+        board.top()
+
+    upd = timed(update, 100_000)
+    rank = timed(lookup, 100_000)
+
+    # Sanity check against the old implementation (ties may order differently)
+    expected_rank, expected_top = sorted_rank(user_xp, probe)
+    assert sum(1 for xp in user_xp.values() if xp > user_xp[probe]) + 1 == board.rank(user_xp[probe]) <= expected_rank
+    assert [xp for _, xp in board.top()] == [xp for _, xp in expected_top]
+
+    print(f"{users} users")
+    print(f"sort per /rank call:       {old * 1000:10.1f} ms")
+    print(f"index bulk build:          {build * 1000:10.1f} ms (once at startup)")
+    print(f"index XP update:           {upd * 1e6:10.2f} us")
+    print(f"index rank + top-5 lookup: {rank * 1e6:10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Compare the default and LEAN_MODE cache footprints.
+
+Each mode runs in its own interpreter so RSS is not shared. The child feeds
+DungeonKeeper's connection state a synthetic GUILD_CREATE, the member chunks
+the default mode requests at startup, and a stream of ordinary guild
+messages, then reports startup time, cached objects, RSS and per-message
+handling cost.
+
+    python benchmarks/bench_lean_cache.py [members] [messages]
+"""
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+GUILD_ID = 1
+TEXT_CHANNEL_ID = 10
+VOICE_CHANNEL_ID = 11
+IN_VOICE = 50
+CHUNK_SIZE = 1000
+
+
+def user_payload(user_id):
+    return {'id': str(user_id), 'username': f"user{user_id}", 'discriminator': '0',
+            'global_name': f"User {user_id}", 'avatar': None}
+
+
+def member_payload(user_id):
+    return {'user': user_payload(user_id), 'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00',
+            'deaf': False, 'mute': False, 'flags': 0}
+
+
+def guild_payload(members):
+    voice_ids = range(100, 100 + IN_VOICE)
+    return {
+        'id': str(GUILD_ID), 'name': 'Study Hall', 'owner_id': '100', 'member_count': members,
+        'roles': [{'id': str(GUILD_ID), 'name': '@everyone', 'permissions': '0', 'position': 0,
+                   'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}],
+        'channels': [
+            {'id': str(TEXT_CHANNEL_ID), 'type': 0, 'name': 'general', 'position': 0},
+            {'id': str(VOICE_CHANNEL_ID), 'type': 2, 'name': 'Focus Room', 'position': 1,
+             'bitrate': 64000, 'user_limit': 0},
+        ],
+        'members': [member_payload(uid) for uid in voice_ids],
+        'voice_states': [
+            {'user_id': str(uid), 'channel_id': str(VOICE_CHANNEL_ID), 'session_id': f"s{uid}",
+             'deaf': False, 'mute': False, 'self_deaf': False, 'self_mute': False,
+             'self_video': False, 'suppress': False}
+            for uid in voice_ids
+        ],
+        'emojis': [], 'stickers': [], 'features': [], 'threads': [], 'large': True,
+    }
+
+
+def message_payload(message_id, author_id):
+    return {
+        'id': str(message_id), 'channel_id': str(TEXT_CHANNEL_ID), 'guild_id': str(GUILD_ID),
+        'author': user_payload(author_id), 'member': {'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00',
+                                                      'deaf': False, 'mute': False, 'flags': 0},
+        'content': 'anyone up for a pomodoro?', 'timestamp': '2024-01-01T00:00:00+00:00',
+        'edited_timestamp': None, 'tts': False, 'mention_everyone': False, 'mentions': [],
+        'mention_roles': [], 'attachments': [], 'embeds': [], 'pinned': False, 'type': 0,
+    }
+
+
+async def child(members, messages):
+    os.environ['STATE_BACKEND'] = 'memory'
+    import discord
+    import main
+
+    bot = main.bot
+    state = bot._connection
+    loop = asyncio.get_running_loop()
+    bot.loop = loop  # normally set by Client.login
+    state.user = discord.ClientUser(state=state, data=dict(user_payload(1), bot=True))
+    lean = main.LEAN_MODE
+
+    start = time.perf_counter()
+    guild = state._add_guild_from_data(guild_payload(members))
+    if state._guild_needs_chunking(guild):
+        # What chunk_guild() caches as GUILD_MEMBERS_CHUNK events arrive
+        for offset in range(1000, 1000 + members, CHUNK_SIZE):
+            for uid in range(offset, min(offset + CHUNK_SIZE, 1000 + members)):
+                guild._add_member(discord.Member(data=member_payload(uid), guild=guild, state=state))
+    startup = time.perf_counter() - start
+
+    handled = 0
+    original = bot.on_message
+
+    async def on_message(message):
+        nonlocal handled
+        handled += 1
+        await original(message)
+
+    bot.on_message = on_message
+    start = time.perf_counter()
+    for i in range(messages):
+        state.parse_message_create(message_payload(10_000_000 + i, 1000 + (i % max(members, 1))))
+    await asyncio.sleep(0)
+    while handled < messages:
+        await asyncio.sleep(0)
+    message_time = time.perf_counter() - start
+
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{'lean' if lean else 'default':>8} | startup {startup * 1000:8.1f} ms | "
+          f"members {len(guild.members):>7} | users {len(state._users):>7} | "
+          f"messages {len(state._messages or ()):>5} | {message_time / messages * 1e6:6.1f} us/msg | "
+          f"max RSS {rss_mb:6.1f} MB")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        asyncio.run(child(int(sys.argv[2]), int(sys.argv[3])))
+        return
+
+    members = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    print(f"{members} guild members, {IN_VOICE} in voice, {messages} guild messages")
+    for lean in ('', '1'):
+        env = dict(os.environ, LEAN_MODE=lean, STATE_BACKEND='memory')
+        subprocess.run([sys.executable, __file__, '--child', str(members), str(messages)], env=env, check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Compare event-loop lag with a synchronous log handler and the queued pipeline.
+
+Coroutines log at increasing rates into a sink whose writes block for a
+while (a congested pipe or slow disk), while a sampler measures how late a
+short sleep wakes up. One record in a hundred is an ERROR; the queued
+pipeline may shed INFO records when the sink falls behind, but must write
+every ERROR.
+
+    python benchmarks/bench_logging.py [--write-us 50] [--rates 1000,5000,20000] [--duration 2]
+"""
+import argparse
+import asyncio
+import io
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from main import ContextQueueHandler, StructuredFormatter, set_log_context  # noqa: E402
+
+
+class SlowStream(io.TextIOBase):
+    """Text sink whose every write blocks for `delay` seconds"""
+    def __init__(self, delay):
+        self.delay = delay
+        self.lines = 0
+        self.failures = 0
+
+    def write(self, text):
+        time.sleep(self.delay)
+        self.lines += text.count("\n")
+        self.failures += text.count("relay failed")
+        return len(text)
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))] if samples else 0.0
+
+
+async def measure(log, rate, duration):
+    loop = asyncio.get_running_loop()
+    lag, done = [], asyncio.Event()
+    errors = 0
+
+    async def sampler(interval=0.005):
+        while not done.is_set():
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lag.append(loop.time() - start - interval)
+
+    async def producer():
+        nonlocal errors
+        # Bursts every 10 ms, like a busy gateway
+        per_burst = max(1, int(rate / 100))
+        begin = loop.time()
+        tick = 0
+        while loop.time() - begin < duration:
+            set_log_context(case_id=tick, user_id=tick * 7)
+            for i in range(per_burst):
+                if (tick * per_burst + i) % 100 == 99:
+                    log.error(f"relay failed for message {i}", extra={'event': 'relay'})
+                    errors += 1
+                else:
+                    log.info(f"relayed message {i}", extra={'event': 'relay', 'latency_ms': 0.4})
+            tick += 1
+            await asyncio.sleep(max(0.0, begin + tick * 0.01 - loop.time()))
+        done.set()
+
+    await asyncio.gather(sampler(), producer())
+    return lag, errors
+
+
+async def main(args):
+    print(f"sink write cost {args.write_us} us, {args.duration}s per rate")
+    print(f"{'handler':<8} {'records/s':>9} {'lag p50 ms':>10} {'lag p99 ms':>10} {'lag max ms':>10} {'written':>8} {'dropped':>8} {'errors':>11}")
+    for rate in args.rates:
+        for mode in ("sync", "queued"):
+            stream = SlowStream(args.write_us / 1e6)
+            output = logging.StreamHandler(stream)
+            output.setFormatter(StructuredFormatter())
+            log = logging.getLogger(f"bench.{mode}.{rate}")
+            log.propagate = False
+            listener = None
+            if mode == "sync":
+                log.addHandler(output)
+                handler = None
+            else:
+                handler = ContextQueueHandler(queue.Queue(args.queue_size), fallback=[output])
+                log.addHandler(handler)
+                listener = logging.handlers.QueueListener(handler.queue, output)
+                listener.start()
+            lag, errors = await measure(log, rate, args.duration)
+            if listener is not None:
+                listener.stop()
+            dropped = handler.counters['dropped'] if handler else 0
+            print(f"{mode:<8} {rate:>9} {percentile(lag, 50) * 1000:>10.2f} {percentile(lag, 99) * 1000:>10.2f} "
+                  f"{max(lag) * 1000:>10.2f} {stream.lines:>8} {dropped:>8} {stream.failures:>5}/{errors:<5}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--write-us", type=float, default=50, help="microseconds each sink write blocks")
+    parser.add_argument("--rates", type=lambda value: [int(rate) for rate in value.split(",")],
+                        default=[1000, 5000, 20000], help="records per second to log")
+    parser.add_argument("--duration", type=float, default=2)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,77 @@
+"""Compare the memory of case, reminder and timer records: dicts with datetimes vs slotted records.
+
+Builds N of each kind the way a restore produces them, from persisted
+JSON rows. The old path decoded rows with ISO timestamps into dicts
+holding datetimes. The new one decodes rows with integer timestamps into
+Records with interned status/phase strings. Reports traced bytes per
+record and the untraced decode time.
+
+    python benchmarks/bench_records.py [count]
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from main import CaseRecord, ReminderRecord, TimerRecord, _decode_record, _encode_record, epoch  # noqa: E402
+
+_DATETIME_FIELDS = ('time', 'set_time', 'created_at', 'closed_at', 'start_time', 'phase_ends_at')
+
+
+def decode_dict(raw):
+    """How rows were decoded before records: a dict with datetime values"""
+    data = json.loads(raw)
+    for field in _DATETIME_FIELDS:
+        if isinstance(data.get(field), str):
+            data[field] = datetime.fromisoformat(data[field])
+    return data
+
+
+def rows(kind, count, now, iso):
+    for i in range(count):
+        if kind == 'case':
+            record = CaseRecord(100_000_000_000_000_000 + i, 200_000_000_000_000_000 + i, now - i)
+        elif kind == 'reminder':
+            record = ReminderRecord(now + 60 * (i % 10_000), f"Revise chapter {i % 40}", now)
+            record.id = i
+        else:
+            record = TimerRecord(25, 5, 4, now - i % 1500, channel_id=300_000_000_000_000_000 + i % 50, guild_id=1)
+        data = record.to_dict()
+        if iso:  # how rows were written before records
+            for field in record.TIMESTAMPS:
+                if data[field] is not None:
+                    data[field] = datetime.utcfromtimestamp(data[field])
+        yield _encode_record(data)
+
+
+def measure(raws, decode):
+    start = time.perf_counter()
+    records = [decode(raw) for raw in raws]
+    elapsed = time.perf_counter() - start
+    del records
+    tracemalloc.start()
+    records = [decode(raw) for raw in raws]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(records), elapsed, records
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{count} records of each kind")
+    print(f"{'kind':<9} {'dict B/rec':>10} {'record B/rec':>12} {'saved':>6} {'dict load s':>11} {'record load s':>13}")
+    now = epoch(datetime.utcnow())
+    for kind, record_type in (('case', CaseRecord), ('reminder', ReminderRecord), ('timer', TimerRecord)):
+        old_size, old_time, old = measure(list(rows(kind, count, now, iso=True)), decode_dict)
+        new_size, new_time, new = measure(list(rows(kind, count, now, iso=False)), lambda raw: _decode_record(raw, record_type))
+        assert all(epoch(old[i][field]) == getattr(new[i], field) for i in (0, count - 1) for field in record_type.TIMESTAMPS
+                   if old[i].get(field) is not None)
+        del old, new
+        print(f"{kind:<9} {old_size:>10.0f} {new_size:>12.0f} {1 - new_size / old_size:>6.0%} {old_time:>11.2f} {new_time:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
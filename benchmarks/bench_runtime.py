@@ -0,0 +1,142 @@
+"""Compare the default and fast runtime profiles.
+
+Each profile runs in its own interpreter, since the event loop policy and
+JSON codec are chosen at startup. The child times state record and log
+record encoding, event-loop task switching, and bursts of concurrent
+requests against a local HTTP server through the profile's connector. It
+also counts how many connections the server saw. Parts of the fast
+profile that aren't installed fall back, and the "runtime" column shows
+what actually ran.
+
+    python benchmarks/bench_runtime.py [--records 100000] [--requests 2000] [--concurrency 200] [--bursts 5]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def bench_json(main, count):
+    now = int(time.time())
+    records = [main.TimerRecord(25, 5, 4, now, channel_id=20_000 + i, guild_id=1) for i in range(count)]
+    start = time.perf_counter()
+    encoded = [main._encode_record(record.to_dict()) for record in records]
+    decoded = [main._decode_record(raw, main.TimerRecord) for raw in encoded]
+    state = time.perf_counter() - start
+    assert decoded[-1].to_dict() == records[-1].to_dict()
+
+    formatter = main.StructuredFormatter(as_json=True)
+    log_records = []
+    for i in range(count):
+        record = logging.LogRecord("main", logging.INFO, __file__, 0, "relayed message", None, None)
+        record.context = {'case_id': i, 'user_id': 10_000 + i}
+        record.latency_ms = 0.42
+        log_records.append(record)
+    start = time.perf_counter()
+    for record in log_records:
+        formatter.format(record)
+    logs = time.perf_counter() - start
+    return state / count, logs / count
+
+
+async def bench_loop(switches):
+    """Two tasks handing a token back and forth through queues"""
+    ping, pong = asyncio.Queue(), asyncio.Queue()
+
+    async def echo():
+        for _ in range(switches):
+            await pong.put(await ping.get())
+
+    task = asyncio.create_task(echo())
+    start = time.perf_counter()
+    for i in range(switches):
+        await ping.put(i)
+        await pong.get()
+    await task
+    return (time.perf_counter() - start) / switches
+
+
+async def bench_http(main, requests, concurrency, bursts):
+    import aiohttp
+    from aiohttp import web
+
+    connections = set()
+
+    async def handle(request):
+        connections.add(id(request.transport))
+        await asyncio.sleep(0.002)  # server think time
+        return web.json_response({'id': '1', 'channel_id': '2', 'content': 'ok'})
+
+    app = web.Application()
+    app.router.add_post('/channels/{channel_id}/messages', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/channels/2/messages"
+
+    # What discord.py builds when no connector is configured
+    connector = main.http_connector() or aiohttp.TCPConnector(limit=0)
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def one():
+            async with gate:
+                start = time.perf_counter()
+                async with session.post(url, json={'content': 'Reminder!'}) as response:
+                    await response.read()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(bursts):
+            await asyncio.gather(*(one() for _ in range(requests // bursts)))
+            await asyncio.sleep(0.2)  # idle gap between bursts
+        elapsed = time.perf_counter() - start - 0.2 * bursts
+    await runner.cleanup()
+    latencies.sort()
+    return len(latencies) / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], len(connections)
+
+
+def child(args):
+    os.environ['STATE_BACKEND'] = 'memory'
+    import main
+    active = main.apply_runtime_profile()
+    runtime = f"{active['loop']}/{active['json']}/{active['http']}"
+    state_cost, log_cost = bench_json(main, args.records)
+
+    async def run():
+        return await bench_loop(args.records), await bench_http(main, args.requests, args.concurrency, args.bursts)
+
+    switch_cost, (throughput, p50, p99, connections) = asyncio.run(run())
+    print(f"{main.RUNTIME_PROFILE:<8} {runtime:<24} {state_cost * 1e6:>9.2f} {log_cost * 1e6:>9.2f} "
+          f"{switch_cost * 1e6:>9.2f} {throughput:>8.0f} {p50 * 1000:>8.2f} {p99 * 1000:>8.2f} {connections:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000, help="records encoded and loop switches timed")
+    parser.add_argument("--requests", type=int, default=2000, help="HTTP requests in total")
+    parser.add_argument("--concurrency", type=int, default=200, help="requests in flight at once")
+    parser.add_argument("--bursts", type=int, default=5, help="bursts the requests are split into")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print(f"{args.records} records, {args.requests} requests in {args.bursts} bursts, {args.concurrency} in flight")
+    print(f"{'profile':<8} {'runtime (loop/json/http)':<24} {'state us':>9} {'log us':>9} {'switch us':>9} "
+          f"{'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'conns':>6}")
+    for profile in ("default", "fast"):
+        env = dict(os.environ, RUNTIME_PROFILE=profile)
+        subprocess.run([sys.executable, __file__, "--child"] + sys.argv[1:], env=env, check=True,
+                       stderr=subprocess.DEVNULL)  # startup logs
+
+
+if __name__ == "__main__":
+    main()
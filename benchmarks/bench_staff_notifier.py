@@ -0,0 +1,135 @@
+"""Compare announcing every new support case inline with the burst-aware StaffNotifier.
+
+A flood of cases arrives within a few seconds, against a staff channel
+whose posts and thread creations share one rate-limit bucket. The inline
+baseline does what process_support_case used to do: ping @everyone, open
+a thread on the announcement, and only then confirm to the user. The
+notifier path runs the real DM handler, which confirms first and queues
+the announcement. Each user sends a follow-up DM straight after their
+confirmation, before their thread may exist; the run checks that every
+follow-up ends up in its case thread. With --outage the staff channel
+answers 503 for that many seconds first; the notifier retries with backoff
+and only then updates each confirmation to say staff were notified.
+Reports confirmation latency, @everyone pings, staff channel calls and the
+time until every case has a thread.
+
+    python benchmarks/bench_staff_notifier.py [--cases 100] [--seconds 2] [--limit 10] [--per 1] [--window 2] [--outage 0]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("STATE_BACKEND", "memory")
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import discord  # noqa: E402
+
+import main  # noqa: E402
+from fakes import FakeGateway, FakeGuild, FakeHTTP, FakeUser, RateLimitedTextChannel, install  # noqa: E402
+
+
+async def arrivals(args, handle):
+    """Start `handle(i)` for each case, spread evenly over args.seconds; return confirmation latencies"""
+    loop = asyncio.get_running_loop()
+    latencies = []
+
+    async def one(i):
+        start = loop.time()
+        await handle(i)
+        latencies.append(loop.time() - start)
+
+    tasks = []
+    begin = loop.time()
+    for i in range(args.cases):
+        delay = begin + i * args.seconds / args.cases - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(i)))
+    await asyncio.gather(*tasks)
+    return sorted(latencies)
+
+
+async def inline(args, http, guild):
+    """Baseline: post, open the thread, then confirm"""
+    channel = RateLimitedTextChannel(http, guild, args.limit, args.per)
+    start = time.perf_counter()
+
+    async def handle(i):
+        message = await channel.send("@everyone", embed=discord.Embed(title=f"🆘 New Support Case #{i}"))
+        await message.create_thread(name=f"Case #{i}", auto_archive_duration=1440)
+    latencies = await arrivals(args, handle)
+    return latencies, channel.pings, channel.bucket.calls, time.perf_counter() - start, len(channel.threads)
+
+
+async def notifier(args, http, guild):
+    bot = main.bot
+    channel = RateLimitedTextChannel(http, guild, args.limit, args.per)
+    channel.id = main.STAFF_CHANNEL_ID
+    _, channels = install(bot, http, channel)
+    bot.get_channel = lambda channel_id: channels.get(channel_id) or channel.threads.get(channel_id)
+    bot._connection.user = FakeUser(http, name="DungeonKeeper", bot=True)
+    gateway = FakeGateway(bot, http)
+    await bot.load_cog("support")
+    bot.staff_notifier.window = args.window
+    bot.dm_queue.start()
+    await bot.cluster.tick()  # take the staff bridge, which starts the notifier
+
+    start = time.perf_counter()
+    channel.bucket.down_until = asyncio.get_running_loop().time() + args.outage
+    users = [FakeUser(http) for _ in range(args.cases)]
+
+    async def handle(i):
+        bot.support_sessions.begin_case(users[i].id)
+        await gateway.dm(users[i], f"Case {i}: my timer never finished")
+    latencies = await arrivals(args, handle)
+    for user in users:
+        await gateway.dm(user, "Any news?")  # most threads don't exist yet
+    while len(bot.staff_notifier):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    case_ids = [case_id for user in users for case_id in bot.cases.for_user(user.id)]
+    assert all(bot.cases.get(case_id).thread_id in channel.threads for case_id in case_ids)
+    assert all(thread.sent >= 1 for thread in channel.threads.values())  # follow-up relayed into every thread
+    while not all(user.dm_channel.last is not None and user.dm_channel.last.edited for user in users):
+        await asyncio.sleep(0.01)  # every confirmation updated to say staff were notified
+    bot.dm_queue.stop()
+    return latencies, channel.pings, channel.bucket.calls, elapsed, len(channel.threads), dict(bot.staff_notifier.counters)
+
+
+def row(label, latencies, pings, calls, elapsed, threads):
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{label:<9} {p50:>14.1f} {p99:>14.1f} {pings:>6} {calls:>14} {threads:>8} {elapsed:>14.2f}")
+
+
+async def main_async(args):
+    http = FakeHTTP(latency=0.05)
+    guild = FakeGuild(http)
+    print(f"{args.cases} cases over {args.seconds:.0f} s, staff channel limited to {args.limit} calls per {args.per:.0f} s, "
+          f"digest window {args.window:.0f} s, {args.outage:.0f} s outage")
+    print(f"{'mode':<9} {'confirm p50 ms':>14} {'confirm p99 ms':>14} {'pings':>6} {'channel calls':>14} "
+          f"{'threads':>8} {'all threads s':>14}")
+    row("inline", *await inline(args, http, guild))
+    *result, counters = await notifier(args, http, guild)
+    row("notifier", *result)
+    print(f"notifier: {counters.get('announced', 0)} announced alone, {counters.get('digested', 0)} in "
+          f"{counters.get('digests', 0)} digests, {counters.get('held', 0)} follow-ups held until their thread existed, "
+          f"{counters.get('retried', 0)} retries after failures")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=2, help="seconds the flood of cases arrives over")
+    parser.add_argument("--limit", type=int, default=10, help="staff channel calls per bucket")
+    parser.add_argument("--per", type=float, default=1, help="staff channel bucket length in seconds")
+    parser.add_argument("--window", type=float, default=2, help="digest window in seconds")
+    parser.add_argument("--outage", type=float, default=0, help="seconds the staff channel fails with 503 at the start")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async(parse_args()))
@@ -0,0 +1,72 @@
+"""Measure what the SQLite write-behind store adds to command latency.
+
+Simulates a burst of XP/reminder/case updates, comparing the in-memory
+backend against SQLite, and samples event-loop lag while batches flush.
+
+    python benchmarks/bench_state_store.py [commands]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from main import CaseRecord, ReminderRecord, SQLiteStateStore, StateStore, epoch  # noqa: E402
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+async def lag_sampler(samples, stop, interval=0.005):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append((loop.time() - start - interval) * 1000)
+
+
+async def run(store, commands):
+    await store.open()
+    lag, stop = [], asyncio.Event()
+    sampler = asyncio.create_task(lag_sampler(lag, stop))
+    latencies = []
+    now = datetime.utcnow()
+    for i in range(commands):
+        start = time.perf_counter()
+        # One "command" worth of state changes
+        store.append_xp(i % 7, i % 5000, 10, now)
+        store.put_reminder(i, i % 5000, ReminderRecord(epoch(now) + 60 * (i % 600), 'study', epoch(now)))
+        store.put_case(i, CaseRecord(i, i, epoch(now)))
+        await store.next_id('case_counter')
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+        if i % 50 == 0:
+            await asyncio.sleep(0.001)  # Let the flush task and sampler run between bursts
+    await store.flush()
+    stop.set()
+    await sampler
+    await store.close()
+    return latencies, lag
+
+
+async def main():
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [
+            ("memory", StateStore()),
+            ("sqlite", SQLiteStateStore(os.path.join(tmp, "state.db"), flush_interval=0.05)),
+        ]
+        print(f"{commands} simulated commands")
+        print(f"{'backend':<8} {'p50 us':>8} {'p99 us':>8} {'mean us':>8} {'loop lag p99 ms':>16}")
+        for name, store in backends:
+            latencies, lag = await run(store, commands)
+            print(f"{name:<8} {percentile(latencies, 50):>8.2f} {percentile(latencies, 99):>8.2f} "
+                  f"{statistics.mean(latencies):>8.2f} {percentile(lag or [0.0], 99):>16.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,214 @@
+"""Compare voice study-time tracking with one write per event and with batched daily rollups.
+
+Members of one guild join, leave and hop between voice channels over the
+simulated past day (so sessions cross midnight). The
+per-event baseline writes each finished session to SQLite as soon as the
+member leaves or moves. The StudyTimeTracker writes its counters every
+flush interval instead. Halfway through, the gateway drops for a few
+minutes, and the events in that window are lost. The tracker reconciles
+with the guild's voice states afterwards; the baseline keeps whatever
+sessions it had. Both report store transactions, rows, wall time, how many
+sessions disagreed with the guild right after the outage and how far the
+credited time is from the truth. The tracker's totals are then checked
+against what a fresh store loads back.
+
+    python benchmarks/bench_study_time.py [--members 2000] [--channels 20] [--churn 6] [--hours 24] [--outage 300]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from fakes import FakeGuild, FakeHTTP, FakeMember  # noqa: E402
+from main import SQLiteStateStore, StudyTimeTracker, from_epoch, xp_period  # noqa: E402
+
+STEP = 10  # simulated seconds between batches of events
+
+
+def simulate(args, seed=1):
+    """Yield (now, member, before, after, missed) voice events and keep the fake guild's voice states current"""
+    rng = random.Random(seed)
+    http = FakeHTTP(latency=0)
+    guild = FakeGuild(http)
+    channels = [guild.voice_channel(0) for _ in range(args.channels)]
+    members = [FakeMember(http, guild) for _ in range(args.members)]
+    start = (int(time.time()) - args.hours * 3600) // 60 * 60
+    end = start + args.hours * 3600
+    outage = (start + (end - start) // 2, start + (end - start) // 2 + args.outage)
+    per_step = args.members * args.churn / 3600 * STEP
+    carry = 0.0
+    for now in range(start, end, STEP):
+        carry += per_step
+        for _ in range(int(carry)):
+            member = rng.choice(members)
+            before = member.voice.channel if member.voice else None
+            if before is None:
+                after = rng.choice(channels)
+            elif rng.random() < 0.5:
+                after = None
+            else:
+                after = rng.choice([channel for channel in channels if channel is not before])
+            if before is not None:
+                before.members.remove(member)
+            if after is not None:
+                after.members.append(member)
+                member.voice = SimpleNamespace(channel=after, mute=False, deaf=False)
+            else:
+                member.voice = None
+            yield now, member, before, after, outage[0] <= now < outage[1]
+        carry -= int(carry)
+    yield end, guild, None, None, outage
+
+
+def wrong_sessions(sessions, guild):
+    """Sessions ({user_id: channel_id}) that don't match who is in which channel"""
+    present = {user_id: channel.id for channel in guild.voice_channels for user_id in channel.voice_states}
+    return (sum(1 for user_id, channel_id in sessions.items() if present.get(user_id) != channel_id)
+            + sum(1 for user_id in present if user_id not in sessions))
+
+
+class Truth:
+    """Seconds each member actually spent in voice"""
+    def __init__(self):
+        self.joined = {}
+        self.seconds = 0
+
+    def event(self, now, member, before, after):
+        if before is None:
+            self.joined[member.id] = now
+        elif after is None:
+            self.seconds += now - self.joined.pop(member.id)
+
+    def close(self, now):
+        self.seconds += sum(now - joined for joined in self.joined.values())
+
+
+async def per_event(args, path):
+    """Baseline: every leave or move writes the finished session straight away"""
+    store = SQLiteStateStore(path, flush_interval=3600)
+    await store.open()
+    sessions, truth = {}, Truth()
+    transactions = rows = 0
+    outage_seen, wrong = False, None
+    started_at = time.perf_counter()
+    for now, member, before, after, missed in simulate(args):
+        if before is None and after is None:
+            break
+        if missed:
+            outage_seen = True
+        elif outage_seen and wrong is None:
+            wrong = wrong_sessions({user_id: channel_id for user_id, (channel_id, _) in sessions.items()}, member.guild)
+        truth.event(now, member, before, after)
+        if missed:
+            continue
+        session = sessions.pop(member.id, None)
+        if session is not None:
+            channel_id, joined = session
+            store.add_study_time([(member.guild.id, xp_period('daily', from_epoch(joined)), member.id, channel_id, now - joined)])
+            await store.flush()
+            transactions += 1
+            rows += 1
+        if after is not None:
+            sessions[member.id] = (after.id, now)
+    elapsed = time.perf_counter() - started_at
+    truth.close(now)
+    credited = await _stored_seconds(store)
+    credited += sum(now - joined for _, joined in sessions.values())
+    await store.close()
+    return transactions, rows, elapsed, credited - truth.seconds, wrong
+
+
+async def batched(args, path):
+    store = SQLiteStateStore(path, flush_interval=3600)
+    await store.open()
+    clock = [0]
+    awarded = []
+    bot = SimpleNamespace(state_store=store, add_xp=lambda user_id, amount, guild_id=None: awarded.append(amount))
+    tracker = StudyTimeTracker(bot, interval=args.interval, checkpoint=args.checkpoint, clock=lambda: clock[0])
+    truth = Truth()
+    transactions = rows = 0
+    next_flush = None
+    outage_seen, wrong = False, None
+    started_at = time.perf_counter()
+    for now, member, before, after, missed in simulate(args):
+        clock[0] = now
+        if next_flush is None:
+            next_flush = now + args.interval
+        if now >= next_flush or (before is None and after is None):
+            written = tracker.counters['rows_written']
+            tracker.flush(checkpoint_all=before is None and after is None)  # the last one, as on shutdown
+            await store.flush()
+            transactions += 1
+            rows += tracker.counters['rows_written'] - written
+            next_flush += args.interval
+        if before is None and after is None:
+            guild = member
+            break
+        if missed and not outage_seen:
+            outage_seen = True
+            tracker.disconnected()
+        if not missed and outage_seen and wrong is None:
+            tracker.reconcile([member.guild])  # what on_ready does after the new gateway session
+            wrong = wrong_sessions({user_id: session[0] for (_, user_id), session in tracker._sessions.items()}, member.guild)
+        truth.event(now, member, before, after)
+        if not missed:
+            tracker.update(member, SimpleNamespace(channel=before), SimpleNamespace(channel=after))
+    elapsed = time.perf_counter() - started_at
+    truth.close(now)
+    credited = await _stored_seconds(store)
+    present = [(guild.id, user_id) for channel in guild.voice_channels for user_id in channel.voice_states]
+    await store.close()
+
+    # What /rank reads must be what the next startup loads back
+    reopened = SQLiteStateStore(path, flush_interval=3600)
+    state = await reopened.open()
+    loaded = {(guild_id, window, user_id): seconds for guild_id, window, _, user_id, seconds in state['study_time']}
+    await reopened.close()
+    for key in present:
+        for window in ('all', 'weekly', 'daily'):
+            stored = loaded.get((key[0], window, key[1]), 0)
+            if xp_period(window, from_epoch(clock[0])) == xp_period(window, datetime.utcnow()):
+                assert stored == tracker.seconds(key[0], key[1], window), (key, window)
+    return transactions, rows, elapsed, credited - truth.seconds, wrong, sum(awarded)
+
+
+async def _stored_seconds(store):
+    def total():
+        return store._conn.execute("SELECT COALESCE(SUM(seconds), 0) FROM study_time").fetchone()[0]
+    return await asyncio.get_running_loop().run_in_executor(store._executor, total)
+
+
+async def main(args):
+    events = int(args.members * args.churn * args.hours)
+    print(f"{args.members} members, {args.channels} channels, ~{events} voice events over {args.hours} h, "
+          f"{args.outage} s gateway outage, flush every {args.interval:.0f} s")
+    print(f"{'mode':<10} {'transactions':>12} {'rows':>8} {'wall s':>7} {'wrong sessions':>14} {'credit error s':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        transactions, rows, elapsed, error, wrong = await per_event(args, os.path.join(tmp, "per_event.db"))
+        print(f"{'per-event':<10} {transactions:>12} {rows:>8} {elapsed:>7.2f} {wrong:>14} {error:>14}")
+        transactions, rows, elapsed, error, wrong, xp = await batched(args, os.path.join(tmp, "batched.db"))
+        print(f"{'batched':<10} {transactions:>12} {rows:>8} {elapsed:>7.2f} {wrong:>14} {error:>14}")
+    print(f"batched: {xp} XP awarded for voice time; rollups reloaded from the store match /rank")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--churn", type=float, default=6, help="voice events per member per hour")
+    parser.add_argument("--hours", type=int, default=24, help="simulated hours")
+    parser.add_argument("--outage", type=int, default=300, help="simulated seconds of lost gateway events")
+    parser.add_argument("--interval", type=float, default=60, help="simulated seconds between batches")
+    parser.add_argument("--checkpoint", type=int, default=900, help="simulated seconds open sessions go uncredited at most")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,73 @@
+"""Replay a DM flood through the support bridge.
+
+Sends N DMs from a mix of normal users and spammers through
+DungeonKeeper.handle_dm_message on a simulated clock and reports how many
+prompts/views the bot produced, how much session state is held and the
+per-DM handling cost.
+
+    python benchmarks/bench_support_sessions.py [dms]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import main  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def run():
+    dms = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rng = random.Random(7)
+    clock = Clock()
+    bot = main.DungeonKeeper()
+    bot.support_sessions = main.SupportSessions(clock=clock)
+
+    sent = {'prompts': 0, 'throttle_notices': 0, 'other': 0}
+
+    def deliver(user, priority, **kwargs):
+        if 'view' in kwargs:
+            sent['prompts'] += 1
+        elif kwargs.get('content', '').startswith("⏳"):
+            sent['throttle_notices'] += 1
+        else:
+            sent['other'] += 1
+
+    bot.dm_queue.deliver = deliver
+
+    # 20 spammers produce half the traffic; 2000 regular users the rest
+    spammers = list(range(20))
+    regulars = list(range(1000, 3000))
+    duration = 600.0  # simulated seconds
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(dms):
+        clock.now = duration * i / dms
+        user_id = rng.choice(spammers) if i % 2 else rng.choice(regulars)
+        author = SimpleNamespace(id=user_id, display_name=f"user{user_id}", avatar=None)
+        await bot.handle_dm_message(SimpleNamespace(author=author, content="help", attachments=[]))
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+
+    print(f"{dms} DMs over {duration:.0f} simulated seconds "
+          f"({len(spammers)} spammers, {len(regulars)} regular users)")
+    print(f"prompts (embed + View) sent: {sent['prompts']} (was {dms} before throttling)")
+    print(f"throttle notices: {sent['throttle_notices']}")
+    print(f"session entries held at end: {len(bot.support_sessions)}")
+    print(f"handling cost: {elapsed / dms * 1e6:.1f} us/DM, traced peak {peak / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,73 @@
+"""Drive the pomodoro TimerEngine with many concurrent timers.
+
+Starts N timers whose phases end within a few seconds, lets the engine run
+every focus -> break -> done transition and reports throughput, task count
+and traced memory.
+
+    python benchmarks/bench_timer_engine.py [timers]
+"""
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from main import StateStore, TimerEngine  # noqa: E402
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    delivered = 0
+
+    class Channel:
+        async def send(self, *args, **kwargs):
+            nonlocal delivered
+            delivered += 1
+
+    channel = Channel()
+    user_xp = {}
+
+    def add_xp(user_id, amount, guild_id=None):
+        user_xp[user_id] = user_xp.get(user_id, 0) + amount
+        return user_xp[user_id]
+
+    bot = SimpleNamespace(
+        active_timers={}, add_xp=add_xp, state_store=StateStore(),
+        get_channel=lambda channel_id: channel, get_user=lambda user_id: None,
+    )
+    engine = TimerEngine(bot)
+
+    tracemalloc.start()
+    now = time.time()
+    for user_id in range(count):
+        timer = engine.start_timer(user_id, 1, 1, 1, channel_id=1)
+        # Compress minutes into seconds so the run finishes quickly
+        timer.focus_time = timer.break_time = 0
+        timer.phase_ends_at = now + 1 + (user_id % 1000) / 1000
+    # Re-key the heap on the compressed deadlines
+    engine._heap.clear()
+    for user_id, timer in bot.active_timers.items():
+        engine.resume(user_id, timer)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tasks_before = len(asyncio.all_tasks())
+    engine.start()
+    start = time.perf_counter()
+    tasks_running = len(asyncio.all_tasks())
+    while bot.active_timers or delivered < 2 * count:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    engine.stop()
+
+    print(f"{count} timers, {2 * count} transitions")
+    print(f"engine tasks: {tasks_running - tasks_before} (independent of timer count)")
+    print(f"traced memory after scheduling: {peak / 1024 / 1024:.1f} MiB ({peak / count:.0f} B/timer)")
+    print(f"all phases delivered {elapsed:.2f} s after start (deadlines spread over 1-2 s, "
+          f"{2 * count / elapsed:.0f} transitions/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
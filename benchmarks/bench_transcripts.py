@@ -0,0 +1,123 @@
+"""Measure case transcript export and transcript index lookups.
+
+Exports a long fake case thread (paged 100 messages per REST call) with
+the TranscriptExporter and compares its peak memory with collecting the
+whole history first. Then fills the transcript index and times lookups
+by user and by close date.
+
+    python benchmarks/bench_transcripts.py [messages] [--indexed 100000]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from fakes import FakeGuild, FakeHTTP, FakeMessage, FakeThread, FakeUser  # noqa: E402
+from main import CaseRecord, SQLiteStateStore, TranscriptExporter, epoch  # noqa: E402
+
+
+class LongThread(FakeThread):
+    """Thread whose history is built page by page, as discord.py builds it from each REST response"""
+    def __init__(self, http, guild, count):
+        super().__init__(http, guild, "Case #1")
+        self.count = count
+        self.user, self.staff = FakeUser(http), FakeUser(http, name="staff")
+
+    async def history(self, limit=None, oldest_first=False):
+        rng = random.Random(1)
+        for start in range(0, self.count, 100):
+            await self.http.request("GET /channels/{channel_id}/messages")
+            page = []
+            for i in range(start, min(start + 100, self.count)):
+                text = " ".join(rng.choice(("pomodoro", "timer", "xp", "broken", "thanks", "restart")) for _ in range(30))
+                page.append(FakeMessage(self.http, self, self.user if i % 2 else self.staff, text))
+            for message in page:
+                yield message
+
+
+async def naive_export(thread, path):
+    """Collect the whole history, then write it"""
+    messages = [message async for message in thread.history(limit=None, oldest_first=True)]
+    with gzip.open(path, 'wt') as f:
+        for message in messages:
+            f.write(json.dumps(TranscriptExporter._record(message)) + "\n")
+
+
+async def main(args):
+    http = FakeHTTP(latency=args.latency / 1000)
+    thread = LongThread(http, FakeGuild(http), args.messages)
+    user = thread.user
+    now = datetime.utcnow()
+    case_data = CaseRecord(user.id, thread.id, epoch(now))
+    case_data.status, case_data.closed_at, case_data.closed_by = 'closed', epoch(now), 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        start = time.perf_counter()
+        await naive_export(thread, os.path.join(tmp, "naive.jsonl.gz"))
+        naive_time = time.perf_counter() - start
+        naive_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        store = SQLiteStateStore(os.path.join(tmp, "state.db"), flush_interval=3600)
+        await store.open()
+        exporter = TranscriptExporter(store, os.path.join(tmp, "transcripts"))
+        tracemalloc.start()
+        start = time.perf_counter()
+        await exporter.export(1, case_data, thread)
+        stream_time = time.perf_counter() - start
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        transcript = await store.get_transcript(1)
+        assert transcript['messages'] == args.messages
+
+        # Index lookups against many past transcripts
+        rng = random.Random(2)
+        users = max(1, args.indexed // 20)
+        for case_id in range(2, args.indexed + 2):
+            store.put_transcript(case_id, {
+                'user_id': rng.randrange(users), 'closed_at': now - timedelta(minutes=rng.randrange(365 * 24 * 60)),
+                'path': exporter.path_for(case_id), 'messages': 50, 'bytes': 4096,
+            })
+        await store.flush()
+
+        def timed(fn, repeat=200):
+            async def run():
+                begin = time.perf_counter()
+                for _ in range(repeat):
+                    await fn()
+                return (time.perf_counter() - begin) / repeat
+            return run()
+
+        by_user = await timed(lambda: store.list_transcripts(rng.randrange(users), None, None, 15))
+        day = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
+        by_date = await timed(lambda: store.list_transcripts(None, day, day + timedelta(days=1), 15))
+        await exporter.close()
+        await store.close()
+
+    print(f"{args.messages} messages, {args.latency} ms per history page")
+    print(f"collect then write: {naive_time:7.2f} s, peak traced {naive_peak / 2**20:7.1f} MiB")
+    print(f"streamed export:    {stream_time:7.2f} s, peak traced {stream_peak / 2**20:7.1f} MiB, "
+          f"{transcript['bytes'] / 1024:.0f} KiB on disk")
+    print(f"index of {args.indexed} transcripts: by user {by_user * 1000:.2f} ms, by date {by_date * 1000:.2f} ms")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("messages", nargs="?", type=int, default=50_000)
+    parser.add_argument("--latency", type=float, default=5, help="simulated ms per history page")
+    parser.add_argument("--indexed", type=int, default=100_000, help="past transcripts in the index")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
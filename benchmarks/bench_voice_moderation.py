@@ -0,0 +1,74 @@
+"""Wall-clock timings for bulk voice moderation against a mocked HTTP layer.
+
+Each member edit is a fake REST round trip with a fixed latency. The old
+/forcemute loop (one awaited edit at a time) is compared with
+VoiceModerator's bounded fan-out.
+
+    python benchmarks/bench_voice_moderation.py [latency_ms]
+"""
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from main import MODERATION_CONCURRENCY, VoiceModerator  # noqa: E402
+
+
+class FakeHTTP:
+    """Stand-in for the REST client: fixed latency, tracks peak in-flight requests"""
+    def __init__(self, latency):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+
+    async def request(self):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+
+class FakeMember:
+    def __init__(self, http, member_id):
+        self.http = http
+        self.id = member_id
+        self.display_name = f"member{member_id}"
+        self.voice = SimpleNamespace(mute=False, deaf=False)
+
+    async def edit(self, mute=None, deafen=None, voice_channel=None, reason=None):
+        await self.http.request()
+        if mute is not None:
+            self.voice.mute = mute
+
+
+async def sequential(members):
+    for member in members:
+        if not member.voice.mute:
+            await member.edit(mute=True)
+
+
+async def main():
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 120) / 1000
+    print(f"REST latency {latency * 1000:.0f} ms, concurrency {MODERATION_CONCURRENCY} per guild")
+    print(f"{'members':>7} {'sequential s':>13} {'engine s':>9} {'peak in-flight':>15}")
+    for size in (10, 50, 99):
+        http = FakeHTTP(latency)
+        start = time.perf_counter()
+        await sequential([FakeMember(http, i) for i in range(size)])
+        old = time.perf_counter() - start
+
+        http = FakeHTTP(latency)
+        moderator = VoiceModerator(concurrency=MODERATION_CONCURRENCY)
+        start = time.perf_counter()
+        results = await moderator.run('mute', 1, [FakeMember(http, i) for i in range(size)])
+        new = time.perf_counter() - start
+        assert len(results['done']) == size
+        print(f"{size:>7} {old:>13.2f} {new:>9.2f} {http.peak:>15}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
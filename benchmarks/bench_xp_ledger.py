@@ -0,0 +1,89 @@
+"""Measure the XP ledger: startup replay before/after compaction and windowed /rank lookups.
+
+Writes a month of XP gains across several guilds to a SQLite store, then
+compares restoring by replaying the whole ledger with restoring from
+compacted rollups, and a weekly leaderboard rescanned from the events with
+one read from the in-memory rollups.
+
+    python benchmarks/bench_xp_ledger.py [events]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from main import SQLiteStateStore, XPLedger, xp_period  # noqa: E402
+
+GUILDS = 20
+USERS = 20_000
+
+
+async def restore(path):
+    store = SQLiteStateStore(path, flush_interval=3600)
+    start = time.perf_counter()
+    state = await store.open()
+    ledger = XPLedger(store)
+    ledger.load(state['xp_rollups'], state['xp_events'])
+    elapsed = time.perf_counter() - start
+    await store.close()
+    return elapsed, len(state['xp_rollups']), len(state['xp_events']), ledger
+
+
+def rescan_weekly(events, guild_id, user_id, now):
+    """Weekly board the naive way: filter and sum every event, then sort"""
+    week = xp_period('weekly', now)
+    totals = {}
+    for event_guild, event_user, amount, at in events:
+        if event_guild == guild_id and xp_period('weekly', at) == week:
+            totals[event_user] = totals.get(event_user, 0) + amount
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    rank = next(i + 1 for i, (uid, _) in enumerate(ranked) if uid == user_id)
+    return rank, ranked[:5]
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    events = [(rng.randrange(GUILDS), rng.randrange(USERS), 10, now - timedelta(seconds=rng.randrange(30 * 86400)))
+              for _ in range(count)]
+    events.sort(key=lambda event: event[3])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.db")
+        writer = SQLiteStateStore(path, flush_interval=3600, compact_interval=float('inf'))
+        await writer.open()
+        for event in events:
+            writer.append_xp(*event)
+        await writer.flush()
+
+        replay, _, replayed, _ = await restore(path)
+        await writer.close()  # Compacts the ledger into rollups
+        compacted, rollups, tail, ledger = await restore(path)
+
+    guild_id, user_id = events[-1][0], events[-1][1]
+    start = time.perf_counter()
+    expected_rank, expected_top = rescan_weekly(events, guild_id, user_id, now)
+    rescan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        board = ledger.board(guild_id, 'weekly')
+        rank = board.index.rank(board.totals[user_id])
+        top = board.index.top()
+    lookup = (time.perf_counter() - start) / 10_000
+    assert rank <= expected_rank and [xp for _, xp in top] == [xp for _, xp in expected_top]
+
+    print(f"{count} XP events over 30 days, {GUILDS} guilds, {USERS} users")
+    print(f"restore by replaying the ledger: {replay * 1000:9.1f} ms ({replayed} events)")
+    print(f"restore from compacted rollups:  {compacted * 1000:9.1f} ms ({rollups} rollup rows, {tail} events)")
+    print(f"weekly board, rescan events:     {rescan * 1000:9.1f} ms")
+    print(f"weekly board, rollup lookup:     {lookup * 1e6:9.2f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
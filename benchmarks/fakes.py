@@ -0,0 +1,375 @@
+"""In-memory stand-ins for the Discord gateway and REST API.
+
+Just enough of discord.py's object surface to drive DungeonKeeper's
+handlers offline. Every REST-shaped call goes through FakeHTTP, which adds
+a configurable latency and counts requests per route.
+"""
+import asyncio
+import itertools
+import random
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import discord
+
+_ids = itertools.count(10_000_000)
+
+
+class FakeHTTP:
+    """Simulated REST layer: log-normal latency around `latency` seconds"""
+    def __init__(self, latency=0.05, jitter=0.25, seed=1):
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.requests = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def request(self, route):
+        self.requests[route] = self.requests.get(route, 0) + 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency * self.rng.lognormvariate(0, self.jitter))
+        finally:
+            self.in_flight -= 1
+
+    @property
+    def total(self):
+        return sum(self.requests.values())
+
+
+class FakeMessage:
+    def __init__(self, http, channel, author, content="", attachments=()):
+        self.http = http
+        self.id = next(_ids)
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.attachments = list(attachments)
+        self.embeds = []
+        self.guild = channel.guild
+        self.created_at = datetime.now(timezone.utc)
+        self.edited = None
+
+    async def create_thread(self, name, auto_archive_duration=1440):
+        await self.http.request("POST /channels/{channel_id}/messages/{message_id}/threads")
+        return FakeThread(self.http, self.channel.guild, name)
+
+    async def edit(self, **kwargs):
+        await self.http.request("PATCH /channels/{channel_id}/messages/{message_id}")
+        self.edited = kwargs
+
+    async def add_reaction(self, emoji):
+        await self.http.request("PUT /channels/{channel_id}/messages/{message_id}/reactions")
+
+
+class FakeAttachment:
+    def __init__(self, url, filename, size):
+        self.id = next(_ids)
+        self.url = url
+        self.filename = filename
+        self.size = size
+
+
+class FakeMessageable:
+    route = "POST /channels/{channel_id}/messages"
+    UPLOAD_CHUNK = 64 * 1024
+
+    def __init__(self, http, guild=None, name="channel"):
+        self.http = http
+        self.id = next(_ids)
+        if guild is not None:
+            self.guild = guild
+        self.name = name
+        self.sent = 0
+        self.uploaded_bytes = 0
+        self.last = None
+
+    async def send(self, content=None, file=None, **kwargs):
+        if file is not None:
+            # Read the upload the way aiohttp streams a multipart body
+            while True:
+                chunk = file.fp.read(self.UPLOAD_CHUNK)
+                if not chunk:
+                    break
+                self.uploaded_bytes += len(chunk)
+                await asyncio.sleep(0)
+        await self.http.request(self.route)
+        self.sent += 1
+        self.last = FakeMessage(self.http, self, None, content or "")
+        return self.last
+
+
+class FakeTextChannel(FakeMessageable):
+    async def create_thread(self, name, type=None, auto_archive_duration=1440):
+        await self.http.request("POST /channels/{channel_id}/threads")
+        return FakeThread(self.http, self.guild, name)
+
+
+class FakeThread(FakeMessageable, discord.Thread):
+    async def edit(self, **kwargs):
+        await self.http.request("PATCH /channels/{channel_id}")
+
+    async def history(self, limit=None, oldest_first=False):
+        await self.http.request("GET /channels/{channel_id}/messages")
+        return
+        yield
+
+
+class FakeDMChannel(FakeMessageable, discord.DMChannel):
+    pass
+
+
+class FakeUser:
+    def __init__(self, http, user_id=None, name=None, bot=False):
+        self.http = http
+        self.id = user_id or next(_ids)
+        self.name = name or f"user{self.id}"
+        self.display_name = self.name
+        self.mention = f"<@{self.id}>"
+        self.bot = bot
+        self.avatar = None
+        self.dm_channel = FakeDMChannel(http, name=f"dm-{self.id}")
+
+    async def send(self, content=None, **kwargs):
+        return await self.dm_channel.send(content, **kwargs)
+
+    def __str__(self):
+        return self.name
+
+
+class FakeMember(FakeUser):
+    def __init__(self, http, guild, user_id=None, voice_channel=None):
+        super().__init__(http, user_id)
+        self.guild = guild
+        self.voice = SimpleNamespace(channel=voice_channel, mute=False, deaf=False) if voice_channel else None
+
+    async def edit(self, mute=None, deafen=None, voice_channel=..., reason=None):
+        await self.http.request("PATCH /guilds/{guild_id}/members/{user_id}")
+        if mute is not None:
+            self.voice.mute = mute
+        if deafen is not None:
+            self.voice.deaf = deafen
+        if voice_channel is None and self.voice is not None:
+            self.voice.channel.members.remove(self)
+            self.voice = None
+
+
+class _AllowAll:
+    def __getattr__(self, name):
+        return True
+
+
+class FakeVoiceChannel:
+    def __init__(self, http, guild, name="Study Hall"):
+        self.http = http
+        self.guild = guild
+        self.id = next(_ids)
+        self.name = name
+        self.members = []
+        self.overwrites = {}
+        self.user_limit = 0
+        self.topic = None
+        self.edits = 0
+
+    @property
+    def voice_states(self):
+        return {member.id: member.voice for member in self.members}
+
+    def permissions_for(self, member):
+        return _AllowAll()
+
+    async def edit(self, overwrites=None, user_limit=None, topic=None, reason=None):
+        await self.http.request("PATCH /channels/{channel_id}")
+        self.edits += 1
+        if overwrites is not None:
+            self.overwrites = dict(overwrites)
+        if user_limit is not None:
+            self.user_limit = user_limit
+        if topic is not None:
+            self.topic = topic
+
+    async def create_invite(self, max_uses=0, max_age=0):
+        await self.http.request("POST /channels/{channel_id}/invites")
+        return SimpleNamespace(url=f"https://discord.gg/fake{next(_ids)}")
+
+
+class RateLimit:
+    """Bucket of `limit` calls per `per` seconds shared by a channel's rate-limited routes"""
+    def __init__(self, http, limit, per):
+        self.http = http
+        self.limit = limit
+        self.per = per
+        self.sent_at = []
+        self.calls = 0
+        self.down_until = 0.0  # loop time until which every call fails with a 503
+
+    async def take(self):
+        loop = asyncio.get_running_loop()
+        if loop.time() < self.down_until:
+            await self.http.request("POST /channels/{channel_id}/messages")
+            raise discord.HTTPException(SimpleNamespace(status=503, reason="Service Unavailable"), "upstream outage")
+        while True:
+            now = loop.time()
+            self.sent_at = [at for at in self.sent_at if now - at < self.per]
+            if len(self.sent_at) < self.limit:
+                break
+            await asyncio.sleep(self.sent_at[0] + self.per - now)
+        self.sent_at.append(loop.time())
+        self.calls += 1
+
+
+class RateLimitedTextChannel(FakeTextChannel):
+    """Text channel whose messages and thread creations share one RateLimit"""
+    def __init__(self, http, guild, limit, per, name="staff"):
+        super().__init__(http, guild, name)
+        self.bucket = RateLimit(http, limit, per)
+        self.pings = 0
+        self.threads = {}
+
+    def register(self, thread):
+        self.threads[thread.id] = thread
+        return thread
+
+    async def send(self, content=None, file=None, **kwargs):
+        await self.bucket.take()
+        self.pings += content == "@everyone"
+        message = await super().send(content, file=file, **kwargs)
+        create = message.create_thread
+
+        async def create_thread(name, auto_archive_duration=1440):
+            await self.bucket.take()
+            return self.register(await create(name, auto_archive_duration))
+        message.create_thread = create_thread
+        return message
+
+    async def create_thread(self, name, type=None, auto_archive_duration=1440):
+        await self.bucket.take()
+        return self.register(await super().create_thread(name, type, auto_archive_duration))
+
+
+class RateLimitedVoiceChannel(FakeVoiceChannel):
+    """Voice channel whose edits share one RateLimit"""
+    def __init__(self, http, guild, limit, per):
+        super().__init__(http, guild)
+        self.bucket = RateLimit(http, limit, per)
+
+    async def edit(self, **changes):
+        await self.bucket.take()
+        await super().edit(**changes)
+
+
+class FakeRole:
+    def __init__(self, role_id, name):
+        self.id = role_id
+        self.name = name
+
+
+class FakeGuild:
+    def __init__(self, http, name="Study Guild"):
+        self.http = http
+        self.id = next(_ids)
+        self.name = name
+        self.default_role = FakeRole(self.id, "@everyone")
+        self.me = FakeMember(http, self)
+        self.shard_id = 0
+        self.afk_channel = None
+        self.voice_channels = []
+        self.stage_channels = []
+
+    def voice_channel(self, members):
+        channel = FakeVoiceChannel(self.http, self)
+        for _ in range(members):
+            channel.members.append(FakeMember(self.http, self, voice_channel=channel))
+        self.voice_channels.append(channel)
+        return channel
+
+    def get_member(self, user_id):
+        for channel in self.voice_channels:
+            for member in channel.members:
+                if member.id == user_id:
+                    return member
+        return None
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def send_message(self, content=None, **kwargs):
+        await self.interaction.http.request("POST /interactions/{id}/{token}/callback")
+        self._done = True
+
+    async def defer(self, **kwargs):
+        await self.interaction.http.request("POST /interactions/{id}/{token}/callback")
+        self._done = True
+
+
+class FakeFollowup:
+    def __init__(self, http):
+        self.http = http
+
+    async def send(self, content=None, **kwargs):
+        await self.http.request("POST /webhooks/{application_id}/{token}")
+
+
+class FakeInteraction:
+    def __init__(self, http, user, guild=None, channel_id=None):
+        self.http = http
+        self.id = next(_ids)
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id if guild else None
+        self.channel_id = channel_id or next(_ids)
+        self.created_at = datetime.now(timezone.utc)
+        self.type = discord.InteractionType.application_command
+        self.extras = {}
+        self.command = None
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(http)
+
+    async def edit_original_response(self, **kwargs):
+        await self.http.request("PATCH /webhooks/{application_id}/{token}/messages/@original")
+
+
+class FakeGateway:
+    """Feeds events straight into the bot's handlers, as the gateway would"""
+    def __init__(self, bot, http):
+        self.bot = bot
+        self.http = http
+
+    def _message(self, channel, author, content, attachments=()):
+        message = FakeMessage(self.http, channel, author, content, attachments)
+        message._state = self.bot._connection
+        return message
+
+    async def dm(self, user, content="I need help", attachments=()):
+        await self.bot.on_message(self._message(user.dm_channel, user, content, attachments))
+
+    async def thread_message(self, thread, author, content):
+        await self.bot.on_message(self._message(thread, author, content))
+
+
+def install(bot, http, staff_channel):
+    """Point a DungeonKeeper at the fakes: user/channel lookups and REST fetches"""
+    users = {}
+    channels = {staff_channel.id: staff_channel}
+
+    def get_user(user_id):
+        return users.get(user_id)
+
+    async def fetch_user(user_id):
+        await http.request("GET /users/{user_id}")
+        return users.setdefault(user_id, FakeUser(http, user_id))
+
+    bot.get_user = get_user
+    bot.fetch_user = fetch_user
+    bot.get_channel = lambda channel_id: channels.get(channel_id)
+    return users, channels
+
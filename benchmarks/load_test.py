@@ -0,0 +1,190 @@
+"""Offline load test for DungeonKeeper's hot paths.
+
+Drives the real handlers in main.py and cogs/ through a simulated gateway and an
+in-memory REST layer (see fakes.py) at a fixed open-loop rate and reports
+throughput, p50/p99 latency and peak RSS per scenario.
+
+    python benchmarks/load_test.py                      # every scenario
+    python benchmarks/load_test.py rank forcemute --rate 200 --duration 5 --latency 80
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import time
+
+os.environ.setdefault("STATE_BACKEND", "memory")
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import main  # noqa: E402
+from fakes import FakeGateway, FakeGuild, FakeHTTP, FakeInteraction, FakeTextChannel, FakeUser, install  # noqa: E402
+
+
+class World:
+    """One bot wired to fake Discord objects"""
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(3)
+        self.http = FakeHTTP(latency=args.latency / 1000)
+        self.bot = main.bot
+        self.guild = FakeGuild(self.http)
+        self.staff_channel = FakeTextChannel(self.http, self.guild, "staff")
+        self.staff_channel.id = main.STAFF_CHANNEL_ID
+        self.users, self.channels = install(self.bot, self.http, self.staff_channel)
+        self.bot._connection.user = FakeUser(self.http, name="DungeonKeeper", bot=True)
+        self.gateway = FakeGateway(self.bot, self.http)
+        self.population = [self.user() for _ in range(args.users_cached)]
+
+        # Pre-populate the leaderboard so /rank works against a realistic board
+        for user_id in range(args.ranked_users):
+            self.bot.add_xp(user_id, 10 * self.rng.randrange(1, 500), self.guild.id)
+
+    def user(self):
+        user = FakeUser(self.http)
+        self.users[user.id] = user
+        return user
+
+    def interaction(self, user=None, voice_channel=None):
+        if voice_channel is not None:
+            user = voice_channel.members[0]
+            self.users[user.id] = user
+        return FakeInteraction(self.http, user or self.rng.choice(self.population), self.guild)
+
+
+def command(bot, name):
+    """A slash command's callback, bound to the cog it lives in"""
+    command = bot.tree.get_command(name)
+    return lambda *args: command.callback(command.binding, *args)
+
+
+def scenarios(world):
+    bot, rng = world.bot, world.rng
+    check_rank, pomodoro_timer, force_mute = command(bot, "rank"), command(bot, "pomodoro"), command(bot, "forcemute")
+    make_private, make_public = command(bot, "private"), command(bot, "public")
+    set_max_members, set_description = command(bot, "max"), command(bot, "desc")
+
+    async def dm():
+        await world.gateway.dm(world.user(), "Hello?")
+
+    async def support_case():
+        user = world.user()
+        bot.support_sessions.begin_case(user.id)
+        await world.gateway.dm(user, "My pomodoro timer never finished")
+
+    async def reminders():
+        now = int(time.time())
+        user = rng.choice(world.population)
+        await bot.add_reminder(user.id, main.ReminderRecord(now - 1, "Study!", now))
+        await bot.check_reminders()
+
+    async def rank():
+        await check_rank(world.interaction())
+
+    async def pomodoro():
+        interaction = world.interaction(world.user())
+        await pomodoro_timer(interaction, 25, 5)
+        bot.timer_engine.cancel(interaction.user.id)
+
+    voice_channel = world.guild.voice_channel(world.args.voice_members)
+
+    async def forcemute():
+        for member in voice_channel.members:
+            member.voice.mute = False
+        await force_mute(world.interaction(voice_channel=voice_channel))
+
+    async def voice_settings():
+        interaction = world.interaction(voice_channel=voice_channel)
+        await rng.choice([
+            lambda: make_private(interaction),
+            lambda: make_public(interaction),
+            lambda: set_max_members(interaction, rng.randrange(0, 99)),
+            lambda: set_description(interaction, "Quiet study"),
+        ])()
+
+    return {
+        'dm': dm,
+        'support_case': support_case,
+        'reminders': reminders,
+        'rank': rank,
+        'pomodoro': pomodoro,
+        'forcemute': forcemute,
+        'voice_settings': voice_settings,
+    }
+
+
+# Bulk moderation edits every member, so it gets a lower default rate
+DEFAULT_RATES = {'forcemute': 1}
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))] if samples else 0.0
+
+
+async def run_scenario(operation, rate, duration):
+    """Open-loop: start operations on schedule regardless of how long earlier ones take"""
+    loop = asyncio.get_running_loop()
+    latencies, errors = [], 0
+    total = int(rate * duration)
+
+    async def one():
+        nonlocal errors
+        start = loop.time()
+        try:
+            await operation()
+        except Exception:
+            errors += 1
+        latencies.append(loop.time() - start)
+
+    tasks = []
+    begin = loop.time()
+    for i in range(total):
+        delay = begin + i / rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one()))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - begin
+    return total / elapsed, latencies, errors
+
+
+async def main_async(args):
+    world = World(args)
+    bot = world.bot
+    await bot.load_cogs(main.COGS)
+    bot.dm_queue.start()
+    await bot.cluster.tick()  # take the scheduler and staff bridge duties
+    available = scenarios(world)
+    selected = args.scenarios or list(available)
+
+    print(f"{args.duration}s per scenario, REST latency {args.latency} ms, "
+          f"{args.ranked_users} ranked users, {args.voice_members} voice members")
+    print(f"{'scenario':<15} {'target/s':>8} {'ops/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6} {'REST calls':>10} {'peak RSS MiB':>12}")
+    for name in selected:
+        before = world.http.total
+        rate = args.rate or DEFAULT_RATES.get(name, 100)
+        throughput, latencies, errors = await run_scenario(available[name], rate, args.duration)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{name:<15} {rate:>8.1f} {throughput:>8.1f} {percentile(latencies, 50) * 1000:>8.2f} "
+              f"{percentile(latencies, 99) * 1000:>8.2f} {errors:>6} {world.http.total - before:>10} {rss:>12.1f}")
+
+    bot.dm_queue.stop()
+    bot.timer_engine.stop()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", help="scenarios to run (default: all)")
+    parser.add_argument("--rate", type=float, help="operations started per second (default: 100, forcemute 1)")
+    parser.add_argument("--duration", type=float, default=3, help="seconds per scenario")
+    parser.add_argument("--latency", type=float, default=50, help="mean simulated REST latency in ms")
+    parser.add_argument("--ranked-users", type=int, default=100_000, help="users on the XP leaderboard")
+    parser.add_argument("--users-cached", type=int, default=1_000, help="users the fake gateway knows about")
+    parser.add_argument("--voice-members", type=int, default=50, help="members in the voice channel")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async(parse_args()))
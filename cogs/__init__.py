@@ -0,0 +1 @@
+"""Feature cogs, each loaded as a discord.py extension by DungeonKeeper.load_cog"""
@@ -0,0 +1,183 @@
+"""Personal reminders, one-off or recurring; delivery is handled by the bot's ReminderScheduler"""
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+from main import (REMINDER_MAX_DAYS, REMINDER_MIN_INTERVAL, REMINDERS_PER_USER, CronRule, ReminderRecord,
+                  describe_rule, epoch, from_epoch)
+
+DURATION_UNITS = {'w': 604800, 'd': 86400, 'h': 3600, 'm': 60}
+DURATION_PART = re.compile(r"(\d+)([wdhm])")
+DISCORD_TIMESTAMP = re.compile(r"<t:(\d+)(?::[tTdDfFR])?>")
+CLOCK_TIME = re.compile(r"(\d{1,2}):(\d{2})")
+REPEAT_PRESETS = {'daily': 'every 86400', 'weekly': 'every 604800'}
+EXAMPLES = "Examples: `30m`, `1h30m`, `2d`, `18:30`, `2026-11-01 09:00` (UTC); repeat `daily`, `weekdays`, `every 2h`, `0 9 * * 1-5`"
+
+
+def parse_duration(text: str) -> int:
+    """'1h30m' -> 5400 seconds"""
+    text = text.lower().replace(" ", "")
+    if not text or DURATION_PART.sub("", text):
+        raise ValueError("durations are numbers with a unit: w, d, h or m (e.g. '1h30m')")
+    return sum(int(amount) * DURATION_UNITS[unit] for amount, unit in DURATION_PART.findall(text))
+
+
+def parse_when(text: str, now: datetime) -> datetime:
+    """A duration from now, a UTC clock time (next occurrence), a UTC date and time, or a Discord timestamp"""
+    text = text.strip()
+    match = DISCORD_TIMESTAMP.fullmatch(text)
+    if match:
+        return from_epoch(int(match.group(1)))
+    match = CLOCK_TIME.fullmatch(text)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2))
+        if hour > 23 or minute > 59:
+            raise ValueError(f"{text} is not a time of day")
+        when = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return when if when > now else when + timedelta(days=1)
+    if text[:1].isdigit() and '-' in text:
+        try:
+            when = datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f"{text} is not a date and time like 2026-11-01 09:00") from None
+        return from_epoch(epoch(when)) if when.tzinfo else when
+    return now + timedelta(seconds=parse_duration(text))
+
+
+def parse_repeat(text: str, anchor: datetime) -> str:
+    """A repeat option -> stored rule ("every <seconds>" or a cron expression)"""
+    text = text.lower().strip()
+    if text in REPEAT_PRESETS:
+        return REPEAT_PRESETS[text]
+    if text == 'weekdays':
+        return f"{anchor.minute} {anchor.hour} * * 1-5"
+    if text.startswith('every '):
+        interval = parse_duration(text[6:])
+        if interval < REMINDER_MIN_INTERVAL:
+            raise ValueError(f"reminders can repeat every {REMINDER_MIN_INTERVAL // 60} minutes at most")
+        return f"every {interval}"
+    rule = CronRule(text)
+    occurrences = [rule.next_after(epoch(anchor))]
+    while len(occurrences) < 10 and occurrences[-1] is not None:
+        occurrences.append(rule.next_after(occurrences[-1]))
+    if occurrences[0] is None:
+        raise ValueError(f"`{text}` never matches a date")
+    if any(b - a < REMINDER_MIN_INTERVAL for a, b in zip(occurrences, occurrences[1:]) if b is not None):
+        raise ValueError(f"reminders can repeat every {REMINDER_MIN_INTERVAL // 60} minutes at most")
+    return " ".join(text.split())
+
+
+def first_occurrence(when: Optional[datetime], rule: Optional[str], now: datetime) -> int:
+    """When a new reminder first fires: the given time, or the rule's first match from then (or from now)"""
+    if rule is None:
+        return epoch(when)
+    if rule.startswith('every '):
+        return epoch(when) if when is not None else epoch(now) + int(rule.split()[1])
+    return CronRule(rule).next_after(epoch(when) - 1 if when is not None else epoch(now))
+
+
+class Reminders(commands.Cog):
+    """Set, list and cancel personal reminders"""
+    reminders_group = discord.app_commands.Group(name="reminders", description="Your pending reminders")
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    def pending(self, user_id: int):
+        return sorted(self.bot.reminders.get(user_id, ()), key=lambda reminder: reminder.time)
+
+    @discord.app_commands.command(name="remindme", description="Set a personal reminder, once or on a schedule")
+    @discord.app_commands.describe(
+        message="Reminder message",
+        time="When, in UTC: '30m', '1h30m', '18:30', '2026-11-01 09:00' (default: one repeat from now)",
+        repeat="Repeat: 'daily', 'weekdays', 'weekly', 'every 2h' or a cron rule like '0 9 * * 1-5' (UTC)"
+    )
+    async def remind_me(self, interaction: discord.Interaction, message: str, time: Optional[str] = None, repeat: Optional[str] = None):
+        """Set a personal reminder"""
+        user_id = interaction.user.id
+        if len(self.bot.reminders.get(user_id, ())) >= REMINDERS_PER_USER:
+            await interaction.response.send_message(
+                f"❌ You already have {REMINDERS_PER_USER} pending reminders. Cancel one with `/reminders cancel` first.",
+                ephemeral=True
+            )
+            return
+
+        try:
+            if time is None and repeat is None:
+                raise ValueError("give a time, a repeat rule or both")
+            now = datetime.utcnow()
+            when = parse_when(time, now) if time is not None else None
+            rule = parse_repeat(repeat, when or now) if repeat is not None else None
+            fire_at = first_occurrence(when, rule, now)
+            if fire_at <= epoch(now):
+                raise ValueError("that time has already passed")
+            if fire_at - epoch(now) > REMINDER_MAX_DAYS * 86400:
+                raise ValueError(f"reminders can be set up to {REMINDER_MAX_DAYS} days ahead")
+
+            # Store reminder
+            reminder = ReminderRecord(fire_at, message, epoch(now), repeat=rule)
+            await self.bot.add_reminder(user_id, reminder)
+
+            repeats = f"\nRepeats **{describe_rule(rule)}**." if rule else ""
+            embed = discord.Embed(
+                title="⏰ Reminder Set",
+                description=f"I'll remind you <t:{fire_at}:R> with the message:\n\n*\"{message}\"*{repeats}",
+                color=discord.Color.green(),
+                timestamp=from_epoch(fire_at)
+            )
+            embed.set_footer(text=f"Reminder #{reminder.id} • first reminder at")
+
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ Invalid time format: {e}\n\n{EXAMPLES}", ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"❌ Error setting reminder: {e}", ephemeral=True)
+
+    @reminders_group.command(name="list", description="List your pending reminders")
+    async def list_reminders(self, interaction: discord.Interaction):
+        """List the caller's reminders, soonest first"""
+        reminders = self.pending(interaction.user.id)
+        if not reminders:
+            await interaction.response.send_message("You have no pending reminders.", ephemeral=True)
+            return
+
+        lines = []
+        for reminder in reminders[:REMINDERS_PER_USER]:
+            repeats = f" • {describe_rule(reminder.repeat)}" if reminder.repeat else ""
+            lines.append(f"`#{reminder.id}` <t:{reminder.time}:R>{repeats}\n{discord.utils.escape_markdown(reminder.message[:100])}")
+        if len(reminders) > REMINDERS_PER_USER:
+            lines.append(f"…and {len(reminders) - REMINDERS_PER_USER} more")
+
+        embed = discord.Embed(
+            title=f"⏰ Your Reminders ({len(reminders)})",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text="Cancel one with /reminders cancel")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @reminders_group.command(name="cancel", description="Cancel one of your reminders")
+    @discord.app_commands.describe(reminder="Reminder to cancel")
+    async def cancel_reminder(self, interaction: discord.Interaction, reminder: int):
+        """Cancel a reminder by ID (recurring ones stop for good)"""
+        if not self.bot.cancel_reminder(interaction.user.id, reminder):
+            await interaction.response.send_message(f"❌ You have no pending reminder #{reminder}.", ephemeral=True)
+            return
+        await interaction.response.send_message(f"🗑️ Reminder #{reminder} cancelled.", ephemeral=True)
+
+    @cancel_reminder.autocomplete('reminder')
+    async def reminder_choices(self, interaction: discord.Interaction, current: str):
+        current = current.lower().lstrip('#')
+        return [
+            discord.app_commands.Choice(name=f"#{reminder.id} {reminder.message}"[:100], value=reminder.id)
+            for reminder in self.pending(interaction.user.id)
+            if current in str(reminder.id) or current in reminder.message.lower()
+        ][:25]
+
+
+async def setup(bot):
+    await bot.add_cog(Reminders(bot))
@@ -0,0 +1,162 @@
+"""Study & productivity commands: topics, quotes, pomodoro timers, voice study time and XP ranks"""
+import random
+from datetime import datetime
+
+import discord
+from discord.ext import commands
+
+RANK_PERIODS = {'all': "All Time", 'weekly': "This Week", 'daily': "Today"}
+
+
+def format_duration(seconds: int) -> str:
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+
+class Study(commands.Cog):
+    """Conversation starters, motivation, pomodoro timers and the XP leaderboard"""
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        if self.bot.is_ready():  # loaded with /reload: pick up whoever is in voice already
+            self.bot.study_time.reconcile(self.bot.guilds)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        self.bot.study_time.update(member, before, after)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.bot.study_time.reconcile(self.bot.guilds)
+
+    @commands.Cog.listener()
+    async def on_shard_ready(self, shard_id):
+        self.bot.study_time.reconcile([guild for guild in self.bot.guilds if guild.shard_id == shard_id])
+
+    @commands.Cog.listener()
+    async def on_disconnect(self):
+        self.bot.study_time.disconnected()
+
+    @commands.Cog.listener()
+    async def on_resumed(self):
+        self.bot.study_time.resumed()
+
+    @discord.app_commands.command(name="topic", description="Get a random conversation starter or discussion topic")
+    async def random_topic(self, interaction: discord.Interaction):
+        """Get a random conversation topic"""
+        topic = random.choice(self.bot.topics)
+
+        embed = discord.Embed(
+            title="💬 Discussion Topic",
+            description=topic,
+            color=discord.Color.purple()
+        )
+        embed.set_footer(text="Great conversations start with great questions!")
+
+        await interaction.response.send_message(embed=embed)
+
+    @discord.app_commands.command(name="studyquote", description="Get a motivational study quote")
+    async def study_quote(self, interaction: discord.Interaction):
+        """Get a motivational study quote"""
+        quote = random.choice(self.bot.study_quotes)
+
+        embed = discord.Embed(
+            title="📚 Study Motivation",
+            description=f"*\"{quote}\"*",
+            color=discord.Color.gold()
+        )
+        embed.set_footer(text="Keep pushing forward! 💪")
+
+        await interaction.response.send_message(embed=embed)
+
+    @discord.app_commands.command(name="pomodoro", description="Start a pomodoro timer")
+    @discord.app_commands.describe(
+        focus_time="Focus time in minutes (default: 25)",
+        break_time="Break time in minutes (default: 5)",
+        cycles="Number of focus/break cycles to repeat (default: 1)"
+    )
+    async def pomodoro_timer(self, interaction: discord.Interaction, focus_time: int = 25, break_time: int = 5, cycles: int = 1):
+        """Start a pomodoro timer"""
+        if focus_time < 1 or focus_time > 120:
+            await interaction.response.send_message("Focus time must be between 1 and 120 minutes.", ephemeral=True)
+            return
+
+        if break_time < 1 or break_time > 60:
+            await interaction.response.send_message("Break time must be between 1 and 60 minutes.", ephemeral=True)
+            return
+
+        if cycles < 1 or cycles > 12:
+            await interaction.response.send_message("Cycles must be between 1 and 12.", ephemeral=True)
+            return
+
+        user_id = interaction.user.id
+
+        if user_id in self.bot.active_timers:
+            await interaction.response.send_message("You already have an active timer! Use `/stoptimer` to stop it first.", ephemeral=True)
+            return
+
+        # The timer engine takes over from here; this handler returns immediately
+        self.bot.timer_engine.start_timer(user_id, focus_time, break_time, cycles, interaction.channel_id, interaction.guild_id)
+
+        cycle_text = f"\nCycles: **{cycles}**" if cycles > 1 else ""
+        embed = discord.Embed(
+            title="🍅 Pomodoro Timer Started",
+            description=f"Focus time: **{focus_time} minutes**\nBreak time: **{break_time} minutes**{cycle_text}\n\nStay focused! I'll notify you when it's time for a break.",
+            color=discord.Color.red(),
+            timestamp=datetime.utcnow()
+        )
+        embed.set_footer(text="Good luck with your study session!")
+
+        await interaction.response.send_message(embed=embed)
+
+    @discord.app_commands.command(name="stoptimer", description="Stop your active pomodoro timer")
+    async def stop_timer(self, interaction: discord.Interaction):
+        """Stop active pomodoro timer"""
+        if not self.bot.timer_engine.cancel(interaction.user.id):
+            await interaction.response.send_message("You don't have an active timer.", ephemeral=True)
+            return
+
+        await interaction.response.send_message("⏹️ Timer stopped.", ephemeral=True)
+
+    @discord.app_commands.command(name="rank", description="Check your XP ranking")
+    @discord.app_commands.describe(period="Leaderboard period (default: all time)")
+    @discord.app_commands.choices(period=[
+        discord.app_commands.Choice(name=label, value=window) for window, label in RANK_PERIODS.items()
+    ])
+    async def check_rank(self, interaction: discord.Interaction, period: str = "all"):
+        """Check XP ranking in this server"""
+        user_id = interaction.user.id
+        board = self.bot.xp.board(interaction.guild_id or 0, period)
+        user_xp = board.totals.get(user_id)
+
+        user_rank = board.index.rank(user_xp) if user_xp is not None else "Unranked"
+        user_xp = user_xp or 0
+
+        embed = discord.Embed(
+            title=f"📊 Your Study Ranking • {RANK_PERIODS[period]}",
+            color=discord.Color.gold()
+        )
+
+        embed.add_field(name="Your XP", value=f"**{user_xp}** XP", inline=True)
+        embed.add_field(name="Your Rank", value=f"**#{user_rank}**", inline=True)
+        embed.add_field(name="Total Users", value=f"**{len(board.index)}**", inline=True)
+        study_seconds = self.bot.study_time.seconds(interaction.guild_id or 0, user_id, period)
+        embed.add_field(name="Voice Study Time", value=f"**{format_duration(study_seconds)}**", inline=True)
+
+        # Show top 5 users
+        leaderboard = ""
+        for i, (uid, xp) in enumerate(board.index.top()):
+            user = self.bot.get_user(uid)
+            name = user.display_name if user else f"<@{uid}>"
+            leaderboard += f"{i+1}. **{name}** - {xp} XP\n"
+
+        if leaderboard:
+            embed.add_field(name="🏆 Top 5 Leaderboard", value=leaderboard, inline=False)
+
+        embed.set_footer(text="Keep studying to climb the ranks!")
+
+        await interaction.response.send_message(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Study(bot))
@@ -0,0 +1,196 @@
+"""Staff support commands: /reply, /close, /cases and /transcripts"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+from main import DeliveryQueue, acknowledge, auto_defer, respond, set_log_context, staff_reply_embed
+
+
+class Support(commands.Cog):
+    """Answer, close and look up support cases"""
+    def __init__(self, bot):
+        self.bot = bot
+
+    @auto_defer(ephemeral=True)
+    @discord.app_commands.command(name="reply", description="Reply to a support case")
+    @discord.app_commands.describe(
+        case="Case ID to reply to",
+        message="Message to send to the user"
+    )
+    @discord.app_commands.default_permissions(manage_threads=True)
+    @discord.app_commands.checks.has_permissions(manage_threads=True)
+    async def reply_case(self, interaction: discord.Interaction, case: int, message: str):
+        """Reply to a support case"""
+        set_log_context(case_id=case)
+        case_data = await self.bot.cases.fetch(case)
+        if case_data is None:
+            await respond(interaction, "Case not found.", ephemeral=True)
+            return
+
+        embed = staff_reply_embed(case, message, interaction.user)
+
+        # Delivery may be retried, so acknowledge before waiting on it
+        await acknowledge(interaction, ephemeral=True)
+        try:
+            await self.bot.dm_queue.send(case_data.user_id, DeliveryQueue.PRIORITY_STAFF, embed=embed)
+        except discord.NotFound:
+            await interaction.followup.send("User not found.", ephemeral=True)
+            return
+        except discord.Forbidden:
+            await interaction.followup.send("Could not send DM to user. They may have DMs disabled.", ephemeral=True)
+            return
+        except discord.HTTPException:
+            await interaction.followup.send("Could not deliver the reply right now. Please try again.", ephemeral=True)
+            return
+
+        await interaction.followup.send(f"Reply sent to user for case #{case}", ephemeral=True)
+
+        # Log in thread
+        thread = await self.bot.resolve_channel(case_data.thread_id) if case_data.thread_id else None
+        if thread:
+            await thread.send(f"**Reply sent by {interaction.user.mention}:**\n{message}")
+
+    @auto_defer(ephemeral=True)
+    @discord.app_commands.command(name="close", description="Close a support case")
+    @discord.app_commands.describe(case="Case ID to close")
+    @discord.app_commands.default_permissions(manage_threads=True)
+    @discord.app_commands.checks.has_permissions(manage_threads=True)
+    async def close_case(self, interaction: discord.Interaction, case: int):
+        """Close a support case"""
+        set_log_context(case_id=case)
+        case_data = await self.bot.cases.fetch(case)
+        if case_data is None:
+            await respond(interaction, "Case not found.", ephemeral=True)
+            return
+
+        self.bot.cases.close(case, case_data, interaction.user.id)
+
+        # Archive thread
+        thread = await self.bot.resolve_channel(case_data.thread_id) if case_data.thread_id else None
+        if thread:
+            await thread.edit(archived=True)
+            await thread.send(f"Case closed by {interaction.user.mention}")
+            self.bot.transcripts.export(case, case_data, thread)
+
+        # Notify user
+        embed = discord.Embed(
+            title=f"Case #{case} Closed",
+            description="Your support case has been resolved. If you need further assistance, feel free to send another message.",
+            color=discord.Color.red(),
+            timestamp=datetime.utcnow()
+        )
+        self.bot.dm_queue.deliver(case_data.user_id, DeliveryQueue.PRIORITY_STAFF, embed=embed)
+
+        await respond(interaction, f"Case #{case} has been closed.", ephemeral=True)
+
+    @auto_defer(ephemeral=True)
+    @discord.app_commands.command(name="cases", description="List support cases")
+    @discord.app_commands.describe(
+        status="Which cases to list (default: open)",
+        page="Page number (default: 1)"
+    )
+    @discord.app_commands.choices(status=[
+        discord.app_commands.Choice(name="Open", value="open"),
+        discord.app_commands.Choice(name="Closed", value="closed"),
+        discord.app_commands.Choice(name="All", value="all"),
+    ])
+    @discord.app_commands.default_permissions(manage_threads=True)
+    @discord.app_commands.checks.has_permissions(manage_threads=True)
+    async def list_cases(self, interaction: discord.Interaction, status: str = "open", page: int = 1):
+        """List support cases, newest first"""
+        page_size = 10
+        if page < 1:
+            await respond(interaction, "Page must be 1 or higher.", ephemeral=True)
+            return
+
+        rows, total = await self.bot.cases.page(None if status == "all" else status, (page - 1) * page_size, page_size)
+        pages = max(1, -(-total // page_size))
+        if not rows:
+            await respond(interaction, f"No {status} cases on page {page} (of {pages}).", ephemeral=True)
+            return
+
+        lines = []
+        for case_id, data in rows:
+            thread = f"<#{data.thread_id}>" if data.thread_id else "thread pending"
+            lines.append(f"**#{case_id}** • <@{data.user_id}> • {data.status} • {thread} • <t:{data.created_at}:R>")
+
+        embed = discord.Embed(
+            title=f"📂 {status.capitalize()} Cases",
+            description="\n".join(lines),
+            color=discord.Color.orange()
+        )
+        embed.set_footer(text=f"Page {page}/{pages} • {total} case(s)")
+
+        await respond(interaction, embed=embed, ephemeral=True)
+
+    @auto_defer(ephemeral=True)
+    @discord.app_commands.command(name="transcripts", description="Find transcripts of closed support cases")
+    @discord.app_commands.describe(
+        case="Case ID to fetch the transcript of",
+        user="List transcripts of this user's cases",
+        date="List cases closed on this day (YYYY-MM-DD, UTC)"
+    )
+    @discord.app_commands.default_permissions(manage_threads=True)
+    @discord.app_commands.checks.has_permissions(manage_threads=True)
+    async def find_transcripts(self, interaction: discord.Interaction, case: Optional[int] = None,
+                               user: Optional[discord.User] = None, date: Optional[str] = None):
+        """Send one case's transcript, or list transcripts by user and/or close date"""
+        if case is not None:
+            transcript = await self.bot.state_store.get_transcript(case)
+            if transcript is None:
+                await respond(interaction, f"No transcript for case #{case}.", ephemeral=True)
+                return
+
+            limit = interaction.guild.filesize_limit if interaction.guild else 25 * 1024 * 1024
+            if transcript['bytes'] > limit or not os.path.exists(transcript['path']):
+                await respond(
+                    interaction,
+                    f"Transcript of case #{case} ({transcript['messages']} messages) is at `{transcript['path']}` on the bot host.",
+                    ephemeral=True
+                )
+                return
+            await respond(
+                interaction,
+                f"Transcript of case #{case} ({transcript['messages']} messages):",
+                file=discord.File(transcript['path']), ephemeral=True
+            )
+            return
+
+        start = end = None
+        if date is not None:
+            try:
+                start = datetime.strptime(date, "%Y-%m-%d")
+            except ValueError:
+                await respond(interaction, "Date must look like 2024-01-31.", ephemeral=True)
+                return
+            end = start + timedelta(days=1)
+
+        transcripts = await self.bot.state_store.list_transcripts(user.id if user else None, start, end, limit=15)
+        if not transcripts:
+            await respond(interaction, "No matching transcripts.", ephemeral=True)
+            return
+
+        lines = []
+        for transcript in transcripts:
+            closed = int(transcript['closed_at'].replace(tzinfo=timezone.utc).timestamp())
+            lines.append(f"**#{transcript['case_id']}** • <@{transcript['user_id']}> • closed <t:{closed}:f> • {transcript['messages']} messages")
+
+        embed = discord.Embed(
+            title="🗂️ Case Transcripts",
+            description="\n".join(lines),
+            color=discord.Color.orange()
+        )
+        embed.set_footer(text="Use /transcripts case:<id> to download one")
+
+        await respond(interaction, embed=embed, ephemeral=True)
+
+    async def cog_app_command_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        if isinstance(error, discord.app_commands.MissingPermissions):
+            await respond(interaction, f"❌ You need the {', '.join(error.missing_permissions)} permission to use this command.", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Support(bot))
@@ -0,0 +1,233 @@
+"""Voice channel management commands: bulk moderation and channel settings"""
+import logging
+
+import discord
+from discord.ext import commands
+
+from main import DeliveryQueue, VoiceModerator, acknowledge, auto_defer, respond
+
+logger = logging.getLogger(__name__)
+
+
+def in_voice_channel():
+    """Decorator to check if user is in a voice channel"""
+    def predicate(interaction: discord.Interaction) -> bool:
+        return bool(interaction.user.voice and interaction.user.voice.channel)
+    return discord.app_commands.check(predicate)
+
+
+class Voice(commands.Cog):
+    """Commands acting on the caller's current voice channel"""
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def moderate_voice_channel(self, interaction: discord.Interaction, action: str):
+        """Run a bulk voice action on everyone else in the caller's channel"""
+        voice_channel = interaction.user.voice.channel
+        _, _, permission, verb, verb_ing = VoiceModerator.ACTIONS[action]
+
+        if not getattr(voice_channel.permissions_for(interaction.guild.me), permission):
+            await respond(interaction, f"I don't have permission to {action} members in this channel.", ephemeral=True)
+            return
+
+        # Acknowledge right away; large channels take longer than the 3 second window
+        await acknowledge(interaction, thinking=True)
+
+        members = [member for member in voice_channel.members if member != interaction.guild.me]
+
+        async def progress(finished: int, total: int):
+            await interaction.edit_original_response(content=f"⏳ {verb_ing} members in {voice_channel.name}… {finished}/{total}")
+
+        results = await self.bot.voice_moderator.run(
+            action, interaction.guild.id, members,
+            reason=f"/{action} by {interaction.user} ({interaction.user.id})",
+            progress=progress
+        )
+
+        embed = discord.Embed(
+            title=f"{verb} {len(results['done'])} members in {voice_channel.name}",
+            color=discord.Color.green() if not results['failed'] else discord.Color.orange()
+        )
+        if results['skipped']:
+            embed.add_field(name="Skipped", value=f"{len(results['skipped'])} already {verb.lower()} or left", inline=True)
+        if results['failed']:
+            failures = "\n".join(f"{member.display_name}: {type(error).__name__}" for member, error in results['failed'][:10])
+            if len(results['failed']) > 10:
+                failures += f"\n…and {len(results['failed']) - 10} more"
+            embed.add_field(name=f"Failed ({len(results['failed'])})", value=failures, inline=False)
+
+        await interaction.edit_original_response(content=None, embed=embed)
+
+    @auto_defer()
+    @discord.app_commands.command(name="forcemute", description="Mute all members in your current voice channel")
+    @in_voice_channel()
+    @discord.app_commands.default_permissions(mute_members=True)
+    @discord.app_commands.checks.has_permissions(mute_members=True)
+    @discord.app_commands.checks.bot_has_permissions(mute_members=True)
+    async def force_mute(self, interaction: discord.Interaction):
+        """Mute all members in the current voice channel"""
+        await self.moderate_voice_channel(interaction, 'mute')
+
+    @auto_defer()
+    @discord.app_commands.command(name="forceunmute", description="Unmute all members in your current voice channel")
+    @in_voice_channel()
+    @discord.app_commands.default_permissions(mute_members=True)
+    @discord.app_commands.checks.has_permissions(mute_members=True)
+    @discord.app_commands.checks.bot_has_permissions(mute_members=True)
+    async def force_unmute(self, interaction: discord.Interaction):
+        """Unmute all members in the current voice channel"""
+        await self.moderate_voice_channel(interaction, 'unmute')
+
+    @auto_defer()
+    @discord.app_commands.command(name="forcedeafen", description="Deafen all members in your current voice channel")
+    @in_voice_channel()
+    @discord.app_commands.default_permissions(deafen_members=True)
+    @discord.app_commands.checks.has_permissions(deafen_members=True)
+    @discord.app_commands.checks.bot_has_permissions(deafen_members=True)
+    async def force_deafen(self, interaction: discord.Interaction):
+        """Deafen all members in the current voice channel"""
+        await self.moderate_voice_channel(interaction, 'deafen')
+
+    @auto_defer()
+    @discord.app_commands.command(name="forcedisconnect", description="Disconnect all members from your current voice channel")
+    @in_voice_channel()
+    @discord.app_commands.default_permissions(move_members=True)
+    @discord.app_commands.checks.has_permissions(move_members=True)
+    @discord.app_commands.checks.bot_has_permissions(move_members=True)
+    async def force_disconnect(self, interaction: discord.Interaction):
+        """Disconnect all members from the current voice channel"""
+        await self.moderate_voice_channel(interaction, 'disconnect')
+
+    async def edit_voice_channel(self, interaction: discord.Interaction, voice_channel, confirmation: str, **changes):
+        """Queue a settings change for the channel and report once the edit carrying it lands"""
+        # Queued edits may wait out the channel's rate limit, which can exceed the 3 second window
+        await acknowledge(interaction, thinking=True)
+        try:
+            await self.bot.channel_edits.edit(voice_channel, **changes)
+        except discord.HTTPException as e:
+            logger.warning(f"Failed to edit voice channel {voice_channel.id}: {e}")
+            await interaction.edit_original_response(content=f"❌ Couldn't update {voice_channel.name}. Please try again.")
+            return
+        await interaction.edit_original_response(content=confirmation)
+
+    @auto_defer()
+    @discord.app_commands.command(name="private", description="Make your current voice channel private")
+    @in_voice_channel()
+    async def make_private(self, interaction: discord.Interaction):
+        """Lock the voice channel to current members only"""
+        voice_channel = interaction.user.voice.channel
+
+        if not voice_channel.permissions_for(interaction.guild.me).manage_channels:
+            await respond(interaction, "I don't have permission to modify this channel.", ephemeral=True)
+            return
+
+        # Get current members
+        current_members = [member for member in voice_channel.members]
+
+        # Set permissions on top of whatever earlier queued changes left
+        def lock(overwrites):
+            overwrites[interaction.guild.default_role] = discord.PermissionOverwrite(connect=False)
+            for member in current_members:
+                overwrites[member] = discord.PermissionOverwrite(connect=True)
+            return overwrites
+
+        await self.edit_voice_channel(interaction, voice_channel, f"🔒 {voice_channel.name} is now private to current members.", overwrites=lock)
+
+    @auto_defer()
+    @discord.app_commands.command(name="public", description="Make your current voice channel public")
+    @in_voice_channel()
+    async def make_public(self, interaction: discord.Interaction):
+        """Unlock the voice channel for everyone"""
+        voice_channel = interaction.user.voice.channel
+
+        if not voice_channel.permissions_for(interaction.guild.me).manage_channels:
+            await respond(interaction, "I don't have permission to modify this channel.", ephemeral=True)
+            return
+
+        # Reset permissions to allow everyone
+        def unlock(overwrites):
+            overwrites.pop(interaction.guild.default_role, None)
+            return overwrites
+
+        await self.edit_voice_channel(interaction, voice_channel, f"🔓 {voice_channel.name} is now public.", overwrites=unlock)
+
+    @auto_defer()
+    @discord.app_commands.command(name="max", description="Set maximum member limit for your voice channel")
+    @discord.app_commands.describe(number="Maximum number of members (0 for unlimited)")
+    @in_voice_channel()
+    async def set_max_members(self, interaction: discord.Interaction, number: int):
+        """Set maximum member limit for voice channel"""
+        if number < 0 or number > 99:
+            await respond(interaction, "Member limit must be between 0 and 99.", ephemeral=True)
+            return
+
+        voice_channel = interaction.user.voice.channel
+
+        if not voice_channel.permissions_for(interaction.guild.me).manage_channels:
+            await respond(interaction, "I don't have permission to modify this channel.", ephemeral=True)
+            return
+
+        if number == 0:
+            confirmation = f"Removed member limit from {voice_channel.name}"
+        else:
+            confirmation = f"Set member limit to {number} for {voice_channel.name}"
+        await self.edit_voice_channel(interaction, voice_channel, confirmation, user_limit=number)
+
+    @auto_defer()
+    @discord.app_commands.command(name="desc", description="Set description for your voice channel")
+    @discord.app_commands.describe(description="Channel description/topic")
+    @in_voice_channel()
+    async def set_description(self, interaction: discord.Interaction, description: str):
+        """Set description for voice channel"""
+        voice_channel = interaction.user.voice.channel
+
+        if not voice_channel.permissions_for(interaction.guild.me).manage_channels:
+            await respond(interaction, "I don't have permission to modify this channel.", ephemeral=True)
+            return
+
+        await self.edit_voice_channel(interaction, voice_channel, f"Updated description for {voice_channel.name}", topic=description)
+
+    @auto_defer(ephemeral=True)
+    @discord.app_commands.command(name="invite", description="Send voice channel invite to a user")
+    @discord.app_commands.describe(user="User to invite")
+    @in_voice_channel()
+    async def invite_user(self, interaction: discord.Interaction, user: discord.Member):
+        """Send DM invite to user for voice channel"""
+        voice_channel = interaction.user.voice.channel
+
+        if not voice_channel.permissions_for(interaction.guild.me).create_instant_invite:
+            await respond(interaction, "I don't have permission to create invites.", ephemeral=True)
+            return
+
+        # An invite and a DM before answering rarely fit in the 3 second window
+        await acknowledge(interaction, ephemeral=True, thinking=True)
+        try:
+            invite = await voice_channel.create_invite(max_uses=1, max_age=3600)  # 1 hour
+
+            embed = discord.Embed(
+                title="🎙️ Voice Channel Invitation",
+                description=f"{interaction.user.display_name} has invited you to join a voice channel!",
+                color=discord.Color.blue()
+            )
+            embed.add_field(name="Channel", value=voice_channel.name, inline=True)
+            embed.add_field(name="Server", value=interaction.guild.name, inline=True)
+            embed.add_field(name="Invite Link", value=invite.url, inline=False)
+            embed.set_footer(text="This invite expires in 1 hour")
+
+            await self.bot.dm_queue.send(user, DeliveryQueue.PRIORITY_INTERACTIVE, embed=embed)
+            await respond(interaction, f"Sent voice channel invite to {user.display_name}", ephemeral=True)
+
+        except discord.Forbidden:
+            await respond(interaction, f"Could not send DM to {user.display_name}. They may have DMs disabled.", ephemeral=True)
+
+    async def cog_app_command_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        if isinstance(error, discord.app_commands.MissingPermissions):
+            await respond(interaction, f"❌ You need the {', '.join(error.missing_permissions)} permission to use this command.", ephemeral=True)
+        elif isinstance(error, discord.app_commands.BotMissingPermissions):
+            await respond(interaction, f"❌ I need the {', '.join(error.missing_permissions)} permission in this server to do that.", ephemeral=True)
+        elif isinstance(error, discord.app_commands.CheckFailure):
+            await respond(interaction, "❌ You need to be in a voice channel to use this command.", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Voice(bot))
@@ -1,38 +1,1243 @@
+import aiohttp
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import asyncio
+import atexit
+import bisect
+import calendar
+import collections
+import contextvars
+import copy
+import gzip
+import hashlib
+import heapq
+import io
+import itertools
 import json
+import math
 import os
+import queue
 import random
+import signal
+import socket
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import logging
+import logging.handlers
+
+try:
+    import orjson  # optional, used by RUNTIME_PROFILE=fast
+except ImportError:
+    orjson = None
+try:
+    import uvloop  # optional, used by RUNTIME_PROFILE=fast
+except ImportError:
+    uvloop = None
+
+# Cogs import shared pieces with "from main import ...". Started as a script this
+# module is __main__, so register it under its own name instead of loading it twice.
+if __name__ == "__main__":
+    sys.modules.setdefault("main", sys.modules[__name__])
+
+# Runtime profile
+RUNTIME_PROFILE = os.getenv("RUNTIME_PROFILE", "default")  # "fast": uvloop, orjson and a tuned REST connector where installed
+FAST_JSON = RUNTIME_PROFILE == "fast" and orjson is not None
+
+def json_dumps(data, default=None) -> str:
+    """Encode state, data files and log records; orjson under the fast profile, else the stdlib"""
+    if FAST_JSON:
+        return orjson.dumps(data, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, default=default)
+
+json_loads = orjson.loads if FAST_JSON else json.loads
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" (one object per line) or "text"
+LOG_FILE = os.getenv("LOG_FILE", "")  # also append logs to this file ("" = stderr only)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records buffered for the writer thread before shedding DEBUG/INFO
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))  # share of high-volume events (e.g. command timings) kept
+
+_log_context: contextvars.ContextVar = contextvars.ContextVar('log_context', default={})
+LOG_FIELDS = ('event', 'case_id', 'user_id', 'guild_id', 'command', 'latency_ms')
+
+def set_log_context(**fields):
+    """Attach fields (case_id, user_id, command, ...) to every record logged from the current task"""
+    _log_context.set({**_log_context.get(), **fields})
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per record, or text with the context fields appended"""
+    def __init__(self, as_json: bool = True):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        self.as_json = as_json
+
+    def fields(self, record: logging.LogRecord) -> Dict:
+        fields = dict(getattr(record, 'context', {}))
+        for name in LOG_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                fields[name] = value
+        return fields
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not self.as_json:
+            fields = self.fields(record)
+            text = super().format(record)
+            return text + " " + " ".join(f"{key}={value}" for key, value in fields.items()) if fields else text
+        entry = {
+            'ts': datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            **self.fields(record),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json_dumps(entry, default=str)
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread with the caller's log context; a full queue sheds DEBUG/INFO only"""
+    SUMMARY_INTERVAL = 10.0  # least seconds between "records dropped" warnings
+
+    def __init__(self, log_queue: queue.Queue, sample_rate: float = 1.0, fallback: List[logging.Handler] = ()):
+        super().__init__(log_queue)
+        self.sample_rate = sample_rate
+        self.fallback = list(fallback)  # written to directly when WARNING and above find the queue full
+        self.counters = collections.Counter()
+        self._unreported = 0  # records dropped since the last summary
+        self._reported_at = time.monotonic()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve the message here; the writer thread formats it and any traceback
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record: logging.LogRecord):
+        if getattr(record, 'sampled', False) and random.random() >= self.sample_rate:
+            self.counters['sampled_out'] += 1
+            return
+        context = _log_context.get()
+        if context:
+            record.context = context
+        try:
+            self.enqueue(self.prepare(record))
+        except queue.Full:
+            if record.levelno < logging.WARNING:
+                self.counters['dropped'] += 1
+                self._unreported += 1
+            else:
+                # Never lose warnings and errors: write this one on the caller's thread instead
+                self.counters['written_directly'] += 1
+                for output in self.fallback:
+                    if record.levelno >= output.level:
+                        output.handle(record)
+        except Exception:
+            self.handleError(record)
+        elapsed = time.monotonic() - self._reported_at
+        if self._unreported and elapsed >= self.SUMMARY_INTERVAL:
+            dropped, self._unreported = self._unreported, 0
+            self._reported_at += elapsed
+            logging.getLogger(__name__).warning(
+                f"Log queue full: dropped {dropped} DEBUG/INFO record(s) in the last {elapsed:.0f}s",
+                extra={'event': 'log_dropped'})
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+def configure_logging() -> ContextQueueHandler:
+    """Route every log record through a bounded queue to a background writer thread"""
+    formatter = StructuredFormatter(as_json=LOG_FORMAT == "json")
+    outputs = [logging.StreamHandler()]
+    if LOG_FILE:
+        outputs.append(logging.FileHandler(LOG_FILE))
+    for output in outputs:
+        output.setFormatter(formatter)
+    
+    handler = ContextQueueHandler(queue.Queue(LOG_QUEUE_SIZE), sample_rate=LOG_SAMPLE_RATE, fallback=outputs)
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(logging.INFO)
+    listener = logging.handlers.QueueListener(handler.queue, *outputs, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # Drains whatever is still queued
+    return handler
+
+log_handler = configure_logging()
 logger = logging.getLogger(__name__)
 
+def log_sampled(event: str, message: str, **fields):
+    """Log a high-volume event; only LOG_SAMPLE_RATE of them reach the writer"""
+    logger.info(message, extra={'event': event, 'sampled': True, **fields})
+
 # Bot configuration
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN", "your_bot_token_here")
 STAFF_CHANNEL_ID = int(os.getenv("STAFF_CHANNEL_ID", "1410225154239238184"))  # Hardcoded report channel ID
+STATE_BACKEND = os.getenv("STATE_BACKEND", "sqlite")  # "sqlite" or "memory"
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "data/state.db")
+STATE_FLUSH_INTERVAL = float(os.getenv("STATE_FLUSH_INTERVAL", "1.0"))  # seconds between write-behind flushes
+POMODORO_XP_REWARD = 10
+XP_WINDOWS = ('all', 'weekly', 'daily')  # leaderboard windows kept in memory per guild
+XP_COMPACT_INTERVAL = float(os.getenv("XP_COMPACT_INTERVAL", "300"))  # seconds between XP ledger compactions
+XP_LEGACY_GUILD_ID = int(os.getenv("XP_LEGACY_GUILD_ID", "0"))  # guild credited with XP totals from before the ledger (0 = not set, keep them)
+STUDY_FLUSH_INTERVAL = float(os.getenv("STUDY_FLUSH_INTERVAL", "60"))  # seconds between voice study-time rollup batches
+STUDY_CHECKPOINT_INTERVAL = int(os.getenv("STUDY_CHECKPOINT_INTERVAL", "900"))  # open voice sessions are credited at least this often
+STUDY_XP_PER_HOUR = int(os.getenv("STUDY_XP_PER_HOUR", "12"))  # XP for each hour in voice (0 = voice time earns no XP)
+MODERATION_CONCURRENCY = int(os.getenv("MODERATION_CONCURRENCY", "5"))  # parallel member edits per guild
+DM_WORKERS = int(os.getenv("DM_WORKERS", "4"))  # concurrent outbound DM sends
+ATTACHMENT_CONCURRENCY = int(os.getenv("ATTACHMENT_CONCURRENCY", "4"))  # support attachments copied at once
+ATTACHMENT_MAX_BYTES = int(os.getenv("ATTACHMENT_MAX_BYTES", str(25 * 1024 * 1024)))  # bigger ones are linked instead
+ATTACHMENT_SPOOL_BYTES = int(os.getenv("ATTACHMENT_SPOOL_BYTES", str(1024 * 1024)))  # spill to a temp file past this
+TRANSCRIPT_DIR = os.getenv("TRANSCRIPT_DIR", "data/transcripts")  # gzipped JSONL transcripts of closed cases
+COMMAND_SYNC_CACHE = os.getenv("COMMAND_SYNC_CACHE", "data/command_sync.json")  # last synced command fingerprints
+DEV_GUILD_ID = int(os.getenv("DEV_GUILD_ID", "0"))  # sync to this guild only, for instant updates while developing
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "") == "1"
+INTERACTION_DEADLINE = 3.0  # seconds Discord waits for a slash command to be acknowledged
+DEFER_MARGIN = float(os.getenv("DEFER_MARGIN", "1.0"))  # least seconds of that deadline kept in reserve by automatic defers
+SUPPORT_SESSION_TTL = 300  # seconds; support prompt view timeout and pending-case lifetime
+STAFF_BURST_CASES = int(os.getenv("STAFF_BURST_CASES", "3"))  # new cases per digest window announced one by one
+STAFF_DIGEST_WINDOW = float(os.getenv("STAFF_DIGEST_WINDOW", "10"))  # seconds; past the burst, one digest ping per window
+STAFF_THREAD_CONCURRENCY = int(os.getenv("STAFF_THREAD_CONCURRENCY", "2"))  # case threads created at once during a burst
+REMINDER_MAX_DAYS = 365  # furthest ahead a reminder can first fire
+REMINDER_MIN_INTERVAL = 900  # seconds; closest together a recurring reminder may fire
+REMINDERS_PER_USER = int(os.getenv("REMINDERS_PER_USER", "25"))  # pending reminders (one-off or recurring) per user
+DM_BURST = 5  # DMs a user can send back to back before throttling
+DM_REFILL_SECONDS = 10.0  # one more DM allowed every this many seconds
+LEAN_MODE = os.getenv("LEAN_MODE", "") == "1"  # cache only what DMs and voice commands need
+LEAN_MAX_MESSAGES = int(os.getenv("LEAN_MAX_MESSAGES", "100"))  # message cache size in lean mode (0 = none)
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))  # total shards across the cluster (0 = one unsharded connection)
+SHARD_IDS = [int(shard) for shard in os.getenv("SHARD_IDS", "").split(",") if shard.strip()]  # shards this process runs ("" = all)
+CLUSTER_NODE = os.getenv("CLUSTER_NODE", f"{socket.gethostname()}:{os.getpid()}")  # lease holder name
+CLUSTERED = bool(SHARD_IDS)  # several processes share the state store; otherwise this process holds every duty
+LEASE_TTL = float(os.getenv("LEASE_TTL", "15"))  # seconds a silent process keeps reminder dispatch / the staff bridge
+CLUSTER_SYNC_INTERVAL = float(os.getenv("CLUSTER_SYNC_INTERVAL", "2"))  # seconds between lease renewals and state syncs
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # serve Prometheus metrics on 127.0.0.1 (0 = off)
+METRICS_FILE = os.getenv("METRICS_FILE", "")  # periodically dump metrics as JSON here ("" = off)
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "60"))
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))  # fast profile: open REST connections at most
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "50"))  # fast profile: per host (discord.com, the CDN)
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "60"))  # fast profile: seconds an idle connection is kept for reuse
+HTTP_DNS_TTL = 300  # fast profile: seconds DNS answers are cached
+AVAILABLE_COGS = ('support', 'voice', 'study', 'reminders')  # feature modules under cogs/
+COGS = [name.strip() for name in os.getenv("COGS", ",".join(AVAILABLE_COGS)).split(",") if name.strip()]  # cogs this deployment loads
+
+def http_connector() -> Optional[aiohttp.TCPConnector]:
+    """Connector for outbound HTTP sessions: a bounded, long keep-alive pool under the fast profile"""
+    if RUNTIME_PROFILE != "fast":
+        return None
+    return aiohttp.TCPConnector(limit=HTTP_POOL_LIMIT, limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+                                keepalive_timeout=HTTP_KEEPALIVE, ttl_dns_cache=HTTP_DNS_TTL)
+
+def apply_runtime_profile() -> Dict[str, str]:
+    """Install RUNTIME_PROFILE's event loop before any loop starts and report what is in effect"""
+    fast = RUNTIME_PROFILE == "fast"
+    if RUNTIME_PROFILE not in ("default", "fast"):
+        logger.warning(f"Unknown RUNTIME_PROFILE {RUNTIME_PROFILE!r}, using the default profile")
+    active = {'loop': 'asyncio', 'json': 'orjson' if FAST_JSON else 'json', 'http': 'tuned' if fast else 'default'}
+    if fast and uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        active['loop'] = 'uvloop'
+    missing = [name for name, module in (('uvloop', uvloop), ('orjson', orjson)) if module is None]
+    if fast and missing:
+        logger.warning(f"Runtime profile fast: {', '.join(missing)} not installed, falling back to the standard library")
+    logger.info(f"Runtime profile {RUNTIME_PROFILE}: " + ", ".join(f"{key}={value}" for key, value in active.items()))
+    return active
+
+# Persistence
+def epoch(when: datetime) -> int:
+    """Naive-UTC (or aware) datetime -> integer Unix seconds"""
+    return calendar.timegm(when.utctimetuple())
+
+def from_epoch(seconds: float) -> datetime:
+    """Integer Unix seconds -> naive-UTC datetime, for display and date maths"""
+    return datetime.utcfromtimestamp(seconds)
+
+class Record:
+    """Base for the slotted case/reminder/timer records kept in memory"""
+    __slots__ = ()
+    TIMESTAMPS: tuple = ()
+    INTERNED: tuple = ()
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = data.get(name)
+            if value is not None:
+                if name in cls.TIMESTAMPS and not isinstance(value, int):
+                    value = epoch(datetime.fromisoformat(value) if isinstance(value, str) else value)
+                elif name in cls.INTERNED:
+                    value = sys.intern(value)
+            setattr(record, name, value)
+        return record
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)})"
+
+class CaseRecord(Record):
+    """A support case"""
+    __slots__ = ('user_id', 'thread_id', 'status', 'created_at', 'closed_at', 'closed_by')
+    TIMESTAMPS = ('created_at', 'closed_at')
+    INTERNED = ('status',)
+
+    def __init__(self, user_id: int, thread_id: Optional[int], created_at: int, status: str = 'open'):
+        self.user_id = user_id
+        self.thread_id = thread_id
+        self.status = status
+        self.created_at = created_at
+        self.closed_at: Optional[int] = None
+        self.closed_by: Optional[int] = None
+
+class ReminderRecord(Record):
+    """A pending reminder; id is assigned when it is stored"""
+    __slots__ = ('id', 'time', 'message', 'set_time', 'repeat')
+    TIMESTAMPS = ('time', 'set_time')
+    INTERNED = ('repeat',)
+
+    def __init__(self, time: int, message: str, set_time: int, repeat: Optional[str] = None):
+        self.id: Optional[int] = None
+        self.time = time
+        self.message = message
+        self.set_time = set_time
+        self.repeat = repeat
+
+class TimerRecord(Record):
+    """A running pomodoro; phase_ends_at is the next focus/break transition"""
+    __slots__ = ('focus_time', 'break_time', 'cycles', 'cycle', 'start_time', 'phase', 'phase_ends_at', 'channel_id', 'guild_id')
+    TIMESTAMPS = ('start_time', 'phase_ends_at')
+    INTERNED = ('phase',)
+
+    def __init__(self, focus_time: int, break_time: int, cycles: int, start_time: int,
+                 channel_id: Optional[int], guild_id: Optional[int] = None):
+        self.focus_time = focus_time
+        self.break_time = break_time
+        self.cycles = cycles
+        self.cycle = 1
+        self.start_time = start_time
+        self.phase = 'focus'
+        self.phase_ends_at = start_time + focus_time * 60
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+
+def _encode_record(data: Dict) -> str:
+    """Serialise a record's dict (or any JSON dict), turning datetimes into ISO strings"""
+    return json_dumps(data, default=lambda value: value.isoformat())
+
+def _decode_record(raw: str, record_type):
+    return record_type.from_dict(json_loads(raw))
+
+def xp_period(window: str, when: datetime) -> str:
+    """Key of the leaderboard period containing `when`; ISO dates, so keys sort in time order"""
+    if window == 'daily':
+        return when.date().isoformat()
+    if window == 'weekly':
+        return (when.date() - timedelta(days=when.weekday())).isoformat()
+    return 'all'
+
+class StateStore:
+    """In-memory state backend: nothing is persisted and nothing is recovered"""
+    persistent = False
+    def __init__(self):
+        self._counters: Dict[str, int] = {}
+
+    async def open(self) -> Dict:
+        """Return the hot working set to restore on startup"""
+        return {'cases': {}, 'xp_rollups': [], 'xp_events': [], 'study_time': [], 'reminders': [], 'timers': {}}
+
+    async def next_id(self, name: str) -> int:
+        """Allocate the next value of a counter (case and reminder ids)"""
+        value = self._counters.get(name, 1)
+        self._counters[name] = value + 1
+        return value
+
+    async def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        """Take or renew a named lease; only one holder per store at a time"""
+        return True
+
+    async def release_lease(self, name: str, holder: str):
+        pass
+
+    async def poll_changes(self) -> List:
+        """Return [(table, key, value)] written by other processes since the last poll"""
+        return []
+
+    def put_case(self, case_id: int, data: CaseRecord):
+        pass
+
+    def append_xp(self, guild_id: int, user_id: int, amount: int, at: datetime):
+        """Append an XP gain to the ledger"""
+        pass
+
+    async def compact_xp(self) -> int:
+        """Fold ledger events into rollups; returns how many events were folded"""
+        return 0
+
+    def add_study_time(self, rows: List):
+        """Add [(guild_id, day, user_id, channel_id, seconds)] to the daily voice study-time rollups"""
+        pass
+
+    def put_reminder(self, reminder_id: int, user_id: int, data: ReminderRecord):
+        pass
+
+    def delete_reminder(self, reminder_id: int):
+        pass
+
+    def put_timer(self, user_id: int, data: TimerRecord):
+        pass
+
+    def delete_timer(self, user_id: int):
+        pass
+
+    async def get_case(self, case_id: int) -> Optional[CaseRecord]:
+        """Fetch a case that is not in the working set (e.g. a closed one)"""
+        return None
+
+    async def list_cases(self, status: Optional[str], offset: int, limit: int):
+        """Return ([(case_id, data)], total) newest first; status None means all"""
+        return [], 0
+
+    def put_transcript(self, case_id: int, data: Dict):
+        """Index an exported case transcript (user_id, closed_at, path, messages, bytes)"""
+        pass
+
+    async def get_transcript(self, case_id: int) -> Optional[Dict]:
+        return None
+
+    async def list_transcripts(self, user_id: Optional[int], start: Optional[datetime], end: Optional[datetime], limit: int) -> List[Dict]:
+        """Indexed transcripts newest first, optionally for one user and/or closed within [start, end)"""
+        return []
+
+    @property
+    def pending_writes(self) -> int:
+        return 0
+
+    async def flush(self):
+        pass
+
+    async def close(self):
+        pass
+
+class SQLiteStateStore(StateStore):
+    """SQLite (WAL) backend with write-behind batching"""
+    persistent = True
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cases (
+            case_id INTEGER PRIMARY KEY, user_id INTEGER, thread_id INTEGER, status TEXT, data TEXT);
+        CREATE INDEX IF NOT EXISTS cases_status_id ON cases(status, case_id);
+        CREATE INDEX IF NOT EXISTS cases_user ON cases(user_id);
+        CREATE TABLE IF NOT EXISTS user_xp (user_id INTEGER PRIMARY KEY, xp INTEGER);
+        CREATE TABLE IF NOT EXISTS xp_events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT, node TEXT, guild_id INTEGER, user_id INTEGER, amount INTEGER, at TEXT);
+        CREATE TABLE IF NOT EXISTS xp_rollups (
+            guild_id INTEGER, window TEXT, period TEXT, user_id INTEGER, xp INTEGER,
+            PRIMARY KEY (guild_id, window, period, user_id));
+        CREATE TABLE IF NOT EXISTS study_time (
+            guild_id INTEGER, day TEXT, user_id INTEGER, channel_id INTEGER, seconds INTEGER,
+            PRIMARY KEY (guild_id, day, user_id, channel_id));
+        CREATE TABLE IF NOT EXISTS reminders (
+            reminder_id INTEGER PRIMARY KEY, user_id INTEGER, fire_at TEXT, data TEXT);
+        CREATE TABLE IF NOT EXISTS timers (user_id INTEGER PRIMARY KEY, data TEXT);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS transcripts (
+            case_id INTEGER PRIMARY KEY, user_id INTEGER, closed_at TEXT, path TEXT, messages INTEGER, bytes INTEGER);
+        CREATE INDEX IF NOT EXISTS transcripts_user ON transcripts(user_id, closed_at);
+        CREATE INDEX IF NOT EXISTS transcripts_closed ON transcripts(closed_at);
+        CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, holder TEXT, expires_at REAL);
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT, node TEXT, tbl TEXT, key, written_at REAL);
+    """
+    CHANGE_RETENTION = 600  # seconds of change feed kept for slow pollers
+
+    def __init__(self, path: str, flush_interval: float = 1.0, node: Optional[str] = None,
+                 compact_interval: float = XP_COMPACT_INTERVAL, legacy_xp_guild: int = XP_LEGACY_GUILD_ID):
+        super().__init__()
+        self.path = path
+        self.flush_interval = flush_interval
+        self.node = node
+        self.compact_interval = compact_interval
+        self.legacy_xp_guild = legacy_xp_guild
+        self._change_seq = 0  # last change feed entry applied
+        self._xp_seq = 0  # last XP ledger event applied
+        self._pruned_at = 0.0
+        self._compacted_at = time.monotonic()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state-store")
+        self._pending: Dict = {}  # (table, key) -> row tuple, or None to delete
+        self._xp_events: List = []  # ledger rows not yet written
+        self._study_rows: List = []  # study-time increments not yet written
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self.SCHEMA)
+        return conn
+
+    def _migrate_user_xp(self):
+        """Credit global XP totals from before the ledger to one guild's all-time board"""
+        if not self.legacy_xp_guild:
+            logger.error("Found XP totals from before per-server boards; set XP_LEGACY_GUILD_ID to the server they belong to. "
+                         "They are kept, but not shown, until then.")
+            return
+        with self._conn:
+            if self._conn.execute("SELECT 1 FROM xp_rollups WHERE guild_id = ? AND window = 'all' LIMIT 1",
+                                  (self.legacy_xp_guild,)).fetchone() is not None:
+                logger.error(f"Server {self.legacy_xp_guild} already has an all-time XP board; "
+                             "the XP totals from before per-server boards are kept in user_xp, not merged")
+                return
+            self._conn.execute(
+                "INSERT INTO xp_rollups SELECT ?, 'all', 'all', user_id, xp FROM user_xp", (self.legacy_xp_guild,)
+            )
+            self._conn.execute("DELETE FROM user_xp")  # Same transaction, so only rows just copied
+        logger.info(f"Moved XP totals from before per-server boards to server {self.legacy_xp_guild}")
+
+    def _load_xp(self, cur):
+        """Rollups of the current periods plus every event not compacted yet, read as one snapshot"""
+        now = datetime.utcnow()
+        cur.execute("BEGIN")
+        try:
+            rollups = cur.execute(
+                "SELECT guild_id, window, period, user_id, xp FROM xp_rollups "
+                "WHERE window = 'all' OR (window = 'weekly' AND period = ?) OR (window = 'daily' AND period = ?)",
+                (xp_period('weekly', now), xp_period('daily', now))
+            ).fetchall()
+            events = cur.execute("SELECT seq, guild_id, user_id, amount, at FROM xp_events ORDER BY seq").fetchall()
+        finally:
+            cur.execute("COMMIT")
+        if events:
+            self._xp_seq = events[-1][0]
+        return rollups, [(guild_id, user_id, amount, datetime.fromisoformat(at)) for _, guild_id, user_id, amount, at in events]
+
+    def _load_study_time(self, cur) -> List:
+        """Study-time totals per guild and user for each window's current period, as (guild_id, window, period, user_id, seconds)"""
+        now = datetime.utcnow()
+        rows = []
+        for window in XP_WINDOWS:
+            period = xp_period(window, now)
+            where = "" if window == 'all' else "WHERE day >= ?" if window == 'weekly' else "WHERE day = ?"
+            rows += [(guild_id, window, period, user_id, seconds) for guild_id, user_id, seconds in cur.execute(
+                f"SELECT guild_id, user_id, SUM(seconds) FROM study_time {where} GROUP BY guild_id, user_id",
+                () if window == 'all' else (period,))]
+        return rows
+
+    def _load(self) -> Dict:
+        self._conn = self._connect()
+        cur = self._conn.cursor()
+        if cur.execute("SELECT 1 FROM user_xp LIMIT 1").fetchone() is not None:
+            self._migrate_user_xp()
+        rollups, events = self._load_xp(cur)
+        state = {
+            'cases': {row[0]: _decode_record(row[1], CaseRecord) for row in cur.execute(
+                "SELECT case_id, data FROM cases WHERE status != 'closed'")},
+            'xp_rollups': rollups,
+            'xp_events': events,
+            'study_time': self._load_study_time(cur),
+            'reminders': [(row[0], row[1], _decode_record(row[2], ReminderRecord)) for row in cur.execute(
+                "SELECT reminder_id, user_id, data FROM reminders")],
+            'timers': {row[0]: _decode_record(row[1], TimerRecord) for row in cur.execute(
+                "SELECT user_id, data FROM timers")},
+        }
+        if self.node is None:
+            self._counters = {key: int(value) for key, value in cur.execute("SELECT key, value FROM meta")}
+        else:
+            self._change_seq = cur.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        return state
+
+    async def open(self) -> Dict:
+        loop = asyncio.get_running_loop()
+        state = await loop.run_in_executor(self._executor, self._load)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(
+            f"Recovered {len(state['cases'])} open case(s), {len(state['xp_rollups'])} XP rollup(s) "
+            f"+ {len(state['xp_events'])} ledger event(s), {len(state['study_time'])} study-time total(s), "
+            f"{len(state['reminders'])} reminder(s) and {len(state['timers'])} timer(s) from {self.path}"
+        )
+        return state
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending) + len(self._xp_events) + len(self._study_rows)
+
+    def put_case(self, case_id: int, data: CaseRecord):
+        self._pending[('cases', case_id)] = (case_id, data.user_id, data.thread_id, data.status, data.to_dict())
+
+    def append_xp(self, guild_id: int, user_id: int, amount: int, at: datetime):
+        self._xp_events.append((self.node, guild_id, user_id, amount, at.isoformat()))
+
+    def add_study_time(self, rows: List):
+        self._study_rows += rows
+
+    def put_reminder(self, reminder_id: int, user_id: int, data: ReminderRecord):
+        self._pending[('reminders', reminder_id)] = (reminder_id, user_id, from_epoch(data.time), data.to_dict())
+
+    def delete_reminder(self, reminder_id: int):
+        self._pending[('reminders', reminder_id)] = None
+
+    def put_timer(self, user_id: int, data: TimerRecord):
+        self._pending[('timers', user_id)] = (user_id, data.to_dict())
+
+    def delete_timer(self, user_id: int):
+        self._pending[('timers', user_id)] = None
+
+    def put_transcript(self, case_id: int, data: Dict):
+        self._pending[('transcripts', case_id)] = (
+            case_id, data['user_id'], data['closed_at'], data['path'], data['messages'], data['bytes'])
+
+    _KEY_COLUMNS = {'cases': 'case_id', 'reminders': 'reminder_id', 'timers': 'user_id', 'transcripts': 'case_id'}
+
+    def _write_batch(self, batch: Dict, xp_events: List, study_rows: List):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO xp_events (node, guild_id, user_id, amount, at) VALUES (?, ?, ?, ?, ?)", xp_events
+            )
+            self._conn.executemany(
+                "INSERT INTO study_time VALUES (?, ?, ?, ?, ?) ON CONFLICT DO UPDATE SET seconds = seconds + excluded.seconds",
+                study_rows
+            )
+            if self.node is not None:
+                now = time.time()
+                self._conn.executemany(
+                    "INSERT INTO changes (node, tbl, key, written_at) VALUES (?, ?, ?, ?)",
+                    [(self.node, table, key, now) for table, key in batch]
+                )
+            for (table, key), row in batch.items():
+                if row is None:
+                    self._conn.execute(f"DELETE FROM {table} WHERE {self._KEY_COLUMNS[table]} = ?", (key,))
+                else:
+                    row = tuple(
+                        _encode_record(value) if isinstance(value, dict)
+                        else value.isoformat() if isinstance(value, datetime)
+                        else value
+                        for value in row
+                    )
+                    placeholders = ", ".join("?" * len(row))
+                    self._conn.execute(f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", row)
+
+    async def flush(self):
+        """Commit every pending write in a single transaction off the event loop"""
+        if not (self._pending or self._xp_events or self._study_rows) or self._conn is None:
+            return
+        batch, self._pending = self._pending, {}
+        xp_events, self._xp_events = self._xp_events, []
+        study_rows, self._study_rows = self._study_rows, []
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._write_batch, batch, xp_events, study_rows)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(batch) + len(xp_events) + len(study_rows)} state write(s): {e}")
+            # Keep the failed writes unless they were superseded meanwhile
+            for key, row in batch.items():
+                self._pending.setdefault(key, row)
+            self._xp_events[:0] = xp_events
+            self._study_rows[:0] = study_rows
+
+    async def next_id(self, name: str) -> int:
+        if self.node is None:
+            # Only process on this store: allocate in memory, written in the same batch as the record it numbers
+            value = await super().next_id(name)
+            self._pending[('meta', name)] = (name, str(value + 1))
+            return value
+        
+        def allocate():
+            with self._conn:
+                row = self._conn.execute(
+                    "UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = ? RETURNING value", (name,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("INSERT INTO meta VALUES (?, ?)", (name, "2"))
+                    return 1
+                return int(row[0]) - 1
+        return await asyncio.get_running_loop().run_in_executor(self._executor, allocate)
+
+    async def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        def acquire():
+            now = time.time()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO leases VALUES (?, ?, ?) ON CONFLICT(name) DO UPDATE "
+                    "SET holder = excluded.holder, expires_at = excluded.expires_at "
+                    "WHERE leases.holder = excluded.holder OR leases.expires_at < ?",
+                    (name, holder, now + ttl, now)
+                )
+                row = self._conn.execute("SELECT holder FROM leases WHERE name = ?", (name,)).fetchone()
+            return row[0] == holder
+        return await asyncio.get_running_loop().run_in_executor(self._executor, acquire)
+
+    async def release_lease(self, name: str, holder: str):
+        def release():
+            with self._conn:
+                self._conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder))
+        await asyncio.get_running_loop().run_in_executor(self._executor, release)
+
+    _VALUE_COLUMNS = {'cases': 'data', 'reminders': 'user_id, data', 'timers': 'data'}
+
+    def _read_changes(self) -> List:
+        cur = self._conn.cursor()
+        rows = cur.execute(
+            "SELECT seq, node, tbl, key FROM changes WHERE seq > ? ORDER BY seq", (self._change_seq,)
+        ).fetchall()
+        if rows:
+            self._change_seq = rows[-1][0]
+        
+        changes = {}
+        for _, node, table, key in rows:
+            if node != self.node and table in self._VALUE_COLUMNS:
+                changes.pop((table, key), None)  # Keep the latest position of each row
+                changes[(table, key)] = None
+        result = []
+        for table, key in changes:
+            row = cur.execute(
+                f"SELECT {self._VALUE_COLUMNS[table]} FROM {table} WHERE {self._KEY_COLUMNS[table]} = ?", (key,)
+            ).fetchone()
+            if row is None:
+                value = None
+            elif table == 'reminders':
+                value = (row[0], _decode_record(row[1], ReminderRecord))
+            else:
+                value = _decode_record(row[0], CaseRecord if table == 'cases' else TimerRecord)
+            result.append((table, key, value))
+        
+        # The XP ledger is append-only, so new events are read directly instead of via the feed
+        events = cur.execute(
+            "SELECT seq, node, guild_id, user_id, amount, at FROM xp_events WHERE seq > ? ORDER BY seq", (self._xp_seq,)
+        ).fetchall()
+        if events:
+            self._xp_seq = events[-1][0]
+        result += [('xp_events', seq, (guild_id, user_id, amount, datetime.fromisoformat(at)))
+                   for seq, node, guild_id, user_id, amount, at in events if node != self.node]
+        
+        now = time.time()
+        if now - self._pruned_at > 60:
+            self._pruned_at = now
+            with self._conn:
+                self._conn.execute("DELETE FROM changes WHERE written_at < ?", (now - self.CHANGE_RETENTION,))
+        return result
+
+    async def poll_changes(self) -> List:
+        if self.node is None or self._conn is None:
+            return []
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._read_changes)
+
+    def _compact_xp(self) -> int:
+        # Events other processes may not have polled yet stay in the ledger a while longer
+        cutoff = datetime.utcnow() - timedelta(seconds=self.CHANGE_RETENTION if self.node is not None else 0)
+        with self._conn:
+            # Take the write lock before reading, so two processes can't fold the same events
+            self._conn.execute("BEGIN IMMEDIATE")
+            events = self._conn.execute(
+                "SELECT seq, guild_id, user_id, amount, at FROM xp_events WHERE at <= ?", (cutoff.isoformat(),)
+            ).fetchall()
+            if not events:
+                return 0
+            totals = collections.Counter()
+            for _, guild_id, user_id, amount, at in events:
+                at = datetime.fromisoformat(at)
+                for window in XP_WINDOWS:
+                    totals[(guild_id, window, xp_period(window, at), user_id)] += amount
+            self._conn.executemany(
+                "INSERT INTO xp_rollups VALUES (?, ?, ?, ?, ?) ON CONFLICT DO UPDATE SET xp = xp + excluded.xp",
+                [key + (xp,) for key, xp in totals.items()]
+            )
+            self._conn.executemany("DELETE FROM xp_events WHERE seq = ?", [(event[0],) for event in events])
+        return len(events)
+
+    async def compact_xp(self) -> int:
+        """Fold ledger events into rollups and drop them, in one transaction"""
+        if self._conn is None:
+            return 0
+        self._compacted_at = time.monotonic()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._compact_xp)
+        except Exception as e:
+            logger.error(f"Failed to compact the XP ledger: {e}")
+            return 0
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            if time.monotonic() - self._compacted_at >= self.compact_interval:
+                await self.compact_xp()
+
+    async def get_case(self, case_id: int) -> Optional[CaseRecord]:
+        pending = self._pending.get(('cases', case_id))
+        if pending is not None:
+            return CaseRecord.from_dict(pending[4])
+        if self._conn is None:
+            return None
+        def fetch():
+            row = self._conn.execute("SELECT data FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+            return _decode_record(row[0], CaseRecord) if row else None
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fetch)
+
+    async def list_cases(self, status: Optional[str], offset: int, limit: int):
+        await self.flush()  # Include writes that are still pending
+        def query():
+            where, params = ("WHERE status = ?", (status,)) if status else ("", ())
+            total = self._conn.execute(f"SELECT COUNT(*) FROM cases {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT case_id, data FROM cases {where} ORDER BY case_id DESC LIMIT ? OFFSET ?",
+                params + (limit, offset)
+            ).fetchall()
+            return [(case_id, _decode_record(data, CaseRecord)) for case_id, data in rows], total
+        return await asyncio.get_running_loop().run_in_executor(self._executor, query)
+
+    _TRANSCRIPT_COLUMNS = ('case_id', 'user_id', 'closed_at', 'path', 'messages', 'bytes')
+
+    def _transcript_row(self, row) -> Dict:
+        data = dict(zip(self._TRANSCRIPT_COLUMNS, row))
+        data['closed_at'] = datetime.fromisoformat(data['closed_at'])
+        return data
+
+    async def get_transcript(self, case_id: int) -> Optional[Dict]:
+        await self.flush()
+        def fetch():
+            row = self._conn.execute("SELECT * FROM transcripts WHERE case_id = ?", (case_id,)).fetchone()
+            return self._transcript_row(row) if row else None
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fetch)
+
+    async def list_transcripts(self, user_id: Optional[int], start: Optional[datetime], end: Optional[datetime], limit: int) -> List[Dict]:
+        await self.flush()
+        def query():
+            conditions, params = [], []
+            for condition, value in (("user_id = ?", user_id), ("closed_at >= ?", start), ("closed_at < ?", end)):
+                if value is not None:
+                    conditions.append(condition)
+                    params.append(value.isoformat() if isinstance(value, datetime) else value)
+            where = "WHERE " + " AND ".join(conditions) if conditions else ""
+            rows = self._conn.execute(
+                f"SELECT * FROM transcripts {where} ORDER BY closed_at DESC LIMIT ?", params + [limit]
+            ).fetchall()
+            return [self._transcript_row(row) for row in rows]
+        return await asyncio.get_running_loop().run_in_executor(self._executor, query)
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        await self.compact_xp()  # So the next startup has less ledger to replay
+        if self._conn is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+def staff_reply_embed(case_id: int, message: str, staff) -> discord.Embed:
+    embed = discord.Embed(
+        title=f"Staff Response - Case #{case_id}",
+        description=message,
+        color=discord.Color.green(),
+        timestamp=datetime.utcnow()
+    )
+    embed.set_footer(text=f"Replied by {staff.display_name}")
+    return embed
+
+def case_confirmation_embed(case_id: int, staff_notified: bool) -> discord.Embed:
+    if staff_notified:
+        status = "Our staff team has been notified and will respond as soon as possible."
+    else:
+        status = "We're passing it on to our staff team now; this message will update once they've been notified."
+    embed = discord.Embed(
+        title="✅ Support Case Created",
+        description=f"Your case has been submitted successfully!\n\n**Case ID:** #{case_id}\n**Status:** Open\n\n{status}",
+        color=discord.Color.green()
+    )
+    embed.set_footer(text="You'll receive updates about your case here in DMs")
+    return embed
+
+def command_fingerprint(tree, guild=None) -> str:
+    """Stable hash of the command definitions Discord would receive on sync"""
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+                     key=lambda command: (command['name'], command.get('type', 1)))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def create_state_store() -> StateStore:
+    if STATE_BACKEND == "memory":
+        if CLUSTERED:
+            raise RuntimeError("SHARD_IDS runs part of a cluster, which needs the shared sqlite state backend")
+        return StateStore()
+    # Only log changes for other processes when this one runs a subset of the shards
+    return SQLiteStateStore(STATE_DB_PATH, flush_interval=STATE_FLUSH_INTERVAL, node=CLUSTER_NODE if CLUSTERED else None)
+
+# Metrics
+class Histogram:
+    """Cumulative latency histogram with fixed buckets (seconds)"""
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    __slots__ = ('counts', 'sum', 'count')
 
-class DungeonKeeper(commands.Bot):
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile"""
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.BUCKETS + (float('inf'),), self.counts):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return 0.0
+
+class Metrics:
+    """Latency histograms, counters and sampled gauges"""
+    PREFIX = "dungeonkeeper"
+    LAG_INTERVAL = 0.25
+
+    def __init__(self):
+        self._histograms: Dict[str, tuple] = {}  # name -> (help, label, {label value: Histogram})
+        self._counters: Dict[str, tuple] = {}  # name -> (help, label, Counter)
+        self._gauges: List[tuple] = []  # (name, help, label, kind, fn)
+        self._tasks: List[asyncio.Task] = []
+        self._runner = None
+        self.max_loop_lag = 0.0
+        self.histogram('command_latency_seconds', "Slash command handler latency", 'command')
+        self.histogram('event_latency_seconds', "Gateway event handler latency", 'event')
+        self.histogram('event_loop_lag_seconds', "Extra delay observed by a timed sleep", None)
+        self.histogram('rest_latency_seconds', "Discord REST request round trip", 'method')
+        self.counter('command_errors_total', "Slash commands that raised an error", 'command')
+
+    def histogram(self, name: str, help_text: str, label: Optional[str]):
+        self._histograms[name] = (help_text, label, {})
+
+    def counter(self, name: str, help_text: str, label: Optional[str]):
+        self._counters[name] = (help_text, label, collections.Counter())
+
+    def gauge(self, name: str, help_text: str, fn, label: Optional[str] = None, kind: str = 'gauge'):
+        """Register a value sampled at scrape time; fn returns a number or {label value: number}"""
+        self._gauges.append((name, help_text, label, kind, fn))
+
+    def observe(self, name: str, value: float, label_value: str = ''):
+        series = self._histograms[name][2]
+        histogram = series.get(label_value)
+        if histogram is None:
+            histogram = series[label_value] = Histogram()
+        histogram.observe(value)
+
+    def inc(self, name: str, label_value: str = '', amount: int = 1):
+        self._counters[name][2][label_value] += amount
+
+    def _labels(self, label: Optional[str], value: str, extra: str = '') -> str:
+        parts = [f'{label}="{value}"'] if label else []
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for name, (help_text, label, series) in self._histograms.items():
+            full = f"{self.PREFIX}_{name}"
+            lines += [f"# HELP {full} {help_text}", f"# TYPE {full} histogram"]
+            for value, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(Histogram.BUCKETS + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float('inf') else f'le="{bound}"'
+                    lines.append(f"{full}_bucket{self._labels(label, value, le)} {cumulative}")
+                lines.append(f"{full}_sum{self._labels(label, value)} {histogram.sum}")
+                lines.append(f"{full}_count{self._labels(label, value)} {histogram.count}")
+        for name, (help_text, label, counter) in self._counters.items():
+            full = f"{self.PREFIX}_{name}"
+            lines += [f"# HELP {full} {help_text}", f"# TYPE {full} counter"]
+            lines += [f"{full}{self._labels(label, value)} {count}" for value, count in counter.items()]
+        for name, help_text, label, kind, fn in self._gauges:
+            full = f"{self.PREFIX}_{name}"
+            lines += [f"# HELP {full} {help_text}", f"# TYPE {full} {kind}"]
+            sample = fn()
+            if isinstance(sample, dict):
+                lines += [f"{full}{self._labels(label, key)} {count}" for key, count in sample.items()]
+            else:
+                lines.append(f"{full} {sample}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        """JSON-friendly summary for the dump file"""
+        return {
+            'time': datetime.utcnow().isoformat(),
+            'histograms': {
+                name: {value or name: {'count': h.count, 'sum': round(h.sum, 6),
+                                       'p50': h.quantile(0.5), 'p99': h.quantile(0.99)}
+                       for value, h in series.items()}
+                for name, (_, _, series) in self._histograms.items()
+            },
+            'counters': {name: dict(counter) for name, (_, _, counter) in self._counters.items()},
+            'gauges': {name: fn() for name, _, _, _, fn in self._gauges},
+            'max_loop_lag': self.max_loop_lag,
+        }
+
+    async def _sample_loop_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.LAG_INTERVAL)
+            lag = max(0.0, loop.time() - start - self.LAG_INTERVAL)
+            self.max_loop_lag = max(self.max_loop_lag, lag)
+            self.observe('event_loop_lag_seconds', lag)
+
+    async def _dump_loop(self, path: str, interval: float):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            payload = json.dumps(self.snapshot(), indent=2)
+            def write():
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            try:
+                await loop.run_in_executor(None, write)
+            except OSError as e:
+                logger.error(f"Failed to write metrics dump: {e}")
+
+    async def start(self, port: int = 0, dump_path: str = "", dump_interval: float = 60.0):
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._sample_loop_lag()))
+        if dump_path:
+            self._tasks.append(asyncio.create_task(self._dump_loop(dump_path, dump_interval)))
+        if port:
+            from aiohttp import web
+            
+            async def handle(request):
+                return web.Response(text=self.render(), content_type='text/plain', charset='utf-8')
+            
+            app = web.Application()
+            app.router.add_get('/metrics', handle)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, '127.0.0.1', port).start()
+            logger.info(f"Serving metrics on http://127.0.0.1:{port}/metrics")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+def auto_defer(ephemeral: bool = False):
+    """Let InteractionDeadlines defer this slash command if it would miss the acknowledgement deadline"""
+    def decorator(command):
+        command.extras['auto_defer'] = {'ephemeral': ephemeral}
+        return command
+    return decorator
+
+async def respond(interaction: discord.Interaction, content: Optional[str] = None, **kwargs):
+    """Answer an interaction, as a followup if it was already acknowledged (e.g. deferred automatically)"""
+    async with interaction.extras.setdefault('response_lock', asyncio.Lock()):
+        interaction.extras.setdefault('acknowledged_at', time.perf_counter())
+        if content is not None:
+            kwargs['content'] = content
+        if interaction.response.is_done():
+            return await interaction.followup.send(**kwargs)
+        return await interaction.response.send_message(**kwargs)
+
+async def acknowledge(interaction: discord.Interaction, **kwargs):
+    """Defer an interaction unless it was already acknowledged"""
+    async with interaction.extras.setdefault('response_lock', asyncio.Lock()):
+        interaction.extras.setdefault('acknowledged_at', time.perf_counter())
+        if not interaction.response.is_done():
+            await interaction.response.defer(**kwargs)
+
+class InteractionDeadlines:
+    """Defers @auto_defer slash commands before Discord's acknowledgement deadline"""
+    ALPHA = 0.2  # weight of the newest sample in each command's moving average
+    SAFETY = 1.25  # margin as a multiple of the p99 defer round trip
+
+    def __init__(self, deadline: float = INTERACTION_DEADLINE, margin: float = DEFER_MARGIN):
+        self.deadline = deadline
+        self.min_margin = margin
+        self._round_trips = collections.deque(maxlen=200)  # seconds from each defer falling due until Discord answered
+        self._predicted: Dict[str, float] = {}  # command -> average seconds until it acknowledges
+        self._timers: Dict[int, asyncio.TimerHandle] = {}  # interaction id -> pending defer
+        self._tasks: set = set()
+        self.defers = collections.Counter()  # command -> automatic defers
+        self.counters = collections.Counter()  # why commands were deferred, and defers that came too late
+
+    def __len__(self):
+        return len(self._timers)
+
+    def predicted(self, command: str) -> float:
+        return self._predicted.get(command, 0.0)
+
+    @property
+    def margin(self) -> float:
+        if not self._round_trips:
+            return self.min_margin
+        ordered = sorted(self._round_trips)
+        return max(self.min_margin, ordered[int(len(ordered) * 0.99)] * self.SAFETY)
+
+    def watch(self, interaction: discord.Interaction):
+        """Start the clock for a command interaction that opted in"""
+        command = interaction.command
+        if interaction.type is not discord.InteractionType.application_command or command is None:
+            return
+        options = command.extras.get('auto_defer')
+        if options is None:
+            return
+        interaction.extras.setdefault('response_lock', asyncio.Lock())
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        budget = self.deadline - self.margin - elapsed
+        if self.predicted(command.qualified_name) >= budget:
+            reason, delay = 'predicted', 0.0
+        else:
+            reason, delay = 'deadline', budget
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, delay)
+        self._timers[interaction.id] = loop.call_later(
+            delay, self._fire, interaction, options['ephemeral'], reason, loop.time() + delay
+        )
+
+    def _fire(self, interaction: discord.Interaction, ephemeral: bool, reason: str, due: float):
+        self._timers.pop(interaction.id, None)
+        task = asyncio.create_task(self._defer(interaction, ephemeral, reason, due))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _defer(self, interaction: discord.Interaction, ephemeral: bool, reason: str, due: float):
+        loop = asyncio.get_running_loop()
+        lag = loop.time() - due
+        async with interaction.extras['response_lock']:
+            if interaction.response.is_done():
+                return
+            # Time spent waiting for the command's own response isn't part of a defer's round trip
+            sent_at = loop.time()
+            try:
+                await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+                self._round_trips.append(lag + loop.time() - sent_at)
+            except discord.NotFound:
+                self._round_trips.append(lag + loop.time() - sent_at)
+                self.counters['expired'] += 1  # Unknown interaction: the deadline had already passed
+                return
+            except (discord.HTTPException, discord.InteractionResponded) as e:
+                logger.warning(f"Failed to defer /{interaction.command.qualified_name}: {e}")
+                return
+        self.counters[reason] += 1
+        self.defers[interaction.command.qualified_name] += 1
+
+    def finish(self, interaction: discord.Interaction, started_at: Optional[float]):
+        """Stop the clock and learn how long the command took to acknowledge"""
+        timer = self._timers.pop(interaction.id, None)
+        if timer is not None:
+            timer.cancel()
+        command = interaction.command
+        if started_at is None or command is None or 'auto_defer' not in command.extras:
+            return
+        sample = interaction.extras.get('acknowledged_at', time.perf_counter()) - started_at
+        name = command.qualified_name
+        previous = self._predicted.get(name)
+        self._predicted[name] = sample if previous is None else previous + self.ALPHA * (sample - previous)
+
+class InstrumentedCommandTree(discord.app_commands.CommandTree):
+    """Command tree that records per-command latency and errors and defers slow commands in time"""
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras['started_at'] = time.perf_counter()
+        set_log_context(command=interaction.command.qualified_name if interaction.command else None,
+                        user_id=interaction.user.id, guild_id=interaction.guild_id)
+        self.client.deadlines.watch(interaction)
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        command = interaction.command.qualified_name if interaction.command else 'unknown'
+        started_at = interaction.extras.get('started_at')
+        self.client.deadlines.finish(interaction, started_at)
+        if started_at is not None:
+            self.client.metrics.observe('command_latency_seconds', time.perf_counter() - started_at, command)
+        self.client.metrics.inc('command_errors_total', command)
+        if not isinstance(error, discord.app_commands.CheckFailure):
+            await super().on_error(interaction, error)
+        elif not interaction.response.is_done():
+            # No cog handler answered the refusal; say so rather than leave "The application did not respond"
+            try:
+                await respond(interaction, "❌ You're not allowed to use this command.", ephemeral=True)
+            except discord.HTTPException:
+                pass
+
+class DungeonKeeper(commands.AutoShardedBot if SHARD_COUNT else commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
         intents.message_content = True
-        intents.members = True
+        intents.members = not LEAN_MODE
         intents.voice_states = True
         intents.dm_messages = True
         
-        super().__init__(command_prefix='!', intents=intents)
+        options = {}
+        if LEAN_MODE:
+            # Only members currently in voice are cached, guilds are never chunked,
+            # the message cache is capped and the unused prefix help command is dropped
+            member_cache_flags = discord.MemberCacheFlags.none()
+            member_cache_flags.voice = True
+            options.update(
+                member_cache_flags=member_cache_flags,
+                chunk_guilds_at_startup=False,
+                max_messages=LEAN_MAX_MESSAGES or None,
+                help_command=None
+            )
+        if SHARD_COUNT:
+            options.update(shard_count=SHARD_COUNT, shard_ids=SHARD_IDS or None)
+        
+        # Time every REST round trip so slow commands can be told apart from slow Discord
+        http_trace = aiohttp.TraceConfig()
+        http_trace.on_request_start.append(self._on_request_start)
+        http_trace.on_request_end.append(self._on_request_end)
+        http_trace.on_request_exception.append(self._on_request_end)
+        
+        super().__init__(command_prefix='!', intents=intents, tree_cls=InstrumentedCommandTree, http_trace=http_trace, **options)
         
         # In-memory storage
-        self.cases: Dict[int, Dict] = {}  # case_id -> case_data
-        self.user_xp: Dict[int, int] = {}  # user_id -> xp
-        self.active_timers: Dict[int, Dict] = {}  # user_id -> timer_data
-        self.pending_cases: Dict[int, bool] = {}  # user_id -> waiting for case description
-        self.reminders: Dict[int, List[Dict]] = {}  # user_id -> list of reminders
-        self.case_counter = 1
+        self.state_store = create_state_store()
+        self.cases = CaseRegistry(self.state_store)
+        self.xp = XPLedger(self.state_store)  # per-guild XP boards (all-time, weekly, daily)
+        self.study_time = StudyTimeTracker(self)  # voice study sessions and daily rollups
+        self.active_timers: Dict[int, TimerRecord] = {}  # user_id -> timer
+        self.started_at = time.monotonic()
+        self.startup_timings: Dict[str, float] = {}
+        self.cog_timings: Dict[str, Dict[str, float]] = {}  # cog -> seconds spent importing / setting up
+        self._cog_setup_seconds = 0.0
+        self.support_sessions = SupportSessions()  # support prompts, pending cases and DM throttling
+        self.reminders: Dict[int, List[ReminderRecord]] = {}  # user_id -> list of reminders
+        self.reminders_by_id: Dict[int, tuple] = {}  # reminder_id -> (user_id, reminder)
+        self.reminder_scheduler = ReminderScheduler(self)
+        self.timer_engine = TimerEngine(self)
+        self.voice_moderator = VoiceModerator(concurrency=MODERATION_CONCURRENCY)
+        self.dm_queue = DeliveryQueue(self, workers=DM_WORKERS)
+        self.channel_edits = ChannelEditQueue()
+        self.attachment_mirror = AttachmentMirror(concurrency=ATTACHMENT_CONCURRENCY)
+        self.staff_notifier = StaffNotifier(self)
+        self.transcripts = TranscriptExporter(self.state_store)
+        self.deadlines = InteractionDeadlines()
+        self.metrics = Metrics()
+        
+        # Reminder/pomodoro dispatch and the DM support bridge run on one process only.
+        # DMs are delivered to shard 0, so only a process running it can hold the bridge.
+        self.cluster = ClusterCoordinator(self, CLUSTER_NODE)
+        self._terminating: Optional[asyncio.Future] = None  # close() started by SIGTERM
+        self._reminder_deliveries: set = set()  # due reminders waiting for their DM
+        self.cluster.add_duty('scheduler', start=self.start_schedulers, stop=self.stop_schedulers)
+        self.cluster.add_duty('staff_bridge', start=self.start_staff_bridge, stop=self.staff_notifier.stop,
+                              eligible=not SHARD_IDS or 0 in SHARD_IDS)
+        self.register_metrics()
         
         # Load configuration and data
         self.load_data()
@@ -41,7 +1246,7 @@ class DungeonKeeper(commands.Bot):
         """Load study quotes and topics from JSON files"""
         try:
             with open('data/study_quotes.json', 'r') as f:
-                self.study_quotes = json.load(f)
+                self.study_quotes = json_loads(f.read())
         except FileNotFoundError:
             self.study_quotes = [
                 "The expert in anything was once a beginner.",
@@ -52,7 +1257,7 @@ class DungeonKeeper(commands.Bot):
         
         try:
             with open('data/topics.json', 'r') as f:
-                self.topics = json.load(f)
+                self.topics = json_loads(f.read())
         except FileNotFoundError:
             self.topics = [
                 "What's the most interesting thing you learned this week?",
@@ -61,18 +1266,252 @@ class DungeonKeeper(commands.Bot):
                 "What motivates you to keep studying?"
             ]
 
+    def register_metrics(self):
+        """Expose backlog sizes as gauges"""
+        self.metrics.gauge('gateway_latency_seconds', "Gateway heartbeat latency",
+                           lambda: self.latency if math.isfinite(self.latency) else 0.0)
+        self.metrics.gauge('reminders_pending', "Reminders waiting to fire", lambda: len(self.reminder_scheduler))
+        self.metrics.gauge('timers_active', "Running pomodoro timers", lambda: len(self.active_timers))
+        self.metrics.gauge('timer_heap_entries', "Timer engine heap size, including cancelled entries", lambda: len(self.timer_engine))
+        self.metrics.gauge('dm_queue_depth', "Queued DMs per priority class", lambda: self.dm_queue.stats()['depth'], label='priority')
+        self.metrics.gauge('dm_delivery_total', "DM delivery outcomes", lambda: dict(self.dm_queue.counters), label='outcome', kind='counter')
+        self.metrics.gauge('xp_boards', "Guild/window XP boards in memory", lambda: len(self.xp))
+        self.metrics.gauge('study_sessions_open', "Members currently credited with voice study time", lambda: len(self.study_time))
+        self.metrics.gauge('study_rows_pending', "Daily study-time counters waiting for the next batch", lambda: self.study_time.pending_rows)
+        self.metrics.gauge('study_events_total', "Voice joins, leaves and moves, reconciled sessions and rollup rows written", lambda: dict(self.study_time.counters), label='kind', kind='counter')
+        self.metrics.gauge('channel_edits_pending', "Voice settings changes waiting for a channel edit", lambda: len(self.channel_edits))
+        self.metrics.gauge('channel_edit_total', "Channel changes requested and edit calls made", lambda: dict(self.channel_edits.counters), label='kind', kind='counter')
+        self.metrics.gauge('attachment_copies', "Support attachments waiting for or being copied", lambda: len(self.attachment_mirror))
+        self.metrics.gauge('attachment_copy_total', "Attachment copy outcomes (and bytes copied)", lambda: dict(self.attachment_mirror.counters), label='outcome', kind='counter')
+        self.metrics.gauge('staff_announcements_pending', "New cases waiting for their staff announcement or thread", lambda: len(self.staff_notifier))
+        self.metrics.gauge('staff_announcement_total', "Cases announced alone or in digests, digests posted, threads created and failures", lambda: dict(self.staff_notifier.counters), label='kind', kind='counter')
+        self.metrics.gauge('transcript_exports', "Case transcript exports waiting or running", lambda: len(self.transcripts))
+        self.metrics.gauge('transcript_export_total', "Transcript export outcomes (and messages written)", lambda: dict(self.transcripts.counters), label='outcome', kind='counter')
+        self.metrics.gauge('log_queue_depth', "Log records waiting for the writer thread", lambda: log_handler.depth)
+        self.metrics.gauge('log_records_skipped_total', "DEBUG/INFO log records dropped (queue full), sampled out, or written directly because the queue was full", lambda: dict(log_handler.counters), label='reason', kind='counter')
+        self.metrics.gauge('state_pending_writes', "Writes waiting for the next state flush", lambda: self.state_store.pending_writes)
+        self.metrics.gauge('cases_in_memory', "Cases in the in-memory working set", lambda: len(self.cases))
+        self.metrics.gauge('support_session_entries', "Support prompt, pending-case and throttle entries", lambda: len(self.support_sessions))
+        self.metrics.gauge('command_auto_defer_total', "Slash commands deferred automatically to meet the acknowledgement deadline", lambda: dict(self.deadlines.defers), label='command', kind='counter')
+        self.metrics.gauge('command_defer_margin_seconds', "Seconds before the acknowledgement deadline that automatic defers are sent", lambda: self.deadlines.margin)
+        self.metrics.gauge('command_deadline_total', "Automatic defers by reason (predicted slow or deadline near) and ones that came too late", lambda: dict(self.deadlines.counters), label='reason', kind='counter')
+        self.metrics.gauge('cog_load_seconds', "Import plus setup time of each loaded cog",
+                           lambda: {name: timing['import'] + timing['setup'] for name, timing in self.cog_timings.items()}, label='cog')
+        self.metrics.gauge('cluster_duty_held', "1 if this process holds the duty's lease", self.cluster.duty_states, label='duty')
+
+    async def _on_request_start(self, session, context, params):
+        context.started_at = time.perf_counter()
+
+    async def _on_request_end(self, session, context, params):
+        self.metrics.observe('rest_latency_seconds', time.perf_counter() - context.started_at, params.method)
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        started_at = interaction.extras.get('started_at')
+        self.deadlines.finish(interaction, started_at)
+        if started_at is not None:
+            latency = time.perf_counter() - started_at
+            self.metrics.observe('command_latency_seconds', latency, command.qualified_name)
+            log_sampled('command_completed', f"/{command.qualified_name} completed", latency_ms=round(latency * 1000, 2))
+
+    async def login(self, token: str):
+        # discord.py opens its REST session here, on http.connector when one is set
+        connector = http_connector()
+        if connector is not None:
+            self.http.connector = connector
+        await super().login(token)
+
     async def setup_hook(self):
-        """Sync slash commands when bot starts"""
+        """Restore persisted state and sync slash commands when bot starts"""
+        try:
+            # Deployments stop the bot with SIGTERM; shut down as cleanly as on Ctrl+C
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self.terminate)
+        except NotImplementedError:
+            pass  # No signal handlers on Windows event loops
+        await self.metrics.start(METRICS_PORT, METRICS_FILE, METRICS_DUMP_INTERVAL)
+        phase_start = time.monotonic()
+        await self.restore_state()
+        self.startup_timings['restore_state'] = time.monotonic() - phase_start
+        
+        # Feature commands are only imported now, and only for the cogs this deployment enables
+        phase_start = time.monotonic()
+        await self.load_cogs(COGS)
+        self.startup_timings['cogs'] = time.monotonic() - phase_start
+        
+        phase_start = time.monotonic()
+        await self.sync_commands_leased()
+        self.startup_timings['command_sync'] = time.monotonic() - phase_start
+        self.startup_timings['setup_done'] = time.monotonic() - self.started_at
+
+    async def load_cogs(self, names: List[str]):
+        """Load each named cog; one that fails to import is logged and skipped"""
+        for name in names:
+            try:
+                await self.load_cog(name)
+            except commands.ExtensionError as e:
+                logger.error(f"Failed to load cog {name}: {e.__cause__ or e}")
+
+    async def load_cog(self, name: str, reload: bool = False) -> Dict[str, float]:
+        """Load (or reload) cogs/<name>.py and record how long its import and setup took"""
+        self._cog_setup_seconds = 0.0
+        started_at = time.perf_counter()
+        if reload:
+            await self.reload_extension(f"cogs.{name}")
+        else:
+            await self.load_extension(f"cogs.{name}")
+        elapsed = time.perf_counter() - started_at
+        timing = {'import': elapsed - self._cog_setup_seconds, 'setup': self._cog_setup_seconds}
+        self.cog_timings[name] = timing
+        logger.info(f"{'Reloaded' if reload else 'Loaded'} cog {name}: import {timing['import'] * 1000:.1f} ms, "
+                    f"setup {timing['setup'] * 1000:.1f} ms", extra={'event': 'cog_loaded'})
+        return timing
+
+    async def add_cog(self, cog: commands.Cog, **kwargs):
+        started_at = time.perf_counter()
+        await super().add_cog(cog, **kwargs)
+        self._cog_setup_seconds += time.perf_counter() - started_at
+
+    async def sync_commands_leased(self):
+        """Sync commands unless another shard process is already doing it"""
         try:
-            synced = await self.tree.sync()
-            logger.info(f"Synced {len(synced)} command(s)")
+            if not CLUSTERED:
+                await self.sync_commands()
+            # Shard processes share one application; one sync at a time is enough
+            elif await self.state_store.acquire_lease('command_sync', CLUSTER_NODE, LEASE_TTL):
+                try:
+                    await self.sync_commands()
+                finally:
+                    await self.state_store.release_lease('command_sync', CLUSTER_NODE)
         except Exception as e:
             logger.error(f"Failed to sync commands: {e}")
 
+    async def sync_commands(self):
+        """Sync the command tree only when its definitions changed since the last sync"""
+        guild = discord.Object(id=DEV_GUILD_ID) if DEV_GUILD_ID else None
+        if guild is not None:
+            self.tree.copy_global_to(guild=guild)
+        
+        scope = f"{self.application_id}:{DEV_GUILD_ID or 'global'}"
+        fingerprint = command_fingerprint(self.tree, guild=guild)
+        
+        try:
+            with open(COMMAND_SYNC_CACHE, 'r') as f:
+                synced_fingerprints = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            synced_fingerprints = {}
+        
+        if not FORCE_COMMAND_SYNC and synced_fingerprints.get(scope) == fingerprint:
+            logger.info(f"Command definitions unchanged ({fingerprint[:12]}), skipping sync")
+            return
+        
+        synced = await self.tree.sync(guild=guild)
+        logger.info(f"Synced {len(synced)} command(s) to {'guild ' + str(DEV_GUILD_ID) if guild else 'all guilds'}")
+        
+        synced_fingerprints[scope] = fingerprint
+        os.makedirs(os.path.dirname(COMMAND_SYNC_CACHE) or '.', exist_ok=True)
+        tmp_path = COMMAND_SYNC_CACHE + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(synced_fingerprints, f, indent=2)
+        os.replace(tmp_path, COMMAND_SYNC_CACHE)
+
+    async def restore_state(self):
+        """Load the hot working set (open cases, XP boards, pending reminders and timers)"""
+        state = await self.state_store.open()
+        self.cases.load(state['cases'])
+        self.xp.load(state['xp_rollups'], state['xp_events'])
+        self.study_time.load(state['study_time'])
+        
+        for reminder_id, user_id, reminder in state['reminders']:
+            reminder.id = reminder_id
+            self.track_reminder(user_id, reminder)
+            self.reminder_scheduler.schedule(user_id, reminder)
+        
+        # Timers that ran out while offline are advanced silently once the engine starts
+        for user_id, timer in state['timers'].items():
+            self.active_timers[user_id] = timer
+            self.timer_engine.resume(user_id, timer)
+
+    def start_schedulers(self):
+        """Take over reminder and pomodoro dispatch, rebuilding both heaps from current state"""
+        self.reminder_scheduler.reset(
+            (reminder.time, user_id, reminder) for user_id, reminders in self.reminders.items() for reminder in reminders
+        )
+        self.timer_engine.reset((timer.phase_ends_at, user_id, timer) for user_id, timer in self.active_timers.items())
+        self.reminder_scheduler.start()
+        self.timer_engine.start()
+
+    def stop_schedulers(self):
+        self.reminder_scheduler.stop()
+        self.timer_engine.stop()
+        # The new holder dispatches from here on; rebuilt by start_schedulers if this process takes over again
+        self.reminder_scheduler.reset(())
+        self.timer_engine.reset(())
+
+    def start_staff_bridge(self):
+        """Take over case announcements, re-announcing open cases that never got a thread"""
+        self.staff_notifier.start()
+        for case_id in self.cases.with_status('open'):
+            data = self.cases.get(case_id)
+            if data.thread_id is None and case_id not in self.staff_notifier:
+                embed = discord.Embed(
+                    title=f"🆘 New Support Case #{case_id}",
+                    description=f"Opened by <@{data.user_id}> <t:{data.created_at}:R>; the original announcement was lost in a restart.",
+                    color=discord.Color.orange(),
+                    timestamp=from_epoch(data.created_at)
+                )
+                self.staff_notifier.submit(case_id, embed, f"Case #{case_id}", author=f"<@{data.user_id}>")
+
+    def apply_changes(self, changes: List):
+        """Apply rows other cluster processes wrote to the shared store, without writing them back"""
+        for table, key, value in changes:
+            if table == 'xp_events':
+                self.xp.apply(*value)
+            elif table == 'cases' and value is not None:
+                self.cases.apply(key, value)
+            elif table == 'timers':
+                if value is None:
+                    self.active_timers.pop(key, None)
+                else:
+                    self.active_timers[key] = value
+                    self.timer_engine.resume(key, value)
+            elif table == 'reminders':
+                # Replace the old copy of a deleted or rewritten reminder
+                if self.untrack_reminder(key) is not None:
+                    self.reminder_scheduler.cancel()
+                if value is not None:
+                    user_id, reminder = value
+                    reminder.id = key
+                    self.track_reminder(user_id, reminder)
+                    self.reminder_scheduler.schedule(user_id, reminder)
+
+    async def resolve_channel(self, channel_id: int):
+        """Cached channel lookup that falls back to REST for channels on another process's shards"""
+        channel = self.get_channel(channel_id)
+        if channel is None:
+            try:
+                channel = await self.fetch_channel(channel_id)
+            except discord.HTTPException:
+                return None
+        return channel
+
+    def terminate(self):
+        if self._terminating is None:
+            logger.info("Received SIGTERM, shutting down")
+            self._terminating = asyncio.ensure_future(self.close())
+
+    async def close(self):
+        """Flush pending state writes before disconnecting"""
+        await self.cluster.stop()
+        await self.dm_queue.close()
+        self.study_time.stop()
+        await self.attachment_mirror.close()
+        await self.transcripts.close()
+        await self.metrics.stop()
+        await self.state_store.close()
+        await super().close()
+
     async def on_ready(self):
         """Called when bot is ready"""
-        logger.info(f'{self.user} has logged in!')
-        print(f'DungeonKeeper is online as {self.user}')
+        logger.info(f'DungeonKeeper is online as {self.user}')
         
         # Set bot status to online
         await self.change_presence(
@@ -83,29 +1522,105 @@ class DungeonKeeper(commands.Bot):
             )
         )
         
-        # Start reminder task
-        self.check_reminders.start()
+        # Start DM delivery; reminder and pomodoro dispatch start once this process holds their lease
+        self.dm_queue.start()
+        self.study_time.start()
+        self.cluster.start()
+        
+        if 'ready' not in self.startup_timings:
+            self.startup_timings['ready'] = time.monotonic() - self.started_at
+            timings = self.startup_timings
+            logger.info(
+                f"Startup: restore_state {timings['restore_state']:.2f}s, cogs {timings['cogs']:.2f}s, command_sync {timings['command_sync']:.2f}s, "
+                f"gateway {timings['ready'] - timings['setup_done']:.2f}s, ready after {timings['ready']:.2f}s"
+            )
 
     async def on_message(self, message):
-        """Handle DM messages for staff support"""
+        """Handle DM messages for staff support and replies typed in case threads"""
         if message.author == self.user:
             return
         
+        # Fast path: ordinary guild chatter needs nothing from us when there are no prefix commands
+        if message.guild is not None and not self.all_commands and self.cases.for_thread(message.channel.id) is None:
+            return
+        
+        started_at = time.perf_counter()
+        set_log_context(user_id=message.author.id)
         if isinstance(message.channel, discord.DMChannel):
+            # Without the support cog staff couldn't answer, so don't open cases at all
+            if not self.cluster.holds('staff_bridge') or 'cogs.support' not in self.extensions:
+                return
             await self.handle_dm_message(message)
+            self.metrics.observe('event_latency_seconds', time.perf_counter() - started_at, 'handle_dm_message')
+        elif isinstance(message.channel, discord.Thread) and self.cases.for_thread(message.channel.id) is not None:
+            await self.relay_thread_reply(message)
         
-        await self.process_commands(message)
+        if self.all_commands:
+            await self.process_commands(message)
+        self.metrics.observe('event_latency_seconds', time.perf_counter() - started_at, 'on_message')
 
     async def handle_dm_message(self, message):
         """Handle DM messages with interactive support system"""
         user_id = message.author.id
         
+        allowed, warn = self.support_sessions.allow(user_id)
+        if not allowed:
+            if warn:
+                self.dm_queue.deliver(message.author, DeliveryQueue.PRIORITY_INTERACTIVE,
+                                      content="⏳ You're sending messages too quickly. Please wait a moment and try again.")
+            return
+        
         # Check if user is already in a support flow
-        if user_id in self.pending_cases:
+        if self.support_sessions.is_pending(user_id):
             await self.process_support_case(message)
-        else:
+            return
+        
+        # Follow-ups to an open case go straight to its thread
+        open_cases = self.cases.for_user(user_id, status='open')
+        if open_cases and await self.relay_user_message(open_cases[-1], message):
+            return
+        
+        # One live prompt per user; further DMs reuse the buttons already sent
+        if self.support_sessions.try_prompt(user_id):
             await self.start_support_flow(message)
 
+    async def relay_user_message(self, case_id: int, message) -> bool:
+        """Post a user's DM into their case thread"""
+        set_log_context(case_id=case_id)
+        thread_id = self.cases.get(case_id).thread_id
+        if thread_id is None:
+            self.staff_notifier.hold(case_id, message)  # Relayed once the case thread exists
+            return True
+        thread = await self.resolve_channel(thread_id)
+        if thread is None:
+            return False
+        
+        if message.content or not message.attachments:
+            await thread.send(f"**{message.author.display_name}:** {message.content}"[:2000])
+        self.attachment_mirror.mirror(thread, message.attachments, message.author.display_name)
+        await message.add_reaction("✅")
+        return True
+
+    async def relay_thread_reply(self, message):
+        """Forward a staff message typed in a case thread to the user"""
+        case_id = self.cases.for_thread(message.channel.id)
+        set_log_context(case_id=case_id)
+        case_data = self.cases.get(case_id)
+        if message.author.bot or case_data.status != 'open' or message.content.startswith("//"):
+            return  # Bots, closed cases and "//" internal notes stay in the thread
+        
+        content = message.content
+        if message.attachments:
+            content += "\n" + "\n".join(att.url for att in message.attachments)
+        embed = staff_reply_embed(case_id, content, message.author)
+        
+        try:
+            await self.dm_queue.send(case_data.user_id, DeliveryQueue.PRIORITY_STAFF, embed=embed)
+        except discord.HTTPException:
+            await message.add_reaction("⚠️")
+        else:
+            await message.add_reaction("✅")
+
     async def start_support_flow(self, message):
         """Start the interactive support flow"""
         embed = discord.Embed(
@@ -129,23 +1644,23 @@ class DungeonKeeper(commands.Bot):
         embed.set_footer(text="Ready to start? Click the button below!")
         
         # Create proceed button
-        view = SupportStartView(self)
-        await message.author.send(embed=embed, view=view)
+        view = SupportStartView(self, message.author.id)
+        self.dm_queue.deliver(message.author, DeliveryQueue.PRIORITY_INTERACTIVE, embed=embed, view=view)
 
     async def process_support_case(self, message):
         """Process the actual support case after user clicks proceed"""
         user_id = message.author.id
         
         # Use hardcoded staff channel ID
-        staff_channel = self.get_channel(STAFF_CHANNEL_ID)
+        staff_channel = await self.resolve_channel(STAFF_CHANNEL_ID)
         if not staff_channel:
             logger.error(f"Staff channel {STAFF_CHANNEL_ID} not found")
-            await message.author.send("❌ Unable to reach staff team. Please try again later.")
+            self.dm_queue.deliver(message.author, DeliveryQueue.PRIORITY_INTERACTIVE, content="❌ Unable to reach staff team. Please try again later.")
             return
         
         # Create case
-        case_id = self.case_counter
-        self.case_counter += 1
+        case_id = await self.state_store.next_id('case_counter')
+        set_log_context(case_id=case_id)
         
         # Create embed for staff channel
         embed = discord.Embed(
@@ -160,557 +1675,1766 @@ class DungeonKeeper(commands.Bot):
             icon_url=message.author.avatar.url if message.author.avatar else None
         )
         
-        # Handle attachments
+        # Attachments are copied into the thread once it exists
         if message.attachments:
-            attachment_urls = [att.url for att in message.attachments]
+            attachment_names = [f"{att.filename} ({att.size / 1024:.0f} KB)" for att in message.attachments]
             embed.add_field(
-                name="📎 Attachments",
-                value="\n".join(attachment_urls),
+                name="📎 Attachments (copied into the thread)",
+                value="\n".join(attachment_names)[:1024],
                 inline=False
             )
         
-        # Send to staff channel with @everyone ping and create thread
-        staff_message = await staff_channel.send("@everyone", embed=embed)
-        thread = await staff_message.create_thread(
-            name=f"Case #{case_id} - {message.author.display_name}",
-            auto_archive_duration=1440  # 24 hours
-        )
-        
-        # Store case data
-        self.cases[case_id] = {
-            'user_id': message.author.id,
-            'thread_id': thread.id,
-            'created_at': datetime.utcnow(),
-            'status': 'open'
-        }
+        # Store case data; the thread is linked once the staff announcement is posted
+        self.cases.add(case_id, CaseRecord(message.author.id, None, int(time.time())))
         
         # Remove from pending
-        del self.pending_cases[user_id]
+        self.support_sessions.end_case(user_id)
         
-        # Confirm to user
-        confirm_embed = discord.Embed(
-            title="✅ Support Case Created",
-            description=f"Your case has been submitted successfully!\n\n**Case ID:** #{case_id}\n**Status:** Open\n\nOur staff team has been notified and will respond as soon as possible.",
-            color=discord.Color.green()
-        )
-        confirm_embed.set_footer(text="You'll receive updates about your case here in DMs")
-        await message.author.send(embed=confirm_embed)
+        # Confirm to user; the confirmation says staff were notified only once they have been
+        confirmation = asyncio.ensure_future(self.dm_queue.send(
+            message.author, DeliveryQueue.PRIORITY_INTERACTIVE, embed=case_confirmation_embed(case_id, staff_notified=False)
+        ))
+        confirmation.add_done_callback(lambda future: future.cancelled() or future.exception())
+        
+        # Announce to staff in the background (in a digest during bursts); attachments follow into the thread
+        self.staff_notifier.submit(case_id, embed, f"Case #{case_id} - {message.author.display_name}",
+                                   message.attachments, message.author.display_name, confirmation=confirmation)
 
-    @tasks.loop(minutes=1)
     async def check_reminders(self):
-        """Check and send reminders"""
+        """Send every reminder that is due and return when the next one fires"""
         current_time = datetime.utcnow()
+        now = epoch(current_time)
         
-        for user_id, reminders in list(self.reminders.items()):
-            for reminder in list(reminders):
-                if current_time >= reminder['time']:
-                    user = self.get_user(user_id)
-                    if user:
-                        try:
-                            embed = discord.Embed(
-                                title="⏰ Reminder",
-                                description=reminder['message'],
-                                color=discord.Color.blue(),
-                                timestamp=current_time
-                            )
-                            embed.set_footer(text=f"Set {reminder['set_time'].strftime('%Y-%m-%d %H:%M:%S')} UTC")
-                            await user.send(embed=embed)
-                        except discord.Forbidden:
-                            pass
-                    
-                    reminders.remove(reminder)
+        for user_id, reminder in self.reminder_scheduler.pop_due(now):
+            if self.reminders_by_id.get(reminder.id, (None, None))[1] is not reminder:
+                self.reminder_scheduler.skipped()
+                continue  # Cancelled after it was scheduled
+            next_time = next_occurrence(reminder.repeat, reminder.time, now) if reminder.repeat else None
+            if next_time is None:
+                self.untrack_reminder(reminder.id)
+            else:
+                # Only the next occurrence is ever scheduled; the one after is worked out when it fires
+                reminder.time = next_time
+                self.reminder_scheduler.schedule(user_id, reminder)
             
+            embed = discord.Embed(
+                title="⏰ Reminder",
+                description=reminder.message,
+                color=discord.Color.blue(),
+                timestamp=current_time
+            )
+            if next_time is not None:
+                embed.add_field(name=f"Repeats {describe_rule(reminder.repeat)}", value=f"Next <t:{next_time}:R>")
+            embed.set_footer(text=f"Set {from_epoch(reminder.set_time).strftime('%Y-%m-%d %H:%M:%S')} UTC")
+            task = asyncio.create_task(self.deliver_reminder(user_id, reminder, embed))
+            self._reminder_deliveries.add(task)
+            task.add_done_callback(self._reminder_deliveries.discard)
+        
+        return self.reminder_scheduler.next_due()
+
+    async def deliver_reminder(self, user_id: int, reminder: ReminderRecord, embed: discord.Embed):
+        """DM a due reminder, then drop or advance its stored copy; a shutdown first leaves it to fire after restart"""
+        try:
+            await self.dm_queue.send(user_id, DeliveryQueue.PRIORITY_REMINDER, embed=embed)
+        except Exception:
+            pass  # Undeliverable (DMs closed, retries used up); already counted by the queue
+        if self.reminders_by_id.get(reminder.id, (None, None))[1] is reminder:
+            self.state_store.put_reminder(reminder.id, user_id, reminder)
+        elif not reminder.repeat:
+            self.state_store.delete_reminder(reminder.id)
+
+    def add_xp(self, user_id: int, amount: int, guild_id: Optional[int] = None) -> int:
+        """Award XP in a guild (DMs count as guild 0); returns the user's all-time XP there"""
+        return self.xp.record(guild_id or 0, user_id, amount)
+
+    async def add_reminder(self, user_id: int, reminder: ReminderRecord):
+        """Store a reminder and hand it to the scheduler"""
+        reminder.id = await self.state_store.next_id('reminder_counter')
+        self.state_store.put_reminder(reminder.id, user_id, reminder)
+        self.track_reminder(user_id, reminder)
+        self.reminder_scheduler.schedule(user_id, reminder)
+
+    def cancel_reminder(self, user_id: int, reminder_id: int) -> bool:
+        """Drop one of a user's reminders; its scheduler entry is skipped when it comes due"""
+        entry = self.reminders_by_id.get(reminder_id)
+        if entry is None or entry[0] != user_id:
+            return False
+        self.untrack_reminder(reminder_id)
+        self.state_store.delete_reminder(reminder_id)
+        self.reminder_scheduler.cancel()
+        return True
+
+    def track_reminder(self, user_id: int, reminder: ReminderRecord):
+        self.reminders.setdefault(user_id, []).append(reminder)
+        self.reminders_by_id[reminder.id] = (user_id, reminder)
+
+    def untrack_reminder(self, reminder_id: int) -> Optional[tuple]:
+        """Forget a reminder in memory; returns its (user_id, reminder) if it was known"""
+        entry = self.reminders_by_id.pop(reminder_id, None)
+        if entry is not None:
+            user_id, reminder = entry
+            reminders = self.reminders[user_id]
+            reminders.remove(reminder)
             if not reminders:
                 del self.reminders[user_id]
+        return entry
 
-# Support System UI Components
-class SupportStartView(discord.ui.View):
-    def __init__(self, bot):
-        super().__init__(timeout=300)  # 5 minute timeout
-        self.bot = bot
+class CaseRegistry:
+    """Working set of support cases with secondary indexes"""
+    def __init__(self, store: StateStore, closed_ttl: timedelta = timedelta(hours=1)):
+        self.store = store
+        self.closed_ttl = closed_ttl
+        self._cases: Dict[int, CaseRecord] = {}
+        self._by_user: Dict[int, Dict[int, None]] = {}  # user_id -> case ids
+        self._by_thread: Dict[int, int] = {}  # thread_id -> case id
+        self._by_status: Dict[str, Dict[int, None]] = {}  # status -> case ids, oldest first
+        self._closed_order = collections.deque()  # (closed_at epoch, case_id) awaiting eviction
 
-    @discord.ui.button(label="📝 Start Support Request", style=discord.ButtonStyle.primary, emoji="🚀")
-    async def start_support(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Mark user as ready to submit their case
-        self.bot.pending_cases[interaction.user.id] = True
-        
-        embed = discord.Embed(
-            title="📝 Ready to Help!",
-            description="Perfect! Now please describe your issue or question in detail.\n\nI'll forward it to our staff team right away.",
-            color=discord.Color.green()
-        )
-        
-        embed.add_field(
-            name="💡 Tips for better support:",
-            value="• Be specific about the problem\n• Include any error messages\n• Mention what you were trying to do\n• Add screenshots if helpful",
-            inline=False
-        )
+    def __len__(self):
+        return len(self._cases)
+
+    def __contains__(self, case_id: int):
+        return case_id in self._cases
+
+    def _index(self, case_id: int, data: CaseRecord):
+        self._by_user.setdefault(data.user_id, {})[case_id] = None
+        if data.thread_id is not None:  # None until the staff announcement's thread exists
+            self._by_thread[data.thread_id] = case_id
+        self._by_status.setdefault(data.status, {})[case_id] = None
+
+    def _unindex(self, case_id: int, data: CaseRecord):
+        for index, key in ((self._by_user, data.user_id), (self._by_status, data.status)):
+            ids = index.get(key)
+            if ids is not None:
+                ids.pop(case_id, None)
+                if not ids:
+                    del index[key]
+        if data.thread_id is not None and self._by_thread.get(data.thread_id) == case_id:
+            del self._by_thread[data.thread_id]
+
+    def load(self, cases: Dict[int, CaseRecord]):
+        for case_id, data in sorted(cases.items()):
+            self._cases[case_id] = data
+            self._index(case_id, data)
+
+    def add(self, case_id: int, data: CaseRecord):
+        self._cases[case_id] = data
+        self._index(case_id, data)
+        self.store.put_case(case_id, data)
+
+    def set_thread(self, case_id: int, thread_id: int):
+        """Record the staff thread of a case announced after it was created"""
+        data = self._cases.get(case_id)
+        if data is None:
+            return
+        self._unindex(case_id, data)
+        data.thread_id = thread_id
+        self._index(case_id, data)
+        self.store.put_case(case_id, data)
+
+    def get(self, case_id: int) -> Optional[CaseRecord]:
+        """In-memory lookup only"""
+        return self._cases.get(case_id)
+
+    async def fetch(self, case_id: int) -> Optional[CaseRecord]:
+        """Look up a case, falling back to cold storage"""
+        data = self._cases.get(case_id)
+        if data is None:
+            data = await self.store.get_case(case_id)
+        return data
+
+    def apply(self, case_id: int, data: CaseRecord):
+        """Take a case another process wrote, without writing it back"""
+        old = self._cases.get(case_id)
+        if old is not None:
+            self._unindex(case_id, old)
+        self._cases[case_id] = data
+        self._index(case_id, data)
+        if data.status == 'closed' and (old is None or old.status != 'closed'):
+            self._closed_order.append((data.closed_at or int(time.time()), case_id))
+
+    def close(self, case_id: int, data: CaseRecord, closed_by: int):
+        """Mark a case closed and schedule it to leave memory"""
+        now = int(time.time())
+        if case_id in self._cases:
+            self._unindex(case_id, self._cases[case_id])
+        data.status = 'closed'
+        data.closed_at = now
+        data.closed_by = closed_by
+        self._cases[case_id] = data
+        self._index(case_id, data)
+        self.store.put_case(case_id, data)
+        self._closed_order.append((now, case_id))
+        self.evict_closed(now)
+
+    def evict_closed(self, now: int) -> int:
+        """Drop closed cases older than closed_ttl (now and closed_at in epoch seconds) from memory"""
+        if not self.store.persistent:
+            return 0  # Nowhere to serve them from afterwards
+        evicted = 0
+        cutoff = now - self.closed_ttl.total_seconds()
+        while self._closed_order and self._closed_order[0][0] <= cutoff:
+            _, case_id = self._closed_order.popleft()
+            data = self._cases.get(case_id)
+            if data is not None and data.status == 'closed':
+                self._unindex(case_id, data)
+                del self._cases[case_id]
+                evicted += 1
+        return evicted
+
+    def for_user(self, user_id: int, status: Optional[str] = None) -> List[int]:
+        ids = self._by_user.get(user_id, {})
+        return [case_id for case_id in ids if status is None or self._cases[case_id].status == status]
+
+    def for_thread(self, thread_id: int) -> Optional[int]:
+        return self._by_thread.get(thread_id)
+
+    def with_status(self, status: str) -> List[int]:
+        return list(self._by_status.get(status, {}))
+
+    async def page(self, status: Optional[str], offset: int, limit: int):
+        """Return ([(case_id, data)], total) newest first; status None means all"""
+        if status == 'open' or not self.store.persistent:
+            ids = list(self._cases) if status is None else self.with_status(status)
+            ids.sort(reverse=True)
+            return [(case_id, self._cases[case_id]) for case_id in ids[offset:offset + limit]], len(ids)
+        return await self.store.list_cases(status, offset, limit)
+
+class SupportSessions:
+    """Per-user state for the DM support bridge"""
+    def __init__(self, ttl: float = SUPPORT_SESSION_TTL, burst: int = DM_BURST,
+                 refill_seconds: float = DM_REFILL_SECONDS, max_users: int = 100_000, clock=time.monotonic):
+        self.ttl = ttl
+        self.burst = burst
+        self.refill_seconds = refill_seconds
+        self.max_users = max_users
+        self.clock = clock
+        self._prompted = collections.OrderedDict()  # user_id -> expiry
+        self._pending = collections.OrderedDict()  # user_id -> expiry
+        self._buckets = collections.OrderedDict()  # user_id -> (tokens, updated_at, warned)
+
+    def __len__(self):
+        return len(self._prompted) + len(self._pending) + len(self._buckets)
+
+    def _sweep(self, now: float):
+        for entries in (self._prompted, self._pending):
+            while entries and next(iter(entries.values())) <= now:
+                entries.popitem(last=False)
+            while len(entries) > self.max_users:
+                entries.popitem(last=False)
+        # A bucket idle long enough to refill completely is the same as no bucket
+        idle = self.burst * self.refill_seconds
+        while self._buckets and now - next(iter(self._buckets.values()))[1] >= idle:
+            self._buckets.popitem(last=False)
+        while len(self._buckets) > self.max_users:
+            self._buckets.popitem(last=False)
+
+    def allow(self, user_id: int):
+        """Take a token for one DM; returns (allowed, warn) where warn is set on the first refusal"""
+        now = self.clock()
+        self._sweep(now)
+        bucket = self._buckets.pop(user_id, None)
+        if bucket is None:
+            tokens, warned = float(self.burst), False
+        else:
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) / self.refill_seconds)
+            warned = bucket[2]
         
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        # Warn once per throttling episode; it ends when the bucket refills and is swept
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        warn = not allowed and not warned
+        self._buckets[user_id] = (tokens, now, warned or warn)
+        return allowed, warn
 
-    @discord.ui.button(label="❌ Cancel", style=discord.ButtonStyle.secondary)
-    async def cancel_support(self, interaction: discord.Interaction, button: discord.ui.Button):
-        embed = discord.Embed(
-            title="✋ Support Cancelled",
-            description="No problem! If you need help later, just send me another message.",
-            color=discord.Color.light_grey()
-        )
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+    def _live(self, entries, user_id: int) -> bool:
+        expiry = entries.get(user_id)
+        return expiry is not None and expiry > self.clock()
 
-bot = DungeonKeeper()
+    def try_prompt(self, user_id: int) -> bool:
+        """Record a start prompt unless the user already has a live one"""
+        if self._live(self._prompted, user_id):
+            return False
+        self._prompted.pop(user_id, None)
+        self._prompted[user_id] = self.clock() + self.ttl
+        return True
 
-# Staff Support Commands
-@bot.tree.command(name="reply", description="Reply to a support case")
-@discord.app_commands.describe(
-    case="Case ID to reply to",
-    message="Message to send to the user"
-)
-async def reply_case(interaction: discord.Interaction, case: int, message: str):
-    """Reply to a support case"""
-    if case not in bot.cases:
-        await interaction.response.send_message("Case not found.", ephemeral=True)
-        return
-    
-    case_data = bot.cases[case]
-    user = bot.get_user(case_data['user_id'])
-    
-    if not user:
-        await interaction.response.send_message("User not found.", ephemeral=True)
-        return
-    
-    try:
-        embed = discord.Embed(
-            title=f"Staff Response - Case #{case}",
-            description=message,
-            color=discord.Color.green(),
-            timestamp=datetime.utcnow()
-        )
-        embed.set_footer(text=f"Replied by {interaction.user.display_name}")
+    def clear_prompt(self, user_id: int):
+        self._prompted.pop(user_id, None)
+
+    def begin_case(self, user_id: int):
+        self._pending.pop(user_id, None)
+        self._pending[user_id] = self.clock() + self.ttl
+
+    def is_pending(self, user_id: int) -> bool:
+        return self._live(self._pending, user_id)
+
+    def end_case(self, user_id: int):
+        self._pending.pop(user_id, None)
+        self._prompted.pop(user_id, None)
+
+class ClusterCoordinator:
+    """Lease-based election for duties that must run on exactly one process"""
+    def __init__(self, bot, node: str, ttl: float = LEASE_TTL, interval: float = CLUSTER_SYNC_INTERVAL,
+                 clustered: bool = CLUSTERED):
+        self.bot = bot
+        self.node = node
+        self.clustered = clustered
+        self.ttl = ttl
+        self.interval = interval
+        self._duties: Dict[str, tuple] = {}  # name -> (start, stop)
+        self._held: set = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def add_duty(self, name: str, start=None, stop=None, eligible: bool = True):
+        if eligible:
+            self._duties[name] = (start, stop)
+
+    def holds(self, name: str) -> bool:
+        if not self.clustered:
+            return name in self._duties  # nobody else to hand it to
+        return name in self._held
+
+    def duty_states(self) -> Dict[str, int]:
+        return {name: int(name in self._held) for name in self._duties}
+
+    def start(self):
+        if not self.clustered:
+            for name in self._duties:
+                if name not in self._held:
+                    self._set_held(name, True)
+        elif self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop every held duty and hand its lease over immediately"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for name in list(self._held):
+            self._set_held(name, False)
+            if not self.clustered:
+                continue
+            try:
+                await self.bot.state_store.release_lease(name, self.node)
+            except Exception as e:
+                logger.error(f"Failed to release {name} lease: {e}")
+
+    def _set_held(self, name: str, held: bool):
+        start, stop = self._duties[name]
+        if held:
+            self._held.add(name)
+            logger.info(f"{self.node} took over {name}")
+            if start is not None:
+                start()
+        else:
+            self._held.discard(name)
+            logger.warning(f"{self.node} gave up {name}")
+            if stop is not None:
+                stop()
+
+    async def tick(self):
+        if not self.clustered:
+            self.start()
+            return
+        store = self.bot.state_store
+        changes = await store.poll_changes()
+        if changes:
+            self.bot.apply_changes(changes)
         
-        await user.send(embed=embed)
-        await interaction.response.send_message(f"Reply sent to user for case #{case}", ephemeral=True)
+        for name in self._duties:
+            try:
+                held = await store.acquire_lease(name, self.node, self.ttl)
+            except Exception as e:
+                logger.error(f"Failed to renew {name} lease: {e}")
+                held = False  # Another process may take over once it expires
+            if held != (name in self._held):
+                self._set_held(name, held)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"Cluster sync failed: {e}")
+            await asyncio.sleep(self.interval)
+
+class DeadlineScheduler:
+    """Min-heap of (deadline, user_id, payload) entries drained by one task"""
+    def __init__(self):
+        self._heap: List = []  # (deadline, seq, user_id, payload)
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, deadline: float, user_id: int, payload):
+        """Push an entry, waking the dispatcher if it is the new earliest one"""
+        entry = (deadline, next(self._seq), user_id, payload)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry and self._wakeup is not None:
+            self._wakeup.set()
+
+    def next_due(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    def reset(self, entries):
+        """Replace the heap with (deadline, user_id, payload) entries"""
+        self._heap = [(deadline, next(self._seq), user_id, payload) for deadline, user_id, payload in entries]
+        heapq.heapify(self._heap)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def pop_due(self, now: float):
+        """Pop every (user_id, payload) whose deadline has come"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, user_id, payload = heapq.heappop(self._heap)
+            due.append((user_id, payload))
+        return due
+
+    async def dispatch(self) -> Optional[float]:
+        """Handle everything that is due and return the next deadline"""
+        raise NotImplementedError
+
+    def start(self):
+        """Start the dispatcher task (safe to call again on reconnect)"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                next_time = await self.dispatch()
+            except Exception as e:
+                logger.error(f"{type(self).__name__} dispatch failed: {e}")
+                next_time = self.next_due()
+            
+            self._wakeup.clear()
+            if next_time is None:
+                await self._wakeup.wait()
+                continue
+            
+            delay = next_time - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+class CronRule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week, in UTC"""
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+    SEARCH_DAYS = 4 * 366  # long enough to reach a 29 February
+
+    def __init__(self, spec: str):
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError("a cron rule has five fields: minute hour day month weekday")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.FIELDS))
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == '*' or fields[4] == '*'
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> List[int]:
+        values = set()
+        for part in field.split(','):
+            body, _, step = part.partition('/')
+            if body == '*':
+                start, end = low, high
+            elif '-' in body:
+                start, end = (int(value) for value in body.split('-', 1))
+            else:
+                start = int(body)
+                end = high if step else start
+            if not low <= start <= end <= high or (step and int(step) < 1):
+                raise ValueError(f"{part!r} is outside {low}-{high}")
+            values.update(range(start, end + 1, int(step or 1)))
+        return sorted(values)
+
+    def _day_matches(self, day) -> bool:
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        return in_days and in_weekdays if self.any_day else in_days or in_weekdays
+
+    def next_after(self, after: int) -> Optional[int]:
+        """First matching minute strictly after `after` (Unix seconds), or None if the rule never matches"""
+        start = from_epoch(after - after % 60 + 60)
+        day = start.date()
+        for _ in range(self.SEARCH_DAYS):
+            if day.month in self.months and self._day_matches(day):
+                today = day == start.date()
+                for hour in self.hours:
+                    if today and hour < start.hour:
+                        continue
+                    for minute in self.minutes:
+                        if today and hour == start.hour and minute < start.minute:
+                            continue
+                        return epoch(datetime(day.year, day.month, day.day, hour, minute))
+            day += timedelta(days=1)
+        return None
+
+def next_occurrence(rule: str, last: int, now: int) -> Optional[int]:
+    """When a recurring reminder that was due at `last` fires next; occurrences missed before `now` are skipped"""
+    if rule.startswith('every '):
+        interval = int(rule.split()[1])
+        return last + max(1, (now - last) // interval + 1) * interval
+    return CronRule(rule).next_after(max(last, now))
+
+def describe_interval(seconds: int) -> str:
+    """86400 -> '1d', 5400 -> '1h 30m'"""
+    parts = []
+    for unit, size in (('w', 604800), ('d', 86400), ('h', 3600), ('m', 60)):
+        if seconds >= size:
+            parts.append(f"{seconds // size}{unit}")
+            seconds %= size
+    return " ".join(parts) or "0m"
+
+def describe_rule(rule: str) -> str:
+    if rule.startswith('every '):
+        return f"every {describe_interval(int(rule.split()[1]))}"
+    return f"cron `{rule}` (UTC)"
+
+class ReminderScheduler(DeadlineScheduler):
+    """Pending reminders keyed by fire time"""
+    def __init__(self, bot):
+        super().__init__()
+        self.bot = bot
+        self._stale = 0  # Heap entries belonging to cancelled reminders
+
+    def reset(self, entries):
+        super().reset(entries)
+        self._stale = 0
+
+    def schedule(self, user_id: int, reminder: ReminderRecord):
+        if self.bot.cluster.holds('scheduler'):  # Otherwise start_schedulers builds the heap on takeover
+            self.push(reminder.time, user_id, reminder)
+
+    def cancel(self):
+        """Note that one scheduled reminder was cancelled; drop such entries once they make up half the heap"""
+        self._stale += 1
+        if self._stale > 1024 and self._stale * 2 > len(self._heap):
+            live = {id(reminder) for _, reminder in self.bot.reminders_by_id.values()}
+            self._heap = [entry for entry in self._heap if id(entry[3]) in live]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def skipped(self):
+        """A cancelled reminder's entry came due and was dropped"""
+        self._stale = max(0, self._stale - 1)
+
+    async def dispatch(self) -> Optional[float]:
+        return await self.bot.check_reminders()
+
+class TimerEngine(DeadlineScheduler):
+    """Owns every pomodoro focus/break phase transition"""
+    NOTIFY_WORKERS = 4
+    CATCH_UP_GRACE = 60  # seconds; older transitions were missed while offline and apply silently
+
+    def __init__(self, bot):
+        super().__init__()
+        self.bot = bot
+        self._outbox: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._stale = 0  # Heap entries belonging to cancelled timers
+
+    def start(self):
+        super().start()
+        if not self._workers:
+            self._outbox = asyncio.Queue()
+            self._workers = [asyncio.create_task(self._notify_worker()) for _ in range(self.NOTIFY_WORKERS)]
+
+    def stop(self):
+        super().stop()
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+    def reset(self, entries):
+        super().reset(entries)
+        self._stale = 0
+
+    def start_timer(self, user_id: int, focus_time: int, break_time: int, cycles: int,
+                    channel_id: Optional[int], guild_id: Optional[int] = None) -> TimerRecord:
+        timer = TimerRecord(focus_time, break_time, cycles, int(time.time()), channel_id, guild_id)
+        self.bot.active_timers[user_id] = timer
+        self.bot.state_store.put_timer(user_id, timer)
+        self.resume(user_id, timer)
+        return timer
+
+    def resume(self, user_id: int, timer: TimerRecord):
+        """Schedule the next phase transition of an existing timer"""
+        if timer.phase_ends_at is None:
+            # Saved before phases had explicit deadlines
+            timer.cycles = timer.cycles or 1
+            timer.cycle = timer.cycle or 1
+            elapsed = timer.focus_time + (timer.break_time if timer.phase == 'break' else 0)
+            timer.phase_ends_at = timer.start_time + elapsed * 60
+        if self.bot.cluster.holds('scheduler'):  # Otherwise start_schedulers builds the heap on takeover
+            self.push(timer.phase_ends_at, user_id, timer)
+
+    def cancel(self, user_id: int) -> bool:
+        timer = self.bot.active_timers.pop(user_id, None)
+        if timer is None:
+            return False
         
-        # Log in thread
-        thread = bot.get_channel(case_data['thread_id'])
-        if thread:
-            await thread.send(f"**Reply sent by {interaction.user.mention}:**\n{message}")
-    
-    except discord.Forbidden:
-        await interaction.response.send_message("Could not send DM to user. They may have DMs disabled.", ephemeral=True)
-
-@bot.tree.command(name="close", description="Close a support case")
-@discord.app_commands.describe(case="Case ID to close")
-async def close_case(interaction: discord.Interaction, case: int):
-    """Close a support case"""
-    if case not in bot.cases:
-        await interaction.response.send_message("Case not found.", ephemeral=True)
-        return
-    
-    case_data = bot.cases[case]
-    case_data['status'] = 'closed'
-    case_data['closed_at'] = datetime.utcnow()
-    case_data['closed_by'] = interaction.user.id
-    
-    # Archive thread
-    thread = bot.get_channel(case_data['thread_id'])
-    if thread:
-        await thread.edit(archived=True)
-        await thread.send(f"Case closed by {interaction.user.mention}")
-    
-    # Notify user
-    user = bot.get_user(case_data['user_id'])
-    if user:
-        try:
+        self.bot.state_store.delete_timer(user_id)
+        self._stale += 1
+        if self._stale > 1024 and self._stale * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if self.bot.active_timers.get(entry[2]) is entry[3]]
+            heapq.heapify(self._heap)
+            self._stale = 0
+        return True
+
+    async def dispatch(self) -> Optional[float]:
+        now = time.time()
+        for user_id, timer in self.pop_due(now):
+            if self.bot.active_timers.get(user_id) is not timer:
+                self._stale = max(0, self._stale - 1)
+                continue
+            self._advance(user_id, timer, notify=now - timer.phase_ends_at <= self.CATCH_UP_GRACE)
+        return self.next_due()
+
+    def _advance(self, user_id: int, timer: TimerRecord, notify: bool):
+        channel_id = timer.channel_id
+        finished = False
+        if timer.phase == 'focus':
+            xp = self.bot.add_xp(user_id, POMODORO_XP_REWARD, timer.guild_id)
+            
+            timer.phase = 'break'
+            timer.phase_ends_at += timer.break_time * 60
             embed = discord.Embed(
-                title=f"Case #{case} Closed",
-                description="Your support case has been resolved. If you need further assistance, feel free to send another message.",
-                color=discord.Color.red(),
-                timestamp=datetime.utcnow()
+                title="⏰ Focus Time Complete!",
+                description=f"Great job! You focused for {timer.focus_time} minutes.\n\n**+{POMODORO_XP_REWARD} XP earned!**\nTotal XP: {xp}\n\nTake a {timer.break_time} minute break!",
+                color=discord.Color.green()
             )
-            await user.send(embed=embed)
-        except discord.Forbidden:
-            pass
-    
-    await interaction.response.send_message(f"Case #{case} has been closed.", ephemeral=True)
-
-# Voice Channel Management Commands
-def in_voice_channel():
-    """Decorator to check if user is in a voice channel"""
-    def predicate(interaction: discord.Interaction) -> bool:
-        return bool(interaction.user.voice and interaction.user.voice.channel)
-    return discord.app_commands.check(predicate)
-
-@bot.tree.command(name="forcemute", description="Mute all members in your current voice channel")
-@in_voice_channel()
-async def force_mute(interaction: discord.Interaction):
-    """Mute all members in the current voice channel"""
-    voice_channel = interaction.user.voice.channel
-    
-    if not voice_channel.permissions_for(interaction.guild.me).mute_members:
-        await interaction.response.send_message("I don't have permission to mute members in this channel.", ephemeral=True)
-        return
-    
-    muted_count = 0
-    for member in voice_channel.members:
-        if not member.voice.mute and member != interaction.guild.me:
-            try:
-                await member.edit(mute=True)
-                muted_count += 1
-            except discord.Forbidden:
-                continue
-    
-    await interaction.response.send_message(f"Muted {muted_count} members in {voice_channel.name}")
+        elif timer.cycle < timer.cycles:
+            timer.cycle += 1
+            timer.phase = 'focus'
+            timer.phase_ends_at += timer.focus_time * 60
+            embed = discord.Embed(
+                title="☕ Break Time Over!",
+                description=f"Break time is over. Starting focus session {timer.cycle} of {timer.cycles}: **{timer.focus_time} minutes**.",
+                color=discord.Color.blue()
+            )
+        else:
+            del self.bot.active_timers[user_id]
+            self.bot.state_store.delete_timer(user_id)
+            embed = discord.Embed(
+                title="☕ Break Time Over!",
+                description="Break time is over. Ready for another focus session?",
+                color=discord.Color.blue()
+            )
+            finished = True
+        
+        if not finished:
+            if timer.cycles > 1:
+                embed.set_footer(text=f"Cycle {timer.cycle}/{timer.cycles}")
+            self.bot.state_store.put_timer(user_id, timer)
+            self.push(timer.phase_ends_at, user_id, timer)
+        
+        if notify and self._outbox is not None:
+            self._outbox.put_nowait((user_id, channel_id, embed))
 
-@bot.tree.command(name="private", description="Make your current voice channel private")
-@in_voice_channel()
-async def make_private(interaction: discord.Interaction):
-    """Lock the voice channel to current members only"""
-    voice_channel = interaction.user.voice.channel
-    
-    if not voice_channel.permissions_for(interaction.guild.me).manage_channels:
-        await interaction.response.send_message("I don't have permission to modify this channel.", ephemeral=True)
-        return
-    
-    # Get current members
-    current_members = [member for member in voice_channel.members]
-    
-    # Set permissions
-    overwrites = voice_channel.overwrites
-    overwrites[interaction.guild.default_role] = discord.PermissionOverwrite(connect=False)
-    
-    for member in current_members:
-        overwrites[member] = discord.PermissionOverwrite(connect=True)
-    
-    await voice_channel.edit(overwrites=overwrites)
-    await interaction.response.send_message(f"🔒 {voice_channel.name} is now private to current members.")
-
-@bot.tree.command(name="public", description="Make your current voice channel public")
-@in_voice_channel()
-async def make_public(interaction: discord.Interaction):
-    """Unlock the voice channel for everyone"""
-    voice_channel = interaction.user.voice.channel
-    
-    if not voice_channel.permissions_for(interaction.guild.me).manage_channels:
-        await interaction.response.send_message("I don't have permission to modify this channel.", ephemeral=True)
-        return
-    
-    # Reset permissions to allow everyone
-    overwrites = voice_channel.overwrites
-    if interaction.guild.default_role in overwrites:
-        del overwrites[interaction.guild.default_role]
-    
-    await voice_channel.edit(overwrites=overwrites)
-    await interaction.response.send_message(f"🔓 {voice_channel.name} is now public.")
-
-@bot.tree.command(name="max", description="Set maximum member limit for your voice channel")
-@discord.app_commands.describe(number="Maximum number of members (0 for unlimited)")
-@in_voice_channel()
-async def set_max_members(interaction: discord.Interaction, number: int):
-    """Set maximum member limit for voice channel"""
-    if number < 0 or number > 99:
-        await interaction.response.send_message("Member limit must be between 0 and 99.", ephemeral=True)
-        return
-    
-    voice_channel = interaction.user.voice.channel
-    
-    if not voice_channel.permissions_for(interaction.guild.me).manage_channels:
-        await interaction.response.send_message("I don't have permission to modify this channel.", ephemeral=True)
-        return
-    
-    await voice_channel.edit(user_limit=number)
-    
-    if number == 0:
-        await interaction.response.send_message(f"Removed member limit from {voice_channel.name}")
-    else:
-        await interaction.response.send_message(f"Set member limit to {number} for {voice_channel.name}")
-
-@bot.tree.command(name="desc", description="Set description for your voice channel")
-@discord.app_commands.describe(description="Channel description/topic")
-@in_voice_channel()
-async def set_description(interaction: discord.Interaction, description: str):
-    """Set description for voice channel"""
-    voice_channel = interaction.user.voice.channel
-    
-    if not voice_channel.permissions_for(interaction.guild.me).manage_channels:
-        await interaction.response.send_message("I don't have permission to modify this channel.", ephemeral=True)
-        return
-    
-    await voice_channel.edit(topic=description)
-    await interaction.response.send_message(f"Updated description for {voice_channel.name}")
-
-@bot.tree.command(name="invite", description="Send voice channel invite to a user")
-@discord.app_commands.describe(user="User to invite")
-@in_voice_channel()
-async def invite_user(interaction: discord.Interaction, user: discord.Member):
-    """Send DM invite to user for voice channel"""
-    voice_channel = interaction.user.voice.channel
-    
-    if not voice_channel.permissions_for(interaction.guild.me).create_instant_invite:
-        await interaction.response.send_message("I don't have permission to create invites.", ephemeral=True)
-        return
-    
-    try:
-        invite = await voice_channel.create_invite(max_uses=1, max_age=3600)  # 1 hour
+    async def _notify_worker(self):
+        while True:
+            user_id, channel_id, embed = await self._outbox.get()
+            channel = self.bot.get_channel(channel_id) if channel_id else None
+            if channel is not None:
+                try:
+                    await channel.send(f"<@{user_id}>", embed=embed)
+                    continue
+                except discord.HTTPException:
+                    pass
+            
+            self.bot.dm_queue.deliver(user_id, DeliveryQueue.PRIORITY_TIMER, embed=embed)
+
+class Leaderboard:
+    """Order-statistic index over XP totals"""
+    TOP_SIZE = 5
+
+    def __init__(self):
+        self._size = 1024  # XP values covered by the tree, grown by doubling
+        self._tree: List[int] = [0] * (self._size + 1)
+        self._buckets: Dict[int, Dict[int, None]] = {}  # xp -> users at that xp, in arrival order
+        self._count = 0
+        self._top: Optional[List] = None
+
+    def __len__(self):
+        return self._count
+
+    def _build(self):
+        """Rebuild the tree in O(max_xp) from the buckets"""
+        tree = [0] * (self._size + 1)
+        for xp, users in self._buckets.items():
+            tree[xp + 1] += len(users)
+        for i in range(1, self._size + 1):
+            parent = i + (i & -i)
+            if parent <= self._size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add(self, xp: int, delta: int):
+        i = xp + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _count_at_most(self, xp: int) -> int:
+        i = min(xp + 1, self._size)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _kth_smallest(self, k: int) -> int:
+        """XP value held by the k-th lowest user (1-based)"""
+        pos = 0
+        step = 1 << (self._size.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= self._size and self._tree[nxt] < k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+    def rebuild(self, user_xp: Dict[int, int]):
+        """Bulk-load every user's XP (used on startup)"""
+        self._buckets = {}
+        for user_id, xp in user_xp.items():
+            self._buckets.setdefault(xp, {})[user_id] = None
+        self._count = len(user_xp)
+        highest = max(self._buckets, default=0)
+        while self._size <= highest:
+            self._size *= 2
+        self._build()
+        self._top = None
+
+    def update(self, user_id: int, old_xp: Optional[int], new_xp: int):
+        """Move a user from old_xp (None if unranked) to new_xp"""
+        if old_xp is not None:
+            users = self._buckets[old_xp]
+            del users[user_id]
+            if not users:
+                del self._buckets[old_xp]
+            self._add(old_xp, -1)
+            self._count -= 1
         
-        embed = discord.Embed(
-            title="🎙️ Voice Channel Invitation",
-            description=f"{interaction.user.display_name} has invited you to join a voice channel!",
-            color=discord.Color.blue()
-        )
-        embed.add_field(name="Channel", value=voice_channel.name, inline=True)
-        embed.add_field(name="Server", value=interaction.guild.name, inline=True)
-        embed.add_field(name="Invite Link", value=invite.url, inline=False)
-        embed.set_footer(text="This invite expires in 1 hour")
-        
-        await user.send(embed=embed)
-        await interaction.response.send_message(f"Sent voice channel invite to {user.display_name}", ephemeral=True)
-        
-    except discord.Forbidden:
-        await interaction.response.send_message(f"Could not send DM to {user.display_name}. They may have DMs disabled.", ephemeral=True)
-
-# Study & Productivity Commands
-@bot.tree.command(name="topic", description="Get a random conversation starter or discussion topic")
-async def random_topic(interaction: discord.Interaction):
-    """Get a random conversation topic"""
-    topic = random.choice(bot.topics)
-    
-    embed = discord.Embed(
-        title="💬 Discussion Topic",
-        description=topic,
-        color=discord.Color.purple()
-    )
-    embed.set_footer(text="Great conversations start with great questions!")
-    
-    await interaction.response.send_message(embed=embed)
+        self._buckets.setdefault(new_xp, {})[user_id] = None
+        self._count += 1
+        if new_xp >= self._size:
+            while self._size <= new_xp:
+                self._size *= 2
+            self._build()
+        else:
+            self._add(new_xp, 1)
+        
+        top = self._top
+        if top is not None and (len(top) < self.TOP_SIZE or new_xp >= top[-1][1]
+                                or any(uid == user_id for uid, _ in top)):
+            self._top = None
 
-@bot.tree.command(name="studyquote", description="Get a motivational study quote")
-async def study_quote(interaction: discord.Interaction):
-    """Get a motivational study quote"""
-    quote = random.choice(bot.study_quotes)
-    
-    embed = discord.Embed(
-        title="📚 Study Motivation",
-        description=f"*\"{quote}\"*",
-        color=discord.Color.gold()
-    )
-    embed.set_footer(text="Keep pushing forward! 💪")
-    
-    await interaction.response.send_message(embed=embed)
-
-@bot.tree.command(name="pomodoro", description="Start a pomodoro timer")
-@discord.app_commands.describe(
-    focus_time="Focus time in minutes (default: 25)",
-    break_time="Break time in minutes (default: 5)"
-)
-async def pomodoro_timer(interaction: discord.Interaction, focus_time: int = 25, break_time: int = 5):
-    """Start a pomodoro timer"""
-    if focus_time < 1 or focus_time > 120:
-        await interaction.response.send_message("Focus time must be between 1 and 120 minutes.", ephemeral=True)
-        return
-    
-    if break_time < 1 or break_time > 60:
-        await interaction.response.send_message("Break time must be between 1 and 60 minutes.", ephemeral=True)
-        return
-    
-    user_id = interaction.user.id
-    
-    if user_id in bot.active_timers:
-        await interaction.response.send_message("You already have an active timer! Use `/stoptimer` to stop it first.", ephemeral=True)
-        return
-    
-    # Store timer data
-    bot.active_timers[user_id] = {
-        'focus_time': focus_time,
-        'break_time': break_time,
-        'start_time': datetime.utcnow(),
-        'phase': 'focus'
+    def rank(self, xp: int) -> int:
+        """1-based rank for a given XP total; users with equal XP share a rank"""
+        return self._count - self._count_at_most(xp) + 1
+
+    def top(self) -> List:
+        """Cached [(user_id, xp), ...] for the top of the board"""
+        if self._top is None:
+            top = []
+            k = self._count
+            while k > 0 and len(top) < self.TOP_SIZE:
+                xp = self._kth_smallest(k)
+                users = self._buckets[xp]
+                for user_id in users:
+                    top.append((user_id, xp))
+                    if len(top) == self.TOP_SIZE:
+                        break
+                k -= len(users)
+            self._top = top
+        return self._top
+
+class XPBoard:
+    """XP totals of one guild over one leaderboard period, with a rank index"""
+    __slots__ = ('period', 'totals', 'index')
+
+    def __init__(self, period: str, totals: Optional[Dict[int, int]] = None):
+        self.period = period
+        self.totals: Dict[int, int] = totals or {}  # user_id -> xp
+        self.index = Leaderboard()
+        if self.totals:
+            self.index.rebuild(self.totals)
+
+    def add(self, user_id: int, amount: int) -> int:
+        old_xp = self.totals.get(user_id)
+        xp = (old_xp or 0) + amount
+        self.totals[user_id] = xp
+        self.index.update(user_id, old_xp, xp)
+        return xp
+
+class XPLedger:
+    """Event-sourced XP, partitioned by guild and rolled up per window"""
+    def __init__(self, store: StateStore, clock=datetime.utcnow):
+        self.store = store
+        self.clock = clock
+        self._boards: Dict[tuple, XPBoard] = {}  # (guild_id, window) -> current period's board
+
+    def __len__(self):
+        return len(self._boards)
+
+    def load(self, rollups: List, events: List):
+        """Restore from compacted rollups, then replay the ledger tail on top"""
+        now = self.clock()
+        current = {window: xp_period(window, now) for window in XP_WINDOWS}
+        totals: Dict[tuple, Dict[int, int]] = {}
+        for guild_id, window, period, user_id, xp in rollups:
+            if period == current[window]:
+                totals.setdefault((guild_id, window), {})[user_id] = xp
+        self._boards = {(guild_id, window): XPBoard(current[window], board_totals)
+                        for (guild_id, window), board_totals in totals.items()}
+        for guild_id, user_id, amount, at in events:
+            self.apply(guild_id, user_id, amount, at)
+
+    def apply(self, guild_id: int, user_id: int, amount: int, at: datetime):
+        """Fold one event into the boards whose current period contains it, without storing it"""
+        for window in XP_WINDOWS:
+            period = xp_period(window, at)
+            board = self._boards.get((guild_id, window))
+            if board is None or board.period < period:
+                board = self._boards[(guild_id, window)] = XPBoard(period)
+            if board.period == period:
+                board.add(user_id, amount)
+
+    def record(self, guild_id: int, user_id: int, amount: int) -> int:
+        """Append a gain to the ledger and return the user's all-time XP in that guild"""
+        now = self.clock()
+        self.store.append_xp(guild_id, user_id, amount, now)
+        self.apply(guild_id, user_id, amount, now)
+        return self._boards[(guild_id, 'all')].totals[user_id]
+
+    def board(self, guild_id: int, window: str = 'all') -> XPBoard:
+        """The guild's board for the current period of a window"""
+        period = xp_period(window, self.clock())
+        board = self._boards.get((guild_id, window))
+        if board is None:
+            return XPBoard(period)  # Nobody has earned XP here yet
+        if board.period != period:
+            board = self._boards[(guild_id, window)] = XPBoard(period)  # The period rolled over
+        return board
+
+class StudyTimeTracker:
+    """Passive study time from voice presence, rolled up per day"""
+    def __init__(self, bot, interval: float = STUDY_FLUSH_INTERVAL, checkpoint: int = STUDY_CHECKPOINT_INTERVAL,
+                 xp_per_hour: int = STUDY_XP_PER_HOUR, clock=time.time):
+        self.bot = bot
+        self.interval = interval
+        self.checkpoint = checkpoint
+        self.seconds_per_xp = 3600 // xp_per_hour if xp_per_hour > 0 else 0
+        self.clock = clock
+        self.counters = collections.Counter()
+        self.disconnected_at: Optional[int] = None  # gateway down since; sessions aren't credited past it
+        self._sessions: Dict[tuple, list] = {}  # (guild_id, user_id) -> [channel_id, credited up to]
+        self._pending = collections.Counter()  # (guild_id, day, user_id, channel_id) -> seconds not handed to the store
+        self._totals: Dict[tuple, tuple] = {}  # (guild_id, window) -> (period, {user_id: seconds})
+        self._xp_carry = collections.Counter()  # (guild_id, user_id) -> seconds not yet worth a whole XP point
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @property
+    def pending_rows(self) -> int:
+        return len(self._pending)
+
+    def load(self, rows: List):
+        """Restore the current periods' totals from the store's rollups"""
+        for guild_id, window, period, user_id, seconds in rows:
+            self._totals.setdefault((guild_id, window), (period, {}))[1][user_id] = seconds
+
+    def _credit(self, guild_id: int, user_id: int, channel_id: int, start: int, end: int):
+        while start < end:
+            day_end = min(end, start - start % 86400 + 86400)
+            seconds, when = day_end - start, from_epoch(start)
+            self._pending[(guild_id, xp_period('daily', when), user_id, channel_id)] += seconds
+            for window in XP_WINDOWS:
+                period = xp_period(window, when)
+                entry = self._totals.get((guild_id, window))
+                if entry is None or entry[0] < period:
+                    entry = self._totals[(guild_id, window)] = (period, {})
+                if entry[0] == period:
+                    entry[1][user_id] = entry[1].get(user_id, 0) + seconds
+            if self.seconds_per_xp:
+                self._xp_carry[(guild_id, user_id)] += seconds
+            start = day_end
+
+    def join(self, guild_id: int, user_id: int, channel_id: int, now: int):
+        if (guild_id, user_id) in self._sessions:
+            self.leave(guild_id, user_id, now)
+        self._sessions[(guild_id, user_id)] = [channel_id, now]
+
+    def leave(self, guild_id: int, user_id: int, now: int):
+        session = self._sessions.pop((guild_id, user_id), None)
+        if session is not None:
+            self._credit(guild_id, user_id, session[0], session[1], max(now, session[1]))
+
+    @staticmethod
+    def counts(channel) -> bool:
+        """Time in a guild's AFK channel isn't study time"""
+        return channel is not None and channel != channel.guild.afk_channel
+
+    def update(self, member, before, after):
+        """Fold one voice state change in; mute and deafen toggles don't change the session"""
+        if member.bot or before.channel == after.channel:
+            return
+        now = int(self.clock())
+        if self.counts(after.channel):
+            self.counters['moves' if self.counts(before.channel) else 'joins'] += 1
+            self.join(member.guild.id, member.id, after.channel.id, now)
+        elif self.counts(before.channel):
+            self.counters['leaves'] += 1
+            self.leave(member.guild.id, member.id, now)
+
+    def disconnected(self):
+        if self.disconnected_at is None:
+            self.disconnected_at = int(self.clock())
+
+    def resumed(self):
+        """The gateway replays what was missed on a resume, so sessions stay as they are"""
+        self.disconnected_at = None
+
+    def reconcile(self, guilds):
+        """Match sessions in these guilds to who is in voice now, after a fresh gateway session"""
+        now = int(self.clock())
+        ended_at = min(self.disconnected_at or now, now)
+        present = {}
+        for guild in guilds:
+            for channel in guild.voice_channels + guild.stage_channels:
+                if not self.counts(channel):
+                    continue
+                for user_id in channel.voice_states:
+                    member = guild.get_member(user_id)
+                    if member is None or not member.bot:
+                        present[(guild.id, user_id)] = channel.id
+        guild_ids = {guild.id for guild in guilds}
+        closed = opened = 0
+        for key, (channel_id, _) in list(self._sessions.items()):
+            if key[0] in guild_ids and present.get(key) != channel_id:
+                self.leave(*key, ended_at)
+                closed += 1
+                if key in present:
+                    self._sessions[key] = [present[key], ended_at]  # still in voice throughout, just elsewhere
+        for (guild_id, user_id), channel_id in present.items():
+            if (guild_id, user_id) not in self._sessions:
+                self.join(guild_id, user_id, channel_id, now)
+                opened += 1
+        self.disconnected_at = None
+        self.counters['reconciled'] += closed + opened
+        if closed or opened:
+            logger.info(f"Voice sessions reconciled: {closed} closed, {opened} opened, {len(self._sessions)} open")
+
+    def seconds(self, guild_id: int, user_id: int, window: str = 'all') -> int:
+        """A user's study time in the current period of a window, the open session included"""
+        now = int(self.clock())
+        period = xp_period(window, from_epoch(now))
+        entry = self._totals.get((guild_id, window))
+        total = entry[1].get(user_id, 0) if entry is not None and entry[0] == period else 0
+        session = self._sessions.get((guild_id, user_id))
+        if session is not None:
+            period_start = 0 if window == 'all' else epoch(datetime.fromisoformat(period))
+            total += max(0, min(now, self.disconnected_at or now) - max(session[1], period_start))
+        return total
+
+    def flush(self, checkpoint_all: bool = False):
+        """Hand every pending counter to the store as one batch, crediting long-open sessions first"""
+        until = min(int(self.clock()), self.disconnected_at or math.inf)
+        for (guild_id, user_id), session in self._sessions.items():
+            if session[1] < until and (checkpoint_all or until - session[1] >= self.checkpoint):
+                self._credit(guild_id, user_id, session[0], session[1], until)
+                session[1] = until
+        if self._pending:
+            self.bot.state_store.add_study_time([key + (seconds,) for key, seconds in self._pending.items()])
+            self.counters['rows_written'] += len(self._pending)
+            self._pending.clear()
+        for key, seconds in list(self._xp_carry.items()):
+            points, self._xp_carry[key] = divmod(seconds, self.seconds_per_xp)
+            if points:
+                self.bot.add_xp(key[1], points, key[0])
+            if not self._xp_carry[key] and key not in self._sessions:
+                del self._xp_carry[key]
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop the flush loop and hand over what has been counted so far"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.flush(checkpoint_all=True)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Study time flush failed: {e}")
+
+class VoiceModerator:
+    """Bulk voice moderation (mute, unmute, deafen, disconnect)"""
+    # action -> (already applied?, edit kwargs, required permission, past tense, progressive)
+    ACTIONS = {
+        'mute': (lambda voice: voice.mute, {'mute': True}, 'mute_members', "Muted", "Muting"),
+        'unmute': (lambda voice: not voice.mute, {'mute': False}, 'mute_members', "Unmuted", "Unmuting"),
+        'deafen': (lambda voice: voice.deaf, {'deafen': True}, 'deafen_members', "Deafened", "Deafening"),
+        'disconnect': (lambda voice: False, {'voice_channel': None}, 'move_members', "Disconnected", "Disconnecting"),
     }
-    
-    embed = discord.Embed(
-        title="🍅 Pomodoro Timer Started",
-        description=f"Focus time: **{focus_time} minutes**\nBreak time: **{break_time} minutes**\n\nStay focused! I'll notify you when it's time for a break.",
-        color=discord.Color.red(),
-        timestamp=datetime.utcnow()
-    )
-    embed.set_footer(text="Good luck with your study session!")
-    
-    await interaction.response.send_message(embed=embed)
-    
-    # Schedule focus completion
-    await asyncio.sleep(focus_time * 60)
-    
-    if user_id in bot.active_timers:
-        # Award XP
-        if user_id not in bot.user_xp:
-            bot.user_xp[user_id] = 0
-        bot.user_xp[user_id] += 10
+    PROGRESS_INTERVAL = 1.5  # seconds between progress callbacks
+
+    def __init__(self, concurrency: int = 5):
+        self.concurrency = concurrency
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+
+    async def run(self, action: str, guild_id: int, members: List, reason: Optional[str] = None, progress=None) -> Dict:
+        """Apply an action to members; returns {'done': [...], 'skipped': [...], 'failed': [(member, error)]}"""
+        already_applied, changes = self.ACTIONS[action][:2]
+        semaphore = self._semaphores.setdefault(guild_id, asyncio.Semaphore(self.concurrency))
+        results = {'done': [], 'skipped': [], 'failed': []}
         
-        embed = discord.Embed(
-            title="⏰ Focus Time Complete!",
-            description=f"Great job! You focused for {focus_time} minutes.\n\n**+10 XP earned!**\nTotal XP: {bot.user_xp[user_id]}\n\nTake a {break_time} minute break!",
-            color=discord.Color.green()
-        )
+        async def apply(member):
+            if member.voice is None or already_applied(member.voice):
+                results['skipped'].append(member)
+                return
+            async with semaphore:
+                try:
+                    await member.edit(**changes, reason=reason)
+                    results['done'].append(member)
+                except discord.HTTPException as e:
+                    results['failed'].append((member, e))
         
-        try:
-            await interaction.followup.send(embed=embed)
-        except:
-            user = bot.get_user(user_id)
-            if user:
+        async def report():
+            while True:
+                await asyncio.sleep(self.PROGRESS_INTERVAL)
+                finished = len(results['done']) + len(results['skipped']) + len(results['failed'])
                 try:
-                    await user.send(embed=embed)
-                except:
+                    await progress(finished, len(members))
+                except discord.HTTPException:
                     pass
         
-        # Update timer phase
-        bot.active_timers[user_id]['phase'] = 'break'
+        reporter = asyncio.create_task(report()) if progress is not None else None
+        try:
+            await asyncio.gather(*(apply(member) for member in members))
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+        return results
+
+class ChannelEditQueue:
+    """Per-channel edit coalescer for the voice settings commands"""
+    def __init__(self):
+        self._pending: Dict[int, List] = {}  # channel_id -> [(changes, future)] for the next edit
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self.counters = collections.Counter()
+
+    def __len__(self):
+        return sum(len(requests) for requests in self._pending.values())
+
+    async def edit(self, channel, **changes):
+        """Queue changes for a channel and wait until they land; raises the edit's error"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(channel.id, []).append((changes, future))
+        self.counters['requested'] += 1
+        if channel.id not in self._tasks:
+            self._tasks[channel.id] = asyncio.create_task(self._drain(channel))
+        await future
+
+    async def _drain(self, channel):
+        try:
+            while self._pending.get(channel.id):
+                batch = self._pending.pop(channel.id)
+                changes = {}
+                for request, _ in batch:
+                    for field, value in request.items():
+                        if callable(value):
+                            value = value(changes[field] if field in changes else getattr(channel, field))
+                        changes[field] = value
+                
+                self.counters['edits'] += 1
+                error = None
+                try:
+                    await channel.edit(**changes)
+                except Exception as e:
+                    error = e
+                for _, future in batch:
+                    if not future.done():
+                        if error is not None:
+                            future.set_exception(error)
+                        else:
+                            future.set_result(None)
+        finally:
+            del self._tasks[channel.id]
+
+class StaffNotifier:
+    """Announces new support cases in the staff channel, coalescing bursts"""
+    DIGEST_LINES = 20
+    BACKOFF_BASE = 2.0  # seconds, doubled per failed attempt
+    BACKOFF_MAX = 300.0
+    ALERT_AFTER = 5  # failed attempts before a case is reported as stuck (it keeps retrying)
+
+    def __init__(self, bot, burst: int = STAFF_BURST_CASES, window: float = STAFF_DIGEST_WINDOW,
+                 thread_concurrency: int = STAFF_THREAD_CONCURRENCY):
+        self.bot = bot
+        self.burst = burst
+        self.window = window
+        self.thread_concurrency = thread_concurrency
+        self._pending = collections.deque()  # announcements not posted yet, oldest first
+        self._posting = 0  # announcements taken off _pending and being posted
+        self._retries: Dict[int, asyncio.TimerHandle] = {}  # case_id -> scheduled retry
+        self._arrivals = collections.deque()  # loop times of recent submissions
+        self._held: Dict[int, List] = {}  # case_id -> DMs waiting for the case thread
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        self.counters = collections.Counter()
+
+    def __len__(self):
+        return len(self._pending) + self._posting + len(self._retries) + len(self._tasks)
+
+    def __contains__(self, case_id: int) -> bool:
+        return case_id in self._retries or any(item['case_id'] == case_id for item in self._pending)
+
+    def submit(self, case_id: int, embed: discord.Embed, thread_name: str, attachments=(), author: str = '',
+               confirmation: Optional[asyncio.Future] = None):
+        """Queue a new case; `confirmation` (the user's confirmation DM) is updated once staff are pinged"""
+        now = asyncio.get_running_loop().time()
+        self._arrivals.append(now)
+        self._pending.append({'case_id': case_id, 'embed': embed, 'thread_name': thread_name[:100],
+                              'attachments': list(attachments), 'author': author, 'confirmation': confirmation,
+                              'message': None, 'announced': False, 'attempts': 0})
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def hold(self, case_id: int, message):
+        """Keep a DM for a case whose thread doesn't exist yet"""
+        self._held.setdefault(case_id, []).append(message)
+        self.counters['held'] += 1
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._semaphore = asyncio.Semaphore(self.thread_concurrency)
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop announcing; queued cases are picked up again by whoever takes over"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+        self._pending.clear()
+
+    def _bursting(self, now: float) -> bool:
+        while self._arrivals and now - self._arrivals[0] >= self.window:
+            self._arrivals.popleft()
+        return len(self._arrivals) > self.burst or len(self._pending) > self.burst
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if self._bursting(loop.time()):
+                await asyncio.sleep(self.window)  # Everything arriving during this window goes into one digest
+                batch = list(self._pending)
+                self._pending.clear()
+                posting = self._digest(batch)
+            else:
+                batch = [self._pending.popleft()]
+                posting = self._announce(batch[0])
+            self._posting = len(batch)
+            try:
+                await posting
+            except Exception as e:
+                logger.error(f"Staff announcement failed: {e}")
+            finally:
+                self._posting = 0
+
+    def _open(self, case_id: int) -> bool:
+        data = self.bot.cases.get(case_id)
+        if data is None or data.status != 'open':
+            self.counters['skipped'] += 1  # Closed before staff ever saw it
+            self._held.pop(case_id, None)
+            return False
+        return True
+
+    async def _announce(self, item: Dict):
+        """Post one case with its own ping, then give it a thread on that post"""
+        if not self._open(item['case_id']):
+            return
+        channel = await self.bot.resolve_channel(STAFF_CHANNEL_ID)
+        if channel is None:
+            self._failed(item, f"staff channel {STAFF_CHANNEL_ID} not found")
+            return
+        try:
+            item['message'] = await channel.send("@everyone", embed=item['embed'])
+        except discord.HTTPException as e:
+            self._failed(item, e)
+            return
+        self.counters['announced'] += 1
+        self._notified(item)
+        await self._create_thread(item)
+
+    async def _digest(self, batch: List[Dict]):
+        """Post one ping for a whole window of cases, then give each case its thread"""
+        batch = [item for item in batch if self._open(item['case_id'])]
+        if not batch:
+            return
+        lines = []
+        for item in batch[:self.DIGEST_LINES]:
+            summary = (item['embed'].description or "(attachments only)").replace("\n", " ")
+            lines.append(f"**#{item['case_id']}** • {item['author']} • {discord.utils.escape_markdown(summary[:80])}")
+        if len(batch) > self.DIGEST_LINES:
+            lines.append(f"…and {len(batch) - self.DIGEST_LINES} more")
+        embed = discord.Embed(
+            title=f"🆘 {len(batch)} New Support Cases",
+            description="\n".join(lines),
+            color=discord.Color.orange(),
+            timestamp=datetime.utcnow()
+        )
+        embed.set_footer(text="Each case gets its own thread in this channel")
         
-        # Schedule break completion
-        await asyncio.sleep(break_time * 60)
+        channel = await self.bot.resolve_channel(STAFF_CHANNEL_ID)
+        try:
+            if channel is None:
+                raise LookupError(f"staff channel {STAFF_CHANNEL_ID} not found")
+            await channel.send("@everyone", embed=embed)
+        except (discord.HTTPException, LookupError) as e:
+            for item in batch:
+                self._failed(item, e)
+            return
+        self.counters['digests'] += 1
+        self.counters['digested'] += len(batch)
+        for item in batch:
+            self._notified(item)
+            self._spawn(self._create_thread(item))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _create_thread(self, item: Dict):
+        """Open the case thread: on its own announcement, or standalone for digested cases"""
+        async with self._semaphore:
+            if not self._open(item['case_id']):
+                return
+            try:
+                if item['message'] is not None:
+                    thread = await item['message'].create_thread(name=item['thread_name'], auto_archive_duration=1440)
+                else:
+                    channel = await self.bot.resolve_channel(STAFF_CHANNEL_ID)
+                    if channel is None:
+                        raise LookupError(f"staff channel {STAFF_CHANNEL_ID} not found")
+                    thread = await channel.create_thread(name=item['thread_name'], type=discord.ChannelType.public_thread,
+                                                         auto_archive_duration=1440)
+                    await thread.send(embed=item['embed'])
+            except (discord.HTTPException, LookupError) as e:
+                self._failed(item, e)
+                return
+        self._opened(item, thread)
+
+    def _notified(self, item: Dict):
+        """Staff have been pinged about the case: say so in the user's confirmation"""
+        item['announced'] = True
+        item['attempts'] = 0
+        if item['confirmation'] is not None:
+            self._spawn(self._update_confirmation(item['case_id'], item['confirmation']))
+
+    async def _update_confirmation(self, case_id: int, confirmation: asyncio.Future):
+        try:
+            message = await confirmation
+            await message.edit(embed=case_confirmation_embed(case_id, staff_notified=True))
+        except discord.HTTPException:
+            pass  # The DM never arrived, or can't be edited; the case itself is fine
+
+    def _opened(self, item: Dict, thread):
+        """Link the thread to its case and post what was waiting for it"""
+        case_id = item['case_id']
+        self.bot.cases.set_thread(case_id, thread.id)
+        self.counters['threads'] += 1
+        self.bot.attachment_mirror.mirror(thread, item['attachments'], item['author'])
+        for message in self._held.pop(case_id, ()):
+            self._spawn(self.bot.relay_user_message(case_id, message))
+
+    def _failed(self, item: Dict, error):
+        """Retry with exponential backoff; a case is never dropped, only reported once it looks stuck"""
+        item['attempts'] += 1
+        delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** (item['attempts'] - 1)) * random.uniform(1.0, 1.25)
+        step = "thread for" if item['announced'] else "announcement of"
+        self.counters['retried'] += 1
+        if item['attempts'] == self.ALERT_AFTER:
+            self.counters['stuck'] += 1
+            logger.error(f"Case #{item['case_id']} still has no staff {step.split()[0]} after {item['attempts']} attempts: "
+                         f"{error}; retrying every {self.BACKOFF_MAX:.0f} s at most")
+        else:
+            logger.warning(f"Failed {step} case #{item['case_id']} (attempt {item['attempts']}), retrying in {delay:.0f} s: {error}")
+        self._retries[item['case_id']] = asyncio.get_running_loop().call_later(delay, self._retry, item)
+
+    def _retry(self, item: Dict):
+        self._retries.pop(item['case_id'], None)
+        if item['announced']:
+            self._spawn(self._create_thread(item))  # Staff were pinged already; only the thread is missing
+            return
+        self._pending.append(item)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+class SpoolReader(io.RawIOBase):
+    """Read-only IOBase view of a SpooledTemporaryFile, which only became one in Python 3.11"""
+
+    def __init__(self, spool):
+        self._spool = spool
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._spool.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._spool.seek(offset, whence)
+        return self._spool.tell()
+
+    def tell(self) -> int:
+        return self._spool.tell()
+
+
+class AttachmentMirror:
+    """Copies support DM attachments into case threads"""
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, concurrency: int = 4, max_bytes: int = ATTACHMENT_MAX_BYTES, spool_bytes: int = ATTACHMENT_SPOOL_BYTES):
+        self.concurrency = concurrency
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: set = set()
+        self.counters = collections.Counter()
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def mirror(self, thread, attachments, author: str):
+        """Start copying attachments into the thread without waiting for them"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        for attachment in attachments:
+            task = asyncio.create_task(self._mirror_one(thread, attachment, author))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _mirror_one(self, thread, attachment, author: str):
+        guild = getattr(thread, 'guild', None)
+        limit = min(self.max_bytes, getattr(guild, 'filesize_limit', self.max_bytes))
+        if attachment.size > limit:
+            self.counters['too_large'] += 1
+            await self._post_link(thread, attachment, author, "too large to copy")
+            return
         
-        if user_id in bot.active_timers:
-            embed = discord.Embed(
-                title="☕ Break Time Over!",
-                description="Break time is over. Ready for another focus session?",
-                color=discord.Color.blue()
-            )
-            
+        async with self._semaphore:
             try:
-                await interaction.followup.send(embed=embed)
-            except:
-                user = bot.get_user(user_id)
-                if user:
+                with tempfile.SpooledTemporaryFile(max_size=self.spool_bytes) as spool:
+                    size = await self._download(attachment.url, spool, limit)
+                    spool.seek(0)
+                    file = discord.File(SpoolReader(spool), filename=attachment.filename)
                     try:
-                        await user.send(embed=embed)
-                    except:
-                        pass
-            
-            del bot.active_timers[user_id]
+                        await thread.send(f"📎 **{author}** sent `{attachment.filename}`", file=file)
+                    finally:
+                        file.close()
+            except (aiohttp.ClientError, asyncio.TimeoutError, discord.HTTPException, OSError, ValueError) as e:
+                self.counters['failed'] += 1
+                logger.warning(f"Failed to copy attachment {attachment.filename} into thread {thread.id}: {e}")
+                await self._post_link(thread, attachment, author, "could not be copied")
+            else:
+                self.counters['mirrored'] += 1
+                self.counters['bytes'] += size
 
-@bot.tree.command(name="stoptimer", description="Stop your active pomodoro timer")
-async def stop_timer(interaction: discord.Interaction):
-    """Stop active pomodoro timer"""
-    user_id = interaction.user.id
-    
-    if user_id not in bot.active_timers:
-        await interaction.response.send_message("You don't have an active timer.", ephemeral=True)
-        return
-    
-    del bot.active_timers[user_id]
-    await interaction.response.send_message("⏹️ Timer stopped.", ephemeral=True)
-
-@bot.tree.command(name="rank", description="Check your XP ranking")
-async def check_rank(interaction: discord.Interaction):
-    """Check XP ranking"""
-    user_id = interaction.user.id
-    user_xp = bot.user_xp.get(user_id, 0)
-    
-    # Sort users by XP
-    sorted_users = sorted(bot.user_xp.items(), key=lambda x: x[1], reverse=True)
-    
-    # Find user's rank
-    user_rank = None
-    for i, (uid, xp) in enumerate(sorted_users):
-        if uid == user_id:
-            user_rank = i + 1
-            break
-    
-    if user_rank is None:
-        user_rank = "Unranked"
-    
-    embed = discord.Embed(
-        title="📊 Your Study Ranking",
-        color=discord.Color.gold()
-    )
-    
-    embed.add_field(name="Your XP", value=f"**{user_xp}** XP", inline=True)
-    embed.add_field(name="Your Rank", value=f"**#{user_rank}**", inline=True)
-    embed.add_field(name="Total Users", value=f"**{len(sorted_users)}**", inline=True)
-    
-    # Show top 5 users
-    leaderboard = ""
-    for i, (uid, xp) in enumerate(sorted_users[:5]):
-        user = bot.get_user(uid)
-        name = user.display_name if user else f"User {uid}"
-        leaderboard += f"{i+1}. **{name}** - {xp} XP\n"
-    
-    if leaderboard:
-        embed.add_field(name="🏆 Top 5 Leaderboard", value=leaderboard, inline=False)
-    
-    embed.set_footer(text="Keep studying to climb the ranks!")
-    
-    await interaction.response.send_message(embed=embed)
-
-@bot.tree.command(name="remindme", description="Set a personal reminder")
-@discord.app_commands.describe(
-    time="Time until reminder (e.g., '30m', '2h', '1d')",
-    message="Reminder message"
-)
-async def remind_me(interaction: discord.Interaction, time: str, message: str):
-    """Set a personal reminder"""
-    try:
-        # Parse time
-        time = time.lower().strip()
-        if time.endswith('m'):
-            minutes = int(time[:-1])
-            if minutes < 1 or minutes > 10080:  # 1 week in minutes
-                raise ValueError("Minutes must be between 1 and 10080 (1 week)")
-            delta = timedelta(minutes=minutes)
-        elif time.endswith('h'):
-            hours = int(time[:-1])
-            if hours < 1 or hours > 168:  # 1 week in hours
-                raise ValueError("Hours must be between 1 and 168 (1 week)")
-            delta = timedelta(hours=hours)
-        elif time.endswith('d'):
-            days = int(time[:-1])
-            if days < 1 or days > 7:
-                raise ValueError("Days must be between 1 and 7")
-            delta = timedelta(days=days)
-        else:
-            raise ValueError("Time format must end with 'm', 'h', or 'd'")
+    async def _download(self, url: str, spool, limit: int) -> int:
+        """Stream a file into spool chunk by chunk; raises ValueError past limit bytes"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=http_connector(), timeout=aiohttp.ClientTimeout(total=300, sock_read=30))
+        size = 0
+        async with self._session.get(url) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                size += len(chunk)
+                if size > limit:
+                    raise ValueError(f"larger than {limit} bytes")
+                spool.write(chunk)
+        return size
+
+    async def _post_link(self, thread, attachment, author: str, reason: str):
+        try:
+            await thread.send(f"📎 **{author}** sent `{attachment.filename}` ({reason}): {attachment.url}")
+        except discord.HTTPException:
+            pass
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+class TranscriptExporter:
+    """Archives closed case threads as gzipped JSONL transcripts"""
+    BATCH_SIZE = 100  # messages per write (one history page)
+    CLOSE_GRACE = 10.0  # seconds running exports get to finish on shutdown
+
+    def __init__(self, store: StateStore, directory: str = TRANSCRIPT_DIR, concurrency: int = 2):
+        self.store = store
+        self.directory = directory
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="transcripts")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: set = set()
+        self.counters = collections.Counter()
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def path_for(self, case_id: int) -> str:
+        return os.path.join(self.directory, f"case-{case_id}.jsonl.gz")
+
+    def export(self, case_id: int, case_data: CaseRecord, thread) -> asyncio.Task:
+        """Start exporting a closed case's thread without waiting for it"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        task = asyncio.create_task(self._export(case_id, case_data, thread))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @staticmethod
+    def _record(message) -> Dict:
+        return {
+            'type': 'message',
+            'id': message.id,
+            'author_id': message.author.id,
+            'author': str(message.author),
+            'bot': message.author.bot,
+            'content': message.content,
+            'created_at': message.created_at.isoformat(),
+            'attachments': [attachment.url for attachment in message.attachments],
+            'embeds': [embed.to_dict() for embed in message.embeds],
+        }
+
+    async def _export(self, case_id: int, case_data: CaseRecord, thread):
+        loop = asyncio.get_running_loop()
+        path = self.path_for(case_id)
+        tmp_path = path + '.tmp'
+        closed_at = from_epoch(case_data.closed_at) if case_data.closed_at else None
+        header = {
+            'type': 'case', 'case_id': case_id, 'user_id': case_data.user_id, 'thread_id': case_data.thread_id,
+            'created_at': from_epoch(case_data.created_at), 'closed_at': closed_at, 'closed_by': case_data.closed_by,
+        }
         
-        reminder_time = datetime.utcnow() + delta
+        def open_file():
+            os.makedirs(self.directory, exist_ok=True)
+            return gzip.open(tmp_path, 'wb')
         
-        # Store reminder
-        user_id = interaction.user.id
-        if user_id not in bot.reminders:
-            bot.reminders[user_id] = []
+        async with self._semaphore:
+            out = None
+            messages = 0
+            try:
+                out = await loop.run_in_executor(self._executor, open_file)
+                lines = [_encode_record(header)]
+                async for message in thread.history(limit=None, oldest_first=True):
+                    lines.append(json_dumps(self._record(message)))
+                    messages += 1
+                    if len(lines) >= self.BATCH_SIZE:
+                        data, lines = ("\n".join(lines) + "\n").encode(), []
+                        await loop.run_in_executor(self._executor, out.write, data)
+                if lines:
+                    await loop.run_in_executor(self._executor, out.write, ("\n".join(lines) + "\n").encode())
+                await loop.run_in_executor(self._executor, out.close)
+                await loop.run_in_executor(self._executor, os.replace, tmp_path, path)
+                size = await loop.run_in_executor(self._executor, os.path.getsize, path)
+            except (Exception, asyncio.CancelledError) as e:
+                self.counters['failed'] += 1
+                logger.error(f"Failed to export transcript for case #{case_id}: {e!r}")
+                def discard():
+                    if out is not None:
+                        out.close()
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                await loop.run_in_executor(self._executor, discard)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                return
         
-        bot.reminders[user_id].append({
-            'time': reminder_time,
-            'message': message,
-            'set_time': datetime.utcnow()
+        self.counters['exported'] += 1
+        self.counters['messages'] += messages
+        self.store.put_transcript(case_id, {
+            'user_id': case_data.user_id, 'closed_at': closed_at or datetime.utcnow(),
+            'path': path, 'messages': messages, 'bytes': size,
         })
+        logger.info(f"Exported {messages} message(s) of case #{case_id} to {path}")
+
+    async def close(self):
+        """Give running exports a moment to finish, then cancel the rest"""
+        if self._tasks:
+            _, pending = await asyncio.wait(list(self._tasks), timeout=self.CLOSE_GRACE)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        self._executor.shutdown(wait=False)
+
+class DeliveryQueue:
+    """Shared outbound DM pipeline"""
+    PRIORITY_STAFF = 0        # Staff replies and case updates
+    PRIORITY_INTERACTIVE = 1  # Direct answers to something the user just did
+    PRIORITY_TIMER = 2
+    PRIORITY_REMINDER = 3
+    PRIORITY_NAMES = {0: 'staff', 1: 'interactive', 2: 'timer', 3: 'reminder'}
+
+    MAX_ATTEMPTS = 4
+    BACKOFF_BASE = 1.0  # seconds, doubled per attempt
+    CLOSE_GRACE = 10.0  # seconds queued DMs get to go out on shutdown
+
+    def __init__(self, bot, workers: int = 4):
+        self.bot = bot
+        self.worker_count = workers
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sending = 0  # jobs taken off the queue by a worker
+        self._retries: Dict[int, tuple] = {}  # id(job) -> (scheduled retry, job)
+        self._seq = itertools.count()
+        self._depth = {priority: 0 for priority in self.PRIORITY_NAMES}
+        self._latencies = collections.deque(maxlen=1024)  # enqueue -> delivered, seconds
+        self.dead_letters = collections.deque(maxlen=1000)  # (user_id, reason, when)
+        self.counters = collections.Counter()
+
+    def start(self):
+        if not self._workers:
+            if self._queue is None:
+                self._queue = asyncio.PriorityQueue()
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    def __len__(self):
+        return (self._queue.qsize() if self._queue is not None else 0) + self._sending + len(self._retries)
+
+    def stop(self):
+        """Stop the workers; DMs still queued are abandoned and their senders see CancelledError"""
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+        jobs = []
+        for handle, job in self._retries.values():
+            handle.cancel()
+            jobs.append(job)
+        self._retries.clear()
+        while self._queue is not None and not self._queue.empty():
+            priority, _, job = self._queue.get_nowait()
+            self._depth[priority] -= 1
+            jobs.append(job)
+        for job in jobs:
+            if job['future'] is not None:
+                job['future'].cancel()
+
+    async def close(self):
+        """Give queued DMs (retries included) a moment to go out, then stop"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.CLOSE_GRACE
+        while len(self) and self._workers and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        if len(self):
+            logger.warning(f"Shutting down with {len(self)} DM(s) undelivered")
+        self.stop()
+
+    def _enqueue(self, user, priority: int, kwargs: Dict, future: Optional[asyncio.Future]):
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        job = {'user': user, 'kwargs': kwargs, 'future': future, 'attempts': 0,
+               'enqueued_at': asyncio.get_running_loop().time()}
+        self._depth[priority] += 1
+        self._queue.put_nowait((priority, next(self._seq), job))
+
+    def deliver(self, user, priority: int, **kwargs):
+        """Queue a DM without waiting for it (user is a User/Member or an ID)"""
+        self._enqueue(user, priority, kwargs, None)
+
+    async def send(self, user, priority: int, **kwargs) -> discord.Message:
+        """Queue a DM and wait for the outcome; raises the final send error"""
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(user, priority, kwargs, future)
+        return await future
+
+    def stats(self) -> Dict:
+        latencies = sorted(self._latencies)
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+        return {
+            'depth': {self.PRIORITY_NAMES[p]: n for p, n in self._depth.items()},
+            'latency_p50': pct(0.5),
+            'latency_p99': pct(0.99),
+            'dead_letters': len(self.dead_letters),
+            **self.counters,
+        }
+
+    def _finish(self, job: Dict, result=None, error: Optional[Exception] = None):
+        future = job['future']
+        if future is not None and not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _requeue(self, priority: int, job: Dict):
+        self._retries.pop(id(job), None)
+        self._depth[priority] += 1
+        self._queue.put_nowait((priority, next(self._seq), job))
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            priority, _, job = await self._queue.get()
+            self._depth[priority] -= 1
+            self._sending += 1
+            try:
+                await self._send(loop, priority, job)
+            except asyncio.CancelledError:
+                if job['future'] is not None:
+                    job['future'].cancel()
+                raise
+            finally:
+                self._sending -= 1
+
+    async def _send(self, loop, priority: int, job: Dict):
+        user = job['user']
+        user_id = getattr(user, 'id', user)
+        set_log_context(user_id=user_id)
+        job['attempts'] += 1
+        try:
+            if isinstance(user, int):
+                user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+            message = await user.send(**job['kwargs'])
+        except (discord.Forbidden, discord.NotFound) as e:
+            self.counters['dead_lettered'] += 1
+            self.dead_letters.append((user_id, type(e).__name__, datetime.utcnow()))
+            self._finish(job, error=e)
+        except discord.HTTPException as e:
+            if (e.status == 429 or e.status >= 500) and job['attempts'] < self.MAX_ATTEMPTS:
+                self.counters['retried'] += 1
+                delay = self.BACKOFF_BASE * 2 ** (job['attempts'] - 1) * random.uniform(1.0, 1.5)
+                self._retries[id(job)] = (loop.call_later(delay, self._requeue, priority, job), job)
+            else:
+                self.counters['failed'] += 1
+                logger.warning(f"Giving up on DM to {user_id} after {job['attempts']} attempt(s): {e}")
+                self._finish(job, error=e)
+        except Exception as e:
+            self.counters['failed'] += 1
+            logger.error(f"Unexpected error sending DM to {user_id}: {e}")
+            self._finish(job, error=e)
+        else:
+            self.counters['sent'] += 1
+            self._latencies.append(loop.time() - job['enqueued_at'])
+            self._finish(job, result=message)
+
+# Support System UI Components
+class SupportStartView(discord.ui.View):
+    def __init__(self, bot, user_id: int):
+        super().__init__(timeout=SUPPORT_SESSION_TTL)
+        self.bot = bot
+        self.user_id = user_id
+
+    async def on_timeout(self):
+        self.bot.support_sessions.clear_prompt(self.user_id)
+
+    @discord.ui.button(label="📝 Start Support Request", style=discord.ButtonStyle.primary, emoji="🚀")
+    async def start_support(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # Mark user as ready to submit their case
+        self.bot.support_sessions.begin_case(interaction.user.id)
         
         embed = discord.Embed(
-            title="⏰ Reminder Set",
-            description=f"I'll remind you in **{time}** with the message:\n\n*\"{message}\"*",
-            color=discord.Color.green(),
-            timestamp=reminder_time
+            title="📝 Ready to Help!",
+            description="Perfect! Now please describe your issue or question in detail.\n\nI'll forward it to our staff team right away.",
+            color=discord.Color.green()
         )
-        embed.set_footer(text="You'll be reminded at")
         
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        embed.add_field(
+            name="💡 Tips for better support:",
+            value="• Be specific about the problem\n• Include any error messages\n• Mention what you were trying to do\n• Add screenshots if helpful",
+            inline=False
+        )
         
-    except ValueError as e:
-        await interaction.response.send_message(f"❌ Invalid time format: {e}\n\nExamples: `30m`, `2h`, `1d`", ephemeral=True)
-    except Exception as e:
-        await interaction.response.send_message(f"❌ Error setting reminder: {e}", ephemeral=True)
-
-# Error handling for voice channel commands
-@force_mute.error
-@make_private.error
-@make_public.error
-@set_max_members.error
-@set_description.error
-@invite_user.error
-async def voice_command_error(interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
-    if isinstance(error, discord.app_commands.CheckFailure):
-        await interaction.response.send_message("❌ You need to be in a voice channel to use this command.", ephemeral=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @discord.ui.button(label="❌ Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel_support(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.bot.support_sessions.clear_prompt(interaction.user.id)
+        self.stop()
+        embed = discord.Embed(
+            title="✋ Support Cancelled",
+            description="No problem! If you need help later, just send me another message.",
+            color=discord.Color.light_grey()
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+bot = DungeonKeeper()
+
+# Feature commands live in cogs/; this one stays in the core so cogs can be swapped while running
+@bot.tree.command(name="reload", description="Reload (or load) a feature cog without restarting the bot")
+@discord.app_commands.describe(cog="Cog to reload")
+@discord.app_commands.choices(cog=[discord.app_commands.Choice(name=name, value=name) for name in AVAILABLE_COGS])
+@discord.app_commands.default_permissions(administrator=True)
+@discord.app_commands.checks.has_permissions(administrator=True)
+async def reload_cog(interaction: discord.Interaction, cog: str):
+    """Re-import a cog's module and re-register its commands; timers, queues and state stay put"""
+    await interaction.response.defer(ephemeral=True)
+    try:
+        timing = await bot.load_cog(cog, reload=f"cogs.{cog}" in bot.extensions)
+    except commands.ExtensionError as e:
+        logger.exception(f"Failed to reload cog {cog}")
+        await interaction.followup.send(f"❌ Couldn't reload `{cog}`: {e.__cause__ or e}", ephemeral=True)
+        return
+    
+    await bot.sync_commands_leased()
+    await interaction.followup.send(
+        f"🔄 Reloaded `{cog}` (import {timing['import'] * 1000:.0f} ms, setup {timing['setup'] * 1000:.0f} ms).",
+        ephemeral=True
+    )
 
 # Run the bot
 if __name__ == "__main__":
+    apply_runtime_profile()
     try:
-        bot.run(DISCORD_TOKEN)
+        bot.run(DISCORD_TOKEN, log_handler=None)  # Logging is already routed through the queue
     except discord.LoginFailure:
         logger.error("Invalid Discord token. Please check your DISCORD_TOKEN environment variable.")
     except Exception as e: